@@ -10,6 +10,7 @@
 import argparse
 
 from camera_system import CameraSystem
+from game_planner import GamePlanner
 from str_to_bool import StrToBool
 
 if __name__ == '__main__':
@@ -21,8 +22,20 @@ if __name__ == '__main__':
                         choices=(StrToBool.true_str_list() + StrToBool.false_str_list()),
                         required=True, help='Lコースの場合Trueに、Rコースの場合Falseを設定する')
     parser.add_argument('--robot-ip', type=str, required=True, help='走行体のIPアドレス')
+    parser.add_argument('--strategy', type=str, choices=GamePlanner.STRATEGIES, default="greedy",
+                        help='ゲーム攻略の計画の戦略(exactの場合は運搬順と設置先を厳密に最適化する. '
+                             'exactは計画に10秒以上かかることがあるため、計画ライブラリの作成など'
+                             '競技外での利用に限る. 競技では制限時間を守るanytimeを用いる)')
+    parser.add_argument('--time-limit', type=float, default=1.0,
+                        help='anytime戦略の場合の計画の制限時間[s]')
+    parser.add_argument('--frame-num', type=int, default=1,
+                        help='ブロックの色を求めるために用いる画像の最大数(複数の場合は多数決で求める)')
+    parser.add_argument('--recalibrate', action='store_true',
+                        help='保存したキャリブレーションプロファイルを用いずにGUIから座標を取得する')
     args = parser.parse_args()
-    cs = CameraSystem(is_left_course=StrToBool.convert(args.is_left), robot_ip=args.robot_ip)
+    cs = CameraSystem(is_left_course=StrToBool.convert(args.is_left), robot_ip=args.robot_ip,
+                      strategy=args.strategy, time_limit=args.time_limit,
+                      frame_num=args.frame_num, recalibrate=args.recalibrate)
     print('Will Run on the %s Course.' % "Left" if args.is_left else "Right")
 
     # 計画を開始する
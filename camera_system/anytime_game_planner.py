@@ -0,0 +1,254 @@
+"""時間制限付きのゲーム攻略計画モジュール.
+
+貪欲法の計画を初期解とし、制限時間まで運搬順と設置先を変更して合計コストを改善する
+@author: miyashita64
+"""
+
+import random
+import time
+from typing import Dict, Iterator, List, Tuple
+from robot import Robot
+from coordinate import Coordinate
+from node import Node
+from game_state import GameState
+from block_selector import BlockSelector
+from game_motion_decider import GameMotionDecider
+from optimal_motion_searcher import OptimalMotionSearcher
+from composite_game_motion import CompositeGameMotion
+
+
+class AnytimeGamePlanner:
+    """制限時間まで計画を改善し続ける計画クラス.
+
+    計画は(運搬するブロックのID, 設置先ノードの番号 y*7 + x)の運搬の列で表す.
+    貪欲法の計画から始め、運搬の入れ替え・挿入と設置先の変更による近傍のうち、
+    合計コストが小さくなる計画が見つかるたびに採用する(山登り法).
+    局所最適に達した場合は、最良の計画をランダムに変更した計画から探索をやり直す(反復局所探索).
+    運搬ごとに走行体とゲーム状態を保持しておき、変更した運搬以降のみを再評価する.
+
+    Attributes:
+        __PERTURBATION_NUM (int): 探索をやり直す時に最良の計画に加える変更の数
+    """
+
+    __PERTURBATION_NUM = 2
+
+    @classmethod
+    def plan(cls, robot: Robot, game_state: GameState,
+             time_limit: float) -> Tuple[List[CompositeGameMotion], Dict[str, object]]:
+        """制限時間内で合計コストが最小となる全てのブロックの運搬動作を求める.
+
+        制限時間を過ぎても、貪欲法の計画は必ず求める.
+
+        Args:
+            robot: 計画開始時の走行体(動作完了時の状態に更新する)
+            game_state: 計画開始時のゲーム状態
+            time_limit: 計画の制限時間[s]
+        Returns:
+            運搬動作を実現するゲーム動作群のリスト: List[CompositeGameMotion]
+            合計コスト、所要時間、評価した計画数、改善の推移(経過時間[s], 合計コスト)のリスト
+            : Dict[str, object]
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + time_limit
+
+        # 貪欲法の計画を初期解とする
+        steps = cls.__plan_greedy(robot, game_state)
+        best_cost = cls.__get_total_cost(steps)
+        trajectory = [(time.perf_counter() - start_time, best_cost)]
+        print("Anytime planning started from the greedy plan (cost %.4f) at %.3f s." %
+              (best_cost, trajectory[-1][0]))
+
+        evaluation_count = 0
+        best_steps = steps
+        random_generator = random.Random(0)
+        while time.perf_counter() < deadline:
+            # 現在の計画の近傍から、合計コストが小さくなる計画を探す
+            current_cost = cls.__get_total_cost(steps)
+            next_steps = None
+            current_sequence = [(block_id, slot_id)
+                                for block_id, slot_id, _, _, _, _, _ in steps]
+            for sequence, change_index in cls.__generate_neighbors(current_sequence, game_state):
+                if time.perf_counter() >= deadline:
+                    break
+                evaluation_count += 1
+                next_steps = cls.__evaluate(robot, game_state, steps, sequence, change_index,
+                                            current_cost, deadline)
+                if next_steps is not None:
+                    break
+            if next_steps is not None:
+                steps = next_steps
+                # 最良の計画を更新した場合、改善の推移を記録する
+                if cls.__get_total_cost(steps) < best_cost:
+                    best_steps = steps
+                    best_cost = cls.__get_total_cost(steps)
+                    trajectory.append((time.perf_counter() - start_time, best_cost))
+                    print("Anytime planning improved the cost to %.4f at %.3f s." %
+                          (best_cost, trajectory[-1][0]))
+                continue
+            # 局所最適に達した場合、最良の計画をランダムに変更した計画から探索をやり直す
+            steps = None
+            while steps is None and best_steps != [] and time.perf_counter() < deadline:
+                sequence = [(block_id, slot_id) for block_id, slot_id, _, _, _, _, _ in best_steps]
+                for _ in range(cls.__PERTURBATION_NUM):
+                    sequence, _ = random_generator.choice(
+                        list(cls.__generate_neighbors(sequence, game_state)))
+                evaluation_count += 1
+                steps = cls.__evaluate(robot, game_state, best_steps, sequence, 0,
+                                       float("inf"), deadline)
+            if steps is None:
+                break
+
+        game_motions_list = []
+        for _, _, get_game_motion, set_game_motion, _, _, _ in best_steps:
+            game_motions_list += [get_game_motion, set_game_motion]
+        # 動作を実行したとして、走行体を更新する
+        if best_steps != []:
+            last_robot = best_steps[-1][4]
+            robot.coord = last_robot.coord
+            robot.direct = last_robot.direct
+            robot.edge = last_robot.edge
+        stats = {"cost": best_cost, "time": time.perf_counter() - start_time,
+                 "evaluations": evaluation_count, "trajectory": trajectory}
+        return game_motions_list, stats
+
+    @classmethod
+    def __plan_greedy(cls, robot: Robot, game_state: GameState) -> List[tuple]:
+        """貪欲法で計画し、運搬ごとの結果を求める.
+
+        Args:
+            robot: 計画開始時の走行体
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            運搬ごとの(ブロックのID, 設置先ノードの番号, ブロック取得動作, ブロック設置動作,
+            運搬後の走行体, 運搬後のゲーム状態, 運搬後までの合計コスト)のリスト: List[tuple]
+        """
+        steps = []
+        current_robot = cls.__copy_robot(robot)
+        total_cost = 0
+        block_selector = BlockSelector()
+        while game_state.get_no_transported_block() != []:
+            block_id = block_selector.select_block(current_robot, game_state).block_id
+            game_motions, game_state = GameMotionDecider.decide_with_state(
+                current_robot, block_id, game_state)
+            get_game_motion, set_game_motion = game_motions
+            # 動作が探索できなかった運搬を含む計画は、どの計画よりもコストが大きいとみなす
+            if get_game_motion.get_cost() == 0 or set_game_motion.get_cost() == 0:
+                total_cost = float("inf")
+            total_cost += get_game_motion.get_cost() + set_game_motion.get_cost()
+            steps.append((block_id, game_state.block_ids.index(block_id), get_game_motion,
+                          set_game_motion, cls.__copy_robot(current_robot), game_state, total_cost))
+        return steps
+
+    @staticmethod
+    def __generate_neighbors(sequence: List[Tuple[int, int]],
+                             game_state: GameState) -> Iterator[Tuple[List[Tuple[int, int]], int]]:
+        """運搬の列の近傍を生成する.
+
+        Args:
+            sequence: 運搬の列
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            (近傍の運搬の列, 変更した最初の運搬の番号): Iterator[Tuple[List[Tuple[int, int]], int]]
+        """
+        used_slot_ids = {slot_id for _, slot_id in sequence}
+        for i, (block_id, slot_id) in enumerate(sequence):
+            # 設置先を空いている別の設置先に変更する
+            block_color = game_state.block_color_list[block_id]
+            for candidate_node in game_state.get_candidate_node(block_color):
+                candidate_id = candidate_node.coord.y * 7 + candidate_node.coord.x
+                if candidate_id not in used_slot_ids:
+                    yield sequence[:i] + [(block_id, candidate_id)] + sequence[i + 1:], i
+            for j in range(i + 1, len(sequence)):
+                # 運搬の順番を入れ替える
+                swapped_sequence = sequence[:]
+                swapped_sequence[i], swapped_sequence[j] = sequence[j], sequence[i]
+                yield swapped_sequence, i
+                # 同じ色のブロックの設置先を入れ替える
+                other_block_id, other_slot_id = sequence[j]
+                if game_state.block_color_list[other_block_id] == block_color:
+                    swapped_sequence = sequence[:]
+                    swapped_sequence[i] = (block_id, other_slot_id)
+                    swapped_sequence[j] = (other_block_id, slot_id)
+                    yield swapped_sequence, i
+        # 運搬を別の順番に挿入する(隣接する運搬の入れ替えと同じものは除く)
+        for i in range(len(sequence)):
+            for j in range(len(sequence)):
+                if abs(i - j) <= 1:
+                    continue
+                inserted_sequence = sequence[:i] + sequence[i + 1:]
+                inserted_sequence.insert(j, sequence[i])
+                yield inserted_sequence, min(i, j)
+
+    @classmethod
+    def __evaluate(cls, robot: Robot, game_state: GameState, steps: List[tuple],
+                   sequence: List[Tuple[int, int]], change_index: int, best_cost: float,
+                   deadline: float) -> List[tuple]:
+        """運搬の列を評価し、合計コストが改善する場合は運搬ごとの結果を求める.
+
+        変更した最初の運搬より前の結果は、現在の計画のものを再利用する.
+
+        Args:
+            robot: 計画開始時の走行体
+            game_state: 計画開始時のゲーム状態
+            steps: 現在の計画の運搬ごとの結果
+            sequence: 評価する運搬の列
+            change_index: 変更した最初の運搬の番号
+            best_cost: 現在の計画の合計コスト
+            deadline: 計画の期限(time.perf_counter()の値)
+        Returns:
+            運搬ごとの結果(合計コストが改善しない場合や期限を過ぎた場合はNone): List[tuple]
+        """
+        next_steps = steps[:change_index]
+        if next_steps != []:
+            _, _, _, _, current_robot, game_state, total_cost = next_steps[-1]
+        else:
+            current_robot, total_cost = robot, 0
+        for block_id, slot_id in sequence[change_index:]:
+            if time.perf_counter() >= deadline:
+                return None
+            # ブロック取得動作を探索する
+            block_node_id = game_state.block_ids.index(block_id)
+            on_block_node = Node(block_id, Coordinate(block_node_id % 7, block_node_id // 7))
+            get_robot = cls.__copy_robot(current_robot)
+            get_game_motion = OptimalMotionSearcher.search(get_robot, on_block_node, game_state,
+                                                           verbose=False)
+            if get_game_motion.get_cost() == 0:
+                return None
+            # ブロック設置動作を探索する
+            set_robot = cls.__copy_robot(get_robot)
+            set_block_node = Node(-1, Coordinate(slot_id % 7, slot_id // 7))
+            set_game_motion = OptimalMotionSearcher.search(set_robot, set_block_node, game_state,
+                                                           verbose=False)
+            if set_game_motion.get_cost() == 0:
+                return None
+            total_cost += get_game_motion.get_cost() + set_game_motion.get_cost()
+            # 合計コストが現在の計画以上になった時点で打ち切る
+            if total_cost >= best_cost:
+                return None
+            game_state = game_state.move_block(block_id, set_block_node)
+            current_robot = set_robot
+            next_steps.append((block_id, slot_id, get_game_motion, set_game_motion,
+                               current_robot, game_state, total_cost))
+        return next_steps
+
+    @staticmethod
+    def __get_total_cost(steps: List[tuple]) -> float:
+        """計画の合計コストを取得する.
+
+        Args:
+            steps: 運搬ごとの結果
+        Returns:
+            合計コスト: float
+        """
+        return steps[-1][6] if steps != [] else 0
+
+    @staticmethod
+    def __copy_robot(robot: Robot) -> Robot:
+        """走行体を複製する.
+
+        Args:
+            robot: 走行体
+        Returns:
+            複製した走行体: Robot
+        """
+        return Robot(Coordinate(robot.coord.x, robot.coord.y), robot.direct, robot.edge)
@@ -4,7 +4,7 @@
 @author mutotaka0426
 """
 
-from game_area_info import GameAreaInfo
+from game_state import GameState
 from robot import Robot
 from coordinate import Coordinate
 from node import Node
@@ -13,16 +13,19 @@ from node import Node
 class BlockSelector:
     """運搬ブロック決定クラス."""
 
-    def select_block(self, robot: Robot) -> Node:
-        """ゲームエリア情報を基に次に運搬するブロックを返す.
+    def select_block(self, robot: Robot, game_state: GameState = None) -> Node:
+        """ゲーム状態を基に次に運搬するブロックを返す.
 
         Args:
             robot: 現在の走行体の状態
+            game_state: ゲーム状態(省略時はゲームエリア情報から生成する)
 
         Returns:
             Node: 次に運搬するブロックを持つノード
         """
-        cand_nodes = GameAreaInfo.get_no_transported_block()  # ブロックID順に候補ブロックを持つノードを格納
+        if game_state is None:
+            game_state = GameState.from_game_area_info()
+        cand_nodes = game_state.get_no_transported_block()  # ブロックID順に候補ブロックを持つノードを格納
 
         # 優先順位1: 走行体からのマンハッタン距離が小さいブロック
         if len(cand_nodes) > 1:  # 候補が複数ある場合
@@ -38,7 +41,7 @@ class BlockSelector:
             # ボーナスブロックと同じ色のブロックを持つノードに絞り込む
             double_up_nodes = [
                 node for node in cand_nodes
-                if GameAreaInfo.block_color_list[node.block_id] == GameAreaInfo.bonus_color]
+                if game_state.block_color_list[node.block_id] == game_state.bonus_color]
             # ボーナスブロックと同じ色のブロックがない場合はcand_nodesはそのまま
             if double_up_nodes != []:
                 cand_nodes = double_up_nodes
@@ -48,13 +51,13 @@ class BlockSelector:
             # 設置先までのマンハッタン距離が最も小さいブロックを求める
             min_distance = min([self.__calculate_distance(node.coord, destination.coord)
                                 for node in cand_nodes
-                                for destination in GameAreaInfo.get_candidate_node(
-                                    GameAreaInfo.block_color_list[node.block_id])])
+                                for destination in game_state.get_candidate_node(
+                                    game_state.block_color_list[node.block_id])])
             # 設置先までのマンハッタン距離が最も小さいブロックを持つノードに絞り込む
             cand_nodes = [node for node in cand_nodes
                           for destination
-                          in GameAreaInfo.get_candidate_node(
-                              GameAreaInfo.block_color_list[node.block_id])
+                          in game_state.get_candidate_node(
+                              game_state.block_color_list[node.block_id])
                           if min_distance == self.__calculate_distance(
                               node.coord, destination.coord)]
 
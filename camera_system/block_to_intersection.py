@@ -5,6 +5,7 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 from color_changer import Color
 
@@ -12,6 +13,10 @@ from color_changer import Color
 class BlockToIntersection(GameMotion):
     """ブロック置き場→交点のゲーム動作クラス."""
 
+    __slots__ = ("__rotation_angle", "__rotation_pwm", "__rotation_time", "__correction_pwm",
+                 "__direct_rotation", "__target_color", "__can_correction",
+                 "__correction_target_angle", "__motion_time", "__success_rate")
+
     def __init__(self, angle: int, target_color: Color,
                  with_block: bool, can_correction: bool) -> None:
         """BlockToIntersectionのコンストラクタ.
@@ -44,11 +49,15 @@ class BlockToIntersection(GameMotion):
         self.__motion_time = 1.086
         self.__success_rate = 0.78
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """ブロック置き場→交点のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -68,11 +77,12 @@ class BlockToIntersection(GameMotion):
         command_list += "DS,42,70\n"  # 走行体がエッジに乗るまで直進
 
         # エッジ切り替えのコマンドは生成しないが，計算上はエッジをnoneにする
-        self.current_edge = "none"
+        current_edge = "none"
 
-        return command_list.replace("\n", ",ブロック置き場→交点\n", 1)  # 最初の行の末尾に",ブロック置き場→交点"を追加する
+        # 最初の行の末尾に",ブロック置き場→交点"を追加する
+        return command_list.replace("\n", ",ブロック置き場→交点\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """ブロック置き場→交点のゲーム動作のコストを計算するメソッド.
 
         Returns:
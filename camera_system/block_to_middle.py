@@ -5,12 +5,17 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 
 
 class BlockToMiddle(GameMotion):
     """ブロック置き場→中点のゲーム動作クラス."""
 
+    __slots__ = ("__rotation_angle", "__rotation_pwm", "__rotation_time", "__correction_pwm",
+                 "__direct_rotation", "__can_correction", "__correction_target_angle",
+                 "__motion_time", "__success_rate")
+
     def __init__(self, angle: int, with_block: bool, can_correction: bool) -> None:
         """BlockToMiddleのコンストラクタ.
 
@@ -35,11 +40,15 @@ class BlockToMiddle(GameMotion):
         self.__motion_time = 0.8285
         self.__success_rate = 0.62
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """ブロック置き場→中点のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -59,11 +68,12 @@ class BlockToMiddle(GameMotion):
         command_list += "DS,10,70\n"  # 走行体がエッジに乗るまで直進
 
         # エッジ切り替えのコマンドは生成しないが，計算上はエッジをnoneにする
-        self.current_edge = "none"
+        current_edge = "none"
 
-        return command_list.replace("\n", ",ブロック置き場→中点\n", 1)  # 最初の行の末尾に",ブロック置き場→中点"を追加する
+        # 最初の行の末尾に",ブロック置き場→中点"を追加する
+        return command_list.replace("\n", ",ブロック置き場→中点\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """ブロック置き場→中点のゲーム動作のコストを計算するメソッド.
 
         Returns:
@@ -10,9 +10,12 @@
 """
 import numpy as np
 import argparse
+import os
 from color_changer import Color, ColorChanger
 from camera_coordinate_calibrator import CameraCoordinateCalibrator
 from camera_interface import CameraInterface
+from point_detector import PointDetector
+from frame_rectifier import FrameRectifier
 from game_area_info import GameAreaInfo
 
 
@@ -20,16 +23,23 @@ class CameraCalibrator:
     """ゲームエリア認識クラス.
 
     Attributes:
-        __SEARCH_AREA_XSIZE (int): ブロックの色を求めるための領域xサイズ(奇数)
-        __SEARCH_AREA_YSIZE (int): ブロックの色を求めるための領域yサイズ(奇数)
+        __SEARCH_AREA_XSIZE (int): ブロックの色を求めるための領域xサイズ(奇数、カメラ画像での大きさ)
+        __SEARCH_AREA_YSIZE (int): ブロックの色を求めるための領域yサイズ(奇数、カメラ画像での大きさ)
+        __SEARCH_AREA_NODE_RATIO (float): 正面画像でブロックの色を求めるための領域の一辺の長さ
+            (ノードの間隔に対する割合)
         __COLOR_BLOCK_NUM (int): カラーブロックの個数(8個)
         __BASE_BLOCK_NUM (int): ベースエリアブロックの個数(4個)
         __BONUS_BLOCK_NUM (int): ボーナスブロックの個数(1個)
         __VALIDITY_COLOR_NUM (int): カラーブロックに使用されている色の種類の数(赤、黄、緑、青の4種類)
+        __STABLE_FRAME_NUM (int): 複数の画像で色を求める場合に、結果が変わらなければ打ち切る画像の数
+        __PROFILE_COLOR_RATIO (float): プロファイルの座標を用いる場合に、各座標の領域で最も多い色が占める最小の割合
     """
 
     __SEARCH_AREA_XSIZE = 21
     __SEARCH_AREA_YSIZE = 21
+    # 正面画像ではノードの間隔を基準に、どの座標でもブロックの内側に収まる大きさとする
+    # NOTE: テスト画像では、一辺がノードの間隔の約0.25倍までの領域にブロックのみが写る
+    __SEARCH_AREA_NODE_RATIO = 0.2
 
     __COLOR_BLOCK_NUM = 8
     __BASE_BLOCK_NUM = 4
@@ -37,138 +47,284 @@ class CameraCalibrator:
 
     __VALIDITY_COLOR_NUM = 4
 
-    def __init__(self, camera_id: int, cali_img_save_path: str = "cali_course.png") -> None:
+    __STABLE_FRAME_NUM = 3
+
+    __PROFILE_COLOR_RATIO = 0.5
+
+    def __init__(self, camera_id: int, cali_img_save_path: str = "cali_course.png",
+                 profile_directory_path: str = "camera_system/calibration_profiles/") -> None:
         """CameraCalibrationのコンストラクタ.
 
         Args:
             camera_id (int): 撮影カメラ番号
             cali_img_save_path (str): キャリブレーション用画像保存パス
+            profile_directory_path (str): キャリブレーションプロファイルを保存するディレクトリ
         """
         # キャリブレーション用画像の取得
+        self.__camera_id = camera_id
+        self.__profile_directory_path = profile_directory_path
         self.__camera_interface = CameraInterface(camera_id)
         self.__calibration_img = self.__camera_interface.capture_frame(cali_img_save_path)
 
         self.__color_changer = ColorChanger()
         self.__coord = CameraCoordinateCalibrator(self.__calibration_img)
+        self.__rectifier = None  # カメラ画像を正面画像に変換する(座標の取得後に作成する)
 
-        # カラーブロック座標ごとの各色の割合のテーブル(行:各ブロック, 列:各色)
-        self.__color_block_table = np.zeros(
-            CameraCalibrator.__COLOR_BLOCK_NUM*CameraCalibrator.__VALIDITY_COLOR_NUM
-        ).reshape(CameraCalibrator.__COLOR_BLOCK_NUM, CameraCalibrator.__VALIDITY_COLOR_NUM)
+    def start_camera_calibration(self, recalibrate: bool = False) -> None:
+        """カメラキャリブレーションを行う関数.
 
-        # ベースブロック座標ごとの各色の割合のテーブル(行:各ブロック, 列:各色)
-        self.__base_block_table = np.zeros(
-            CameraCalibrator.__BASE_BLOCK_NUM*CameraCalibrator.__VALIDITY_COLOR_NUM
-        ).reshape(CameraCalibrator.__BASE_BLOCK_NUM, CameraCalibrator.__VALIDITY_COLOR_NUM)
+        カメラ番号と解像度が同じ前回のキャリブレーションプロファイルがあり、現在の画像で各座標にブロックが
+        写っている場合は、GUIを開かずにプロファイルの座標を用いる. カメラの位置がずれてブロックが写っていない
+        場合は、プロファイルの座標を手がかりに現在の画像から座標を検出し、信頼度の低い座標のみをGUIから取得する.
+        座標の取得後、座標から正面画像への変換を求め、開始合図の時点の最新の画像をすぐに得られるように
+        画像の連続取得を開始する.
 
-    def start_camera_calibration(self) -> None:
-        """カメラキャリブレーションを行う関数."""
-        # GUIから座標取得
-        self.__coord.show_window()
+        Args:
+            recalibrate (bool): プロファイルを用いずにGUIから座標を取得する場合 True
+        """
+        profile_path = self.__get_profile_path()
+        is_profile_loaded = not recalibrate and profile_path is not None \
+            and self.__coord.load_profile(profile_path)
+        if is_profile_loaded and self.__check_profile():
+            print("Use the calibration profile %s" % profile_path)
+        else:
+            if is_profile_loaded:
+                # プロファイルの座標を手がかりに座標を検出
+                self.__detect_points()
+            if not self.__coord.is_completed():
+                # GUIから座標取得
+                self.__coord.show_window()
+            # 次回のために座標を保存
+            if profile_path is not None and self.__coord.is_completed():
+                self.__coord.save_profile(profile_path)
+        self.__rectifier = self.__make_rectifier()
+        # 画像の連続取得を開始
+        self.__camera_interface.start_capture()
 
     def make_game_area_info(self, is_left_course: bool,
-                            game_save_path: str = "game_course.png") -> None:
+                            game_save_path: str = "game_course.png",
+                            color_save_path: str = None, frame_num: int = 1,
+                            stop_when_stable: bool = True, keep_capturing: bool = False) -> None:
         """ゲームエリア情報作成を行う関数.
 
+        複数の画像を用いる場合は、画像ごとの各領域の色のピクセル数を合計してから色を求める(多数決).
+        正面画像への変換を求めている場合は、各領域を正面画像での領域とし、どの座標でも同じ広さを調べる.
+
         Args:
             is_left_course (bool): 左コースの場合 True. Defaults to True.
             game_save_path (str): ゲームエリア画像保存パス
+            color_save_path (str): 6色画像保存パス(Noneの場合は6色画像を作成しない)
+            frame_num (int): 色を求めるために用いる画像の最大数
+            stop_when_stable (bool): 求めた色が連続して変わらなくなった時点で画像の取得を打ち切るか
+            keep_capturing (bool): 次のゲームエリア情報の作成のために画像の連続取得を続ける場合 True
+        """
+        # ブロックの色を調べる領域の中心座標とサイズ
+        coords = self.__coord.block_point + self.__coord.base_circle + self.__coord.end_point
+        search_area_xsize, search_area_ysize = self.__get_search_area_size()
+        # 領域ごとの各色のピクセル数の合計
+        color_pixel_sums = np.zeros((len(coords), CameraCalibrator.__VALIDITY_COLOR_NUM), np.int64)
+        # 画像を追加するごとに求めた色
+        color_lists = []
+        used_frame_num = 0
+        # 最初は打ち切りを判定できる数の画像をまとめて取得する
+        burst_frame_num = min(frame_num, CameraCalibrator.__STABLE_FRAME_NUM)
+        while used_frame_num < frame_num:
+            # ゲームエリア画像を取得(最初の画像のみ保存する)
+            game_area_imgs = self.__camera_interface.capture_frames(
+                burst_frame_num, game_save_path if used_frame_num == 0 else None)
+            if game_area_imgs == []:
+                break
+            if used_frame_num == 0 and color_save_path is not None:
+                # 確認用に画像全体を6色変換する
+                self.__color_changer.change_color(game_area_imgs[0], color_save_path)
+            # ブロックの色を調べる領域のみを6色変換し、各色のピクセル数を数える
+            if self.__rectifier is not None:
+                frame_color_pixel_sums = ColorChanger.count_pixel_colors(
+                    self.__rectifier.sample_windows(game_area_imgs, search_area_xsize,
+                                                    search_area_ysize))
+            else:
+                frame_color_pixel_sums = ColorChanger.count_window_colors(
+                    game_area_imgs, coords, search_area_xsize, search_area_ysize)
+            for frame_color_pixel_sum in frame_color_pixel_sums:
+                color_pixel_sums += frame_color_pixel_sum
+                used_frame_num += 1
+                color_lists.append(self.__decide_colors(
+                    color_pixel_sums, search_area_xsize*search_area_ysize*used_frame_num))
+            # 直近の画像で求めた色が全て同じ場合は打ち切る
+            recent_color_lists = color_lists[-CameraCalibrator.__STABLE_FRAME_NUM:]
+            if stop_when_stable and len(recent_color_lists) == CameraCalibrator.__STABLE_FRAME_NUM \
+                    and all(color_list == recent_color_lists[0]
+                            for color_list in recent_color_lists):
+                break
+            burst_frame_num = 1
+        # 確認のために連続取得の状況を出力(画像ごとに出力すると色を求める処理が遅れるため1回のみ)
+        capture_stats = self.__camera_interface.get_capture_stats()
+        print("Capture %.1f fps, frame age %.1f ms" % (capture_stats["fps"],
+                                                       capture_stats["age"] * 1000))
+        # 以降は画像を用いない場合は、連続取得を終了
+        if not keep_capturing:
+            self.__camera_interface.stop_capture()
+        if color_lists == []:
+            print("画像を取得できなかったため、ゲームエリア情報を作成できませんでした")
+            return
+        print("Decide colors with %d frames" % used_frame_num)
+        block_color_list, base_color_list, bonus_color = color_lists[-1]
+
+        # ゲームエリア情報を作成
+        GameAreaInfo.block_color_list = [Color(block_color) for block_color in block_color_list]
+        GameAreaInfo.base_color_list = [Color(base_color) for base_color in base_color_list]
+        GameAreaInfo.bonus_color = Color(bonus_color)
+
+        # 確認のためにゲームエリア情報を出力
+        print("Color Block\n", GameAreaInfo.block_color_list)
+        print("Base Block\n", GameAreaInfo.base_color_list)
+        print("Bonus Block\n", GameAreaInfo.bonus_color)
+
+        # コースに応じて交点の色をセットする
+        if is_left_course:
+            GameAreaInfo.intersection_list = [Color.RED, Color.BLUE, Color.YELLOW, Color.GREEN]
+        else:
+            GameAreaInfo.intersection_list = [Color.BLUE, Color.RED, Color.GREEN, Color.YELLOW]
+
+    def stop_capture(self) -> None:
+        """画像の連続取得を終了する."""
+        self.__camera_interface.stop_capture()
+
+    def __get_search_area_size(self) -> tuple:
+        """ブロックの色を調べる領域のサイズを求める.
+
+        Returns:
+            tuple: 領域のxサイズ, 領域のyサイズ(正面画像への変換を求めている場合は正面画像での大きさ)
         """
-        # ゲームエリア画像を取得
-        game_area_img = self.__camera_interface.capture_frame(game_save_path)
+        if self.__rectifier is None:
+            return CameraCalibrator.__SEARCH_AREA_XSIZE, CameraCalibrator.__SEARCH_AREA_YSIZE
+        search_area_size = FrameRectifier.node_length_to_window_size(
+            CameraCalibrator.__SEARCH_AREA_NODE_RATIO)
+        return search_area_size, search_area_size
 
-        # 6色変換
-        color_save_path = "color_" + game_save_path
-        self.__color_changer.change_color(game_area_img, color_save_path)
+    def __get_profile_path(self) -> str:
+        """カメラ番号と解像度に対応するキャリブレーションプロファイルのパスを求める.
 
+        Returns:
+            str: プロファイルのパス(キャリブレーション用画像がない場合はNone)
+        """
+        if self.__calibration_img is None:
+            return None
+        img_height, img_width = self.__calibration_img.shape[:2]
+        return os.path.join(self.__profile_directory_path, "camera%d_%dx%d.json" % (
+            self.__camera_id, img_width, img_height))
+
+    def __make_rectifier(self) -> FrameRectifier:
+        """取得した座標から、カメラ画像を正面画像に変換するFrameRectifierを作成する.
+
+        Returns:
+            FrameRectifier: 正面画像への変換(座標が揃っていない、または変換を求められない場合はNone)
+        """
+        if self.__calibration_img is None or not self.__coord.is_completed():
+            return None
+        coords = self.__coord.block_point + self.__coord.base_circle + self.__coord.end_point
+        img_height, img_width = self.__calibration_img.shape[:2]
+        try:
+            return FrameRectifier(coords, (img_width, img_height))
+        except ValueError as e:
+            print("[Warning] 正面画像に変換せずにブロックの色を求めます (%s)" % e)
+            return None
+
+    def __check_profile(self) -> bool:
+        """プロファイルの各座標の領域に、ブロックが写っているかを確認する.
+
+        ブロックの色は走行ごとに変わるため、各領域で最も多い色(赤、黄、緑、青)が十分な割合を占めるかを確認する.
+
+        Returns:
+            bool: 全ての座標の領域にブロックが写っている場合 True
+        """
+        coords = self.__coord.block_point + self.__coord.base_circle + self.__coord.end_point
+        color_pixel_sums = ColorChanger.count_window_colors(
+            [self.__calibration_img], coords,
+            CameraCalibrator.__SEARCH_AREA_XSIZE, CameraCalibrator.__SEARCH_AREA_YSIZE)[0]
+        area_pixel_sum = CameraCalibrator.__SEARCH_AREA_XSIZE*CameraCalibrator.__SEARCH_AREA_YSIZE
+        color_ratios = color_pixel_sums.max(axis=1) / area_pixel_sum
+        if np.all(color_ratios >= CameraCalibrator.__PROFILE_COLOR_RATIO):
+            return True
+        missing_coords = [coords[i] for i in np.flatnonzero(
+            color_ratios < CameraCalibrator.__PROFILE_COLOR_RATIO)]
+        print("[Warning] プロファイルの座標%sにブロックが見つかりません" % missing_coords)
+        return False
+
+    def __detect_points(self) -> None:
+        """現在の座標を参照座標として、キャリブレーション用画像から座標を検出する.
+
+        信頼度の低い座標は未取得とし、GUIから取得する.
+        """
+        reference_points = self.__coord.block_point + self.__coord.base_circle \
+            + self.__coord.end_point
+        points, confidences = PointDetector(reference_points).detect(self.__calibration_img)
+        detected_points = [point if confidence >= PointDetector.CONFIDENCE_THRESHOLD else None
+                           for point, confidence in zip(points, confidences)]
+        self.__coord.set_points(detected_points)
+        print("Detect %d/%d points from the calibration image" % (
+            len(detected_points) - detected_points.count(None), len(detected_points)))
+
+    @staticmethod
+    def __decide_colors(color_pixel_sums: np.ndarray, area_pixel_sum: int) -> tuple:
+        """領域ごとの各色のピクセル数から、各ブロックの色IDを求める.
+
+        Args:
+            color_pixel_sums (ndarray): 領域(カラーブロック置き場、ベースサークル、端点サークルの順)ごとの
+                各色(赤、黄、緑、青)のピクセル数の合計
+            area_pixel_sum (int): 各領域のピクセル数を、ピクセル数を合計した画像の数の分だけ合計した値
+
+        Returns:
+            tuple: カラーブロックの色IDのリスト, ベースブロックの色IDのリスト, ボーナスブロックの色ID
+        """
         # 色IDを格納する配列を宣言
         block_color_list = [0] * CameraCalibrator.__COLOR_BLOCK_NUM
         base_color_list = [0] * CameraCalibrator.__BASE_BLOCK_NUM
-        bonus_color = [0] * CameraCalibrator.__BONUS_BLOCK_NUM
 
-        # ブロックの色を調べる領域のピクセル数を求める
-        area_pixel_sum = CameraCalibrator.__SEARCH_AREA_XSIZE*CameraCalibrator.__SEARCH_AREA_YSIZE
+        # 色を求める際に領域に対する割合で比較できるように、各色のピクセル数÷全体のピクセル数とする
+        # カラーブロック座標ごとの各色の割合のテーブル(行:各ブロック, 列:各色)
+        color_block_table = color_pixel_sums[:CameraCalibrator.__COLOR_BLOCK_NUM] / area_pixel_sum
+        # ベースブロック座標ごとの各色の割合のテーブル(行:各ブロック, 列:各色)
+        base_block_table = color_pixel_sums[
+            CameraCalibrator.__COLOR_BLOCK_NUM:
+            CameraCalibrator.__COLOR_BLOCK_NUM+CameraCalibrator.__BASE_BLOCK_NUM] / area_pixel_sum
 
         # ブロック置き場上のカラーブロックの色IDを求める
-        for i, point in enumerate(self.__coord.block_point):
-            # ブロック上の領域に存在する色の種類とピクセル数を取得
-            color_uniqs, color_pixel_sum = self.__color_changer.search_color(
-                point[0],  # GUIで取得したx座標
-                point[1],  # GUIで取得したy座標
-                CameraCalibrator.__SEARCH_AREA_XSIZE,  # ブロックの色を求めるための領域xサイズ
-                CameraCalibrator.__SEARCH_AREA_YSIZE)  # ブロックの色を求めるための領域yサイズ
-            """
-            色の種類とピクセル数を配列に格納
-            第2引数はindexと色IDを合わせるために-1
-            第3引数は色を求める際に領域に対する割合で比較できるように各色のピクセル数÷全体のピクセル数
-            """
-            np.put(self.__color_block_table[i], color_uniqs-1,
-                   color_pixel_sum/area_pixel_sum)
         # 認識したブロックの数を把握するための配列
         color_count = np.zeros(CameraCalibrator.__VALIDITY_COLOR_NUM)  # (赤、黄、緑、青)
         # 各ブロックの領域に対する色の割合が高い順に色IDを割り振る
         for _ in range(CameraCalibrator.__COLOR_BLOCK_NUM):
             # 配列の最大値のインデックス(ブロックのインデックス,　色のインデックス)を取得
             max_index = np.unravel_index(
-                np.argmax(self.__color_block_table), self.__color_block_table.shape)
+                np.argmax(color_block_table), color_block_table.shape)
             # ブロックに対する色IDを格納する
             block_color_list[max_index[0]] = max_index[1]+1  # indexと色IDを合わせるために+1
             # 認識した色をカウント
             color_count[max_index[1]] += 1
             # 2回認識した色を候補から外す(優先順位を小さくする)
             if color_count[max_index[1]] == 2:
-                self.__color_block_table[:, max_index[1]] = -1
+                color_block_table[:, max_index[1]] = -1
             # 色の判別が終わったブロックを候補から外す
-            self.__color_block_table[max_index[0], :] = -1
+            color_block_table[max_index[0], :] = -1
 
         # ベースサークル上のブロックの色IDを求める
-        for i, base in enumerate(self.__coord.base_circle):
-            # ブロック上の領域に存在する色の種類とピクセル数を取得
-            color_uniqs, color_pixel_sum = self.__color_changer.search_color(
-                base[0],  # GUIで取得したx座標
-                base[1],  # GUIで取得したy座標
-                CameraCalibrator.__SEARCH_AREA_XSIZE,  # ブロックの色を求めるための領域xサイズ
-                CameraCalibrator.__SEARCH_AREA_YSIZE)  # ブロックの色を求めるための領域yサイズ
-            # 色の種類とピクセル数を配列に格納
-            np.put(self.__base_block_table[i], color_uniqs-1,
-                   color_pixel_sum/area_pixel_sum)
         # 各ブロックの領域に対する色の割合が高い順に色IDを割り振る
         for _ in range(CameraCalibrator.__BASE_BLOCK_NUM):
             # 配列の最大値のインデックス(ブロックのインデックス,　色のインデックス)を取得
             max_index = np.unravel_index(
-                np.argmax(self.__base_block_table), self.__base_block_table.shape)
+                np.argmax(base_block_table), base_block_table.shape)
             # ブロックに対する色IDを格納する
             base_color_list[max_index[0]] = max_index[1]+1  # indexと色IDを合わせるために+1
             # 認識した色を候補から外す
-            self.__base_block_table[:, max_index[1]] = -1
+            base_block_table[:, max_index[1]] = -1
             # 色の判別が終わったブロックを候補から外す
-            self.__base_block_table[max_index[0], :] = -1
+            base_block_table[max_index[0], :] = -1
 
         # ボーナスブロックの色IDを求める
-        # ブロック上の領域に存在する色の種類とピクセル数を取得
-        color_uniqs, color_pixel_sum = self.__color_changer.search_color(
-            self.__coord.end_point[0][0],  # GUIで取得したx座標
-            self.__coord.end_point[0][1],  # GUIで取得したy座標
-            CameraCalibrator.__SEARCH_AREA_XSIZE,  # ブロックの色を求めるための領域xサイズ
-            CameraCalibrator.__SEARCH_AREA_YSIZE)  # ブロックの色を求めるための領域yサイズ
         # ボーナスブロックはピクセル数の多い色にする(1個しかないから)
-        bonus_color = color_uniqs[np.argmax(color_pixel_sum)]
+        bonus_color = np.argmax(color_pixel_sums[-1])+1  # indexと色IDを合わせるために+1
 
-        # ゲームエリア情報を作成
-        GameAreaInfo.block_color_list = [Color(block_color) for block_color in block_color_list]
-        GameAreaInfo.base_color_list = [Color(base_color) for base_color in base_color_list]
-        GameAreaInfo.bonus_color = Color(bonus_color)
-
-        # 確認のためにゲームエリア情報を出力
-        print("Color Block\n", GameAreaInfo.block_color_list)
-        print("Base Block\n", GameAreaInfo.base_color_list)
-        print("Bonus Block\n", GameAreaInfo.bonus_color)
-
-        # コースに応じて交点の色をセットする
-        if is_left_course:
-            GameAreaInfo.intersection_list = [Color.RED, Color.BLUE, Color.YELLOW, Color.GREEN]
-        else:
-            GameAreaInfo.intersection_list = [Color.BLUE, Color.RED, Color.GREEN, Color.YELLOW]
+        return block_color_list, base_color_list, bonus_color
 
 
 if __name__ == "__main__":
@@ -180,6 +336,8 @@ if __name__ == "__main__":
                                      formatter_class=argparse.RawTextHelpFormatter)
 
     parser.add_argument("-id", "--camera-id", type=int, help="カメラキャリブレーションを開始する")
+    parser.add_argument("--recalibrate", action="store_true",
+                        help="保存した座標を用いずにGUIから座標を取得する")
     args = parser.parse_args()
 
     # カメラIDがない時、接続されているカメラを取得し、表示する
@@ -189,8 +347,8 @@ if __name__ == "__main__":
 
     camera_calibration = CameraCalibrator(camera_id=args.camera_id)
     # カメラキャリブレーションを行う
-    camera_calibration.start_camera_calibration()
+    camera_calibration.start_camera_calibration(args.recalibrate)
     # ゲームエリア情報作成を行う
-    camera_calibration.make_game_area_info(True)
+    camera_calibration.make_game_area_info(True, color_save_path="color_game_course.png")
 
     print("CameraCalibrator 終了")
@@ -12,13 +12,25 @@
 """
 
 import cv2
+import json
+import os
 import tkinter as tk
 from PIL import Image, ImageTk
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 
 class CameraCoordinateCalibrator:
-    """カメラ画像から座標を取得するクラス."""
+    """カメラ画像から座標を取得するクラス.
+
+    Attributes:
+        __BLOCK_POINT_NUM (int): ブロック置き場の座標の数
+        __BASE_CIRCLE_NUM (int): ベースサークルの座標の数
+        __END_POINT_NUM (int): 端点サークルの座標の数
+    """
+
+    __BLOCK_POINT_NUM = 8
+    __BASE_CIRCLE_NUM = 4
+    __END_POINT_NUM = 1
 
     def __init__(self, img: cv2.Mat) -> None:
         """CameraCoordinateCalibratorのコンストラクタ.
@@ -27,13 +39,18 @@ class CameraCoordinateCalibrator:
             img (cv2.Mat): 画像データ
         """
         # メンバを初期化する
-        self.__block_point = []  # ブロック置き場の座標リスト
-        self.__base_circle = []  # ベースサークルの座標リスト
-        self.__end_point = []  # 端点サークルの座標リスト
+        # ブロック置き場、ベースサークル、端点サークルの順の座標リスト(未取得の座標はNone)
+        self.__points = [None] * (CameraCoordinateCalibrator.__BLOCK_POINT_NUM
+                                  + CameraCoordinateCalibrator.__BASE_CIRCLE_NUM
+                                  + CameraCoordinateCalibrator.__END_POINT_NUM)
+        self.__input_indexes = []  # GUIで取得した座標の番号リスト(取得順)
         self.__calibration_img = img
 
     def show_window(self) -> None:
-        """画像取得ツールを起動する関数."""
+        """画像取得ツールを起動する関数.
+
+        set_pointsで座標をセットしている場合は、未取得の座標のみを取得する.
+        """
         # 画像情報を取得する
         img_height = self.__calibration_img.shape[0]  # 画像の高さ
         img_width = self.__calibration_img.shape[1]  # 画像の横幅
@@ -48,6 +65,10 @@ class CameraCoordinateCalibrator:
         self.__message = tk.Message(self.__window, text="", font=("", 10), bg="#ddd", aspect=500)
         # Messageを配置する
         self.__message.place(x=img_width+10, y=150, width=180)
+        # セット済みの座標を表示する
+        for i, point in enumerate(self.__points):
+            if point is not None:
+                self.__message["text"] += "%s:(%d,%d)\n" % (self.__get_point_name(i), *point)
 
         # OpenCVで取得した画像を変換する
         img_rgb = cv2.cvtColor(self.__calibration_img, cv2.COLOR_BGR2RGB)  # imreadはBGRなのでRGBに変換
@@ -84,29 +105,19 @@ class CameraCoordinateCalibrator:
     def __set_coordinate(self, event) -> None:
         """マウス操作で取得した座標を各座標リストにセットするコールバック関数.
 
+        ブロック置き場(8個)、ベースサークル(4個)、端点サークル(1個)の順に、未取得の座標を取得する.
+
         Args:
             event: マウスイベント
         """
-        # 最初の8クリックはブロック置き場の座標を取得する
-        if len(self.__block_point) < 8:
-            # Messageを更新.
-            self.__message["text"] += "ブロック置き場%d:(%d,%d)\n" % (
-                len(self.__block_point)+1, event.x, event.y)
-            self.__block_point.append((event.x, event.y))
-        # 次の4クリックはベースサークルの座標を取得する
-        elif len(self.__base_circle) < 4:
-            # Messageを更新
-            self.__message["text"] += "ベースサークル%d:(%d,%d)\n" % (
-                len(self.__base_circle)+1, event.x, event.y)
-            self.__base_circle.append((event.x, event.y))
-        # 最後の1クリックは端点サークルの座標を取得する
-        elif len(self.__end_point) < 1:
-            # Messageを更新.
-            self.__message["text"] += "端点サークル:(%d,%d)\n" % (
-                event.x, event.y)
-            self.__end_point.append((event.x, event.y))
-        else:
+        if self.is_completed():
             print('[Warning] 座標入力を完了しています')
+            return
+        i = self.__points.index(None)
+        # Messageを更新
+        self.__message["text"] += "%s:(%d,%d)\n" % (self.__get_point_name(i), event.x, event.y)
+        self.__points[i] = (event.x, event.y)
+        self.__input_indexes.append(i)
 
     def __reset_previous_coordinate(self, event) -> None:
         """直前の操作を取り消すボタンで入力座標の削除とメッセージを削除するコールバック関数.
@@ -114,18 +125,29 @@ class CameraCoordinateCalibrator:
         Args:
             event: リセットボタンのクリックイベント
         """
-        if len(self.__end_point) != 0:
-            self.__end_point.pop()
-            self.__remove_tail_message_line()
-        elif len(self.__base_circle) != 0:
-            self.__base_circle.pop()
-            self.__remove_tail_message_line()
-        elif len(self.__block_point) != 0:
-            self.__block_point.pop()
+        if len(self.__input_indexes) != 0:
+            self.__points[self.__input_indexes.pop()] = None
             self.__remove_tail_message_line()
         else:
             print("[Warning] 取り消すべき操作がありません")
 
+    @staticmethod
+    def __get_point_name(index: int) -> str:
+        """座標の番号から表示用の座標の名前を求める関数.
+
+        Args:
+            index (int): 座標の番号
+
+        Returns:
+            str: 座標の名前
+        """
+        if index < CameraCoordinateCalibrator.__BLOCK_POINT_NUM:
+            return "ブロック置き場%d" % (index+1)
+        index -= CameraCoordinateCalibrator.__BLOCK_POINT_NUM
+        if index < CameraCoordinateCalibrator.__BASE_CIRCLE_NUM:
+            return "ベースサークル%d" % (index+1)
+        return "端点サークル"
+
     def __remove_tail_message_line(self) -> None:
         """最終行のメッセージを削除する関数."""
         # 末尾の改行文字を除いた改行文字の位置を末尾から検索する
@@ -139,12 +161,74 @@ class CameraCoordinateCalibrator:
         Args:
             event: OKボタンのクリックイベント
         """
-        if len(self.__block_point) == 8 and len(self.__base_circle) == 4 and len(self.__end_point) == 1:  # noqa
+        if self.is_completed():
             # ウィンドウを閉じる
             self.__window.destroy()
         else:
             print("[Warning] 未入力の座標があります")
 
+    def is_completed(self) -> bool:
+        """全ての座標を取得したかを判定する関数.
+
+        Returns:
+            bool: 全ての座標を取得した場合 True
+        """
+        return None not in self.__points
+
+    def set_points(self, points: List[Optional[Tuple[int, int]]]) -> None:
+        """自動で検出した座標などをセットする関数.
+
+        Args:
+            points (List[Optional[Tuple[int, int]]]): ブロック置き場、ベースサークル、端点サークルの順の
+                座標リスト(GUIで取得する座標はNone)
+        """
+        if len(points) != len(self.__points):
+            raise ValueError("座標の数は%dである必要があります" % len(self.__points))
+        self.__points = [tuple(point) if point is not None else None for point in points]
+        self.__input_indexes = []
+
+    def save_profile(self, path: str) -> None:
+        """取得した座標をキャリブレーションプロファイルとして保存する関数.
+
+        Args:
+            path (str): プロファイルの保存パス
+        """
+        directory = os.path.dirname(path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        profile = {"block_point": self.block_point, "base_circle": self.base_circle,
+                   "end_point": self.end_point}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+
+    def load_profile(self, path: str) -> bool:
+        """キャリブレーションプロファイルから座標を読み込む関数.
+
+        Args:
+            path (str): プロファイルのパス
+
+        Returns:
+            bool: 全ての座標を読み込めた場合 True
+        """
+        if not os.path.isfile(path):
+            return False
+        try:
+            with open(path, encoding="utf-8") as f:
+                profile = json.load(f)
+            block_point = [(int(x), int(y)) for x, y in profile["block_point"]]
+            base_circle = [(int(x), int(y)) for x, y in profile["base_circle"]]
+            end_point = [(int(x), int(y)) for x, y in profile["end_point"]]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print("[Warning] プロファイル%sを読み込めませんでした (%s)" % (path, e))
+            return False
+        if len(block_point) != CameraCoordinateCalibrator.__BLOCK_POINT_NUM \
+                or len(base_circle) != CameraCoordinateCalibrator.__BASE_CIRCLE_NUM \
+                or len(end_point) != CameraCoordinateCalibrator.__END_POINT_NUM:
+            print("[Warning] プロファイル%sの座標の数が正しくありません" % path)
+            return False
+        self.set_points(block_point + base_circle + end_point)
+        return True
+
     @property
     def block_point(self) -> List[Tuple[int, int]]:
         """Getter.
@@ -152,7 +236,8 @@ class CameraCoordinateCalibrator:
         Returns:
             List[Tuple[int, int]]: ブロック置き場の座標リスト ([x座標, y座標]の形で格納)
         """
-        return self.__block_point
+        return [point for point in self.__points[:CameraCoordinateCalibrator.__BLOCK_POINT_NUM]
+                if point is not None]
 
     @property
     def base_circle(self) -> List[Tuple[int, int]]:
@@ -161,7 +246,10 @@ class CameraCoordinateCalibrator:
         Returns:
             List[Tuple[int, int]]: ベースサークルの座標リスト ([x座標, y座標]の形で格納)
         """
-        return self.__base_circle
+        start = CameraCoordinateCalibrator.__BLOCK_POINT_NUM
+        return [point for point in
+                self.__points[start:start+CameraCoordinateCalibrator.__BASE_CIRCLE_NUM]
+                if point is not None]
 
     @property
     def end_point(self) -> List[Tuple[int, int]]:
@@ -170,7 +258,9 @@ class CameraCoordinateCalibrator:
         Returns:
             List[Tuple[int, int]]: 端点サークルの座標リスト ([x座標, y座標]の形で格納)
         """
-        return self.__end_point
+        start = CameraCoordinateCalibrator.__BLOCK_POINT_NUM \
+            + CameraCoordinateCalibrator.__BASE_CIRCLE_NUM
+        return [point for point in self.__points[start:] if point is not None]
 
 
 if __name__ == "__main__":
@@ -9,7 +9,13 @@
     $ python camera_interface.py -id <カメラID>
 """
 import argparse
+import atexit
 import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, List
 
 # NOTE: cv2.VideoCaptureの処理時間短縮(import cv2の前に書く必要あり)
 # 参考資料: https://qiita.com/youichi_io/items/b894b85d790720ea2346
@@ -18,7 +24,21 @@ import cv2  # noqa
 
 
 class CameraInterface:
-    """カメラ仲介クラス."""
+    """カメラ仲介クラス.
+
+    画像の保存は、計画を止めないように別スレッドで行う.
+    連続取得を開始すると、別スレッドでカメラから画像を取得し続け、取得時刻付きの最新の画像をリングバッファに保持する.
+    OpenCVの内部バッファに古い画像が溜まらないため、開始合図の時点の最新の画像を待たずに得られる.
+
+    Attributes:
+        __SAVE_QUEUE_SIZE (int): 保存待ちにできる画像の最大数
+        __MAX_FRAME_AGE (float): 連続取得中に、最新の画像として用いる画像の取得からの最大経過時間[s]
+        __RETRY_INTERVAL (float): 連続取得中に画像を取得できなかった場合に、再取得するまでの待機時間[s]
+    """
+
+    __SAVE_QUEUE_SIZE = 8
+    __MAX_FRAME_AGE = 0.5
+    __RETRY_INTERVAL = 0.01
 
     def __init__(self, camera_id=1) -> None:
         """CameraInterfaceのコンストラクタ.
@@ -28,27 +48,165 @@ class CameraInterface:
         """
         # 画像取得するカメラを選択する（引数はカメラ番号）
         self.camera = cv2.VideoCapture(camera_id)
+        # 保存待ちの(画像保存のパス, 画像)のキューと、保存するスレッド(初回の保存時に開始する)
+        self.__save_queue = queue.Queue(CameraInterface.__SAVE_QUEUE_SIZE)
+        self.__save_thread = None
+        # 連続取得した(取得時刻, 画像)のリングバッファと、連続取得するスレッド
+        self.__frames = deque()
+        self.__frames_condition = threading.Condition()
+        self.__capture_thread = None
+        self.__stop_capture_event = threading.Event()
+
+    def capture_frame(self, save_path: str = None) -> cv2.Mat:
+        """カメラから画像を取得し、別スレッドで保存する.
+
+        Args:
+            save_path (str): 画像保存のパス(Noneの場合は保存しない)
+
+        Returns:
+            cv2.Mat: 画像データ(取得できなかった場合は、保存済みの画像もしくはNone)
+        """
+        frames = self.capture_frames(1, save_path)
+        return frames[0] if frames != [] else None
+
+    def capture_frames(self, frame_num: int, save_path: str = None) -> List[cv2.Mat]:
+        """カメラから連続した複数の画像を取得し、最初の画像を別スレッドで保存する.
 
-    def capture_frame(self, save_path: str) -> cv2.Mat:
-        """カメラから画像を取得、保存.
+        連続取得中は、最新の画像とその後に取得した画像を返す.
 
         Args:
-            save_path (str): 画像保存のパス
+            frame_num (int): 取得する画像の数
+            save_path (str): 画像保存のパス(Noneの場合は保存しない)
 
         Returns:
-            cv2.Mat: 画像データ
+            List[cv2.Mat]: 画像データのリスト(1枚も取得できなかった場合は、保存済みの画像のみもしくは空)
         """
-        # successed: 画像が取得が成功したか(True or False)
-        # frame: 画像
-        successed, frame = self.camera.read()
-        if successed:
-            # 画像の保存
-            cv2.imwrite(save_path, frame)
-            print("画像を保存しました")
-        else:
+        frames = []
+        timestamp = None
+        for _ in range(frame_num):
+            # successed: 画像が取得が成功したか(True or False)
+            # frame: 画像
+            if self.__capture_thread is not None:
+                successed, timestamp, frame = self.__get_latest_frame(timestamp)
+            else:
+                successed, frame = self.camera.read()
+            if successed:
+                frames.append(frame)
+        if frames == []:
             print("画像を取得できませんでした")
+            # 以前に保存した画像があれば、それを用いる
+            if save_path is not None and os.path.isfile(save_path):
+                return [cv2.imread(save_path)]
+            return []
 
-        return cv2.imread(save_path)
+        if save_path is not None:
+            self.__start_save_thread()
+            try:
+                self.__save_queue.put_nowait((save_path, frames[0]))
+            except queue.Full:
+                print("保存待ちの画像が多いため、%sを保存しませんでした" % save_path)
+        return frames
+
+    def start_capture(self, buffer_size: int = 4) -> None:
+        """別スレッドで画像の連続取得を開始する(開始済みの場合は何もしない).
+
+        Args:
+            buffer_size (int): 保持する最新の画像の数
+        """
+        if self.__capture_thread is not None:
+            return
+        with self.__frames_condition:
+            self.__frames = deque(maxlen=buffer_size)
+        self.__stop_capture_event.clear()
+        self.__capture_thread = threading.Thread(target=self.__capture_frames, daemon=True)
+        self.__capture_thread.start()
+
+    def stop_capture(self) -> None:
+        """画像の連続取得を終了する."""
+        if self.__capture_thread is None:
+            return
+        self.__stop_capture_event.set()
+        self.__capture_thread.join()
+        self.__capture_thread = None
+
+    def get_capture_stats(self) -> Dict[str, float]:
+        """連続取得の状況を取得する.
+
+        Returns:
+            リングバッファ内の画像から求めた取得のフレームレート[fps]("fps")、
+            最新の画像の取得からの経過時間[s]("age")(画像がない場合はいずれも0): Dict[str, float]
+        """
+        with self.__frames_condition:
+            timestamps = [timestamp for timestamp, _ in self.__frames]
+        if timestamps == []:
+            return {"fps": 0.0, "age": 0.0}
+        fps = (len(timestamps) - 1) / (timestamps[-1] - timestamps[0]) \
+            if timestamps[-1] > timestamps[0] else 0.0
+        return {"fps": fps, "age": time.monotonic() - timestamps[-1]}
+
+    def wait_for_saving(self) -> None:
+        """保存待ちの画像を全て保存するまで待機する."""
+        if self.__save_thread is not None:
+            self.__save_queue.join()
+
+    def __get_latest_frame(self, previous_timestamp: float = None) -> tuple:
+        """連続取得した最新の画像を取得する.
+
+        最新の画像が古い場合や、前回取得した画像と同じ場合は、次の画像を取得するまで待機する.
+
+        Args:
+            previous_timestamp (float): 前回取得した画像の取得時刻(Noneの場合は最新の画像を取得する)
+
+        Returns:
+            画像が取得できたか: bool
+            画像の取得時刻: float
+            画像: cv2.Mat
+        """
+        with self.__frames_condition:
+            self.__frames_condition.wait_for(
+                lambda: len(self.__frames) > 0
+                and time.monotonic() - self.__frames[-1][0] <= CameraInterface.__MAX_FRAME_AGE
+                and (previous_timestamp is None or self.__frames[-1][0] > previous_timestamp),
+                CameraInterface.__MAX_FRAME_AGE)
+            if len(self.__frames) == 0 or (previous_timestamp is not None
+                                           and self.__frames[-1][0] <= previous_timestamp):
+                return False, previous_timestamp, None
+            timestamp, frame = self.__frames[-1]
+        return True, timestamp, frame
+
+    def __capture_frames(self) -> None:
+        """停止するまで画像を取得し続ける(スレッドで実行する)."""
+        while not self.__stop_capture_event.is_set():
+            successed, frame = self.camera.read()
+            if not successed:
+                self.__stop_capture_event.wait(CameraInterface.__RETRY_INTERVAL)
+                continue
+            with self.__frames_condition:
+                self.__frames.append((time.monotonic(), frame))
+                self.__frames_condition.notify_all()
+
+    def __start_save_thread(self) -> None:
+        """画像を保存するスレッドを開始する(開始済みの場合は何もしない)."""
+        if self.__save_thread is not None:
+            return
+        self.__save_thread = threading.Thread(target=self.__save_frames, daemon=True)
+        self.__save_thread.start()
+        # プログラム終了時に保存待ちの画像を保存する
+        atexit.register(self.wait_for_saving)
+
+    def __save_frames(self) -> None:
+        """保存待ちの画像を順に保存する(スレッドで実行する)."""
+        while True:
+            save_path, frame = self.__save_queue.get()
+            try:
+                if cv2.imwrite(save_path, frame):
+                    print("画像を保存しました")
+                else:
+                    print("%sを保存できませんでした" % save_path)
+            except cv2.error as e:
+                print("%sを保存できませんでした (%s)" % (save_path, e))
+            finally:
+                self.__save_queue.task_done()
 
     @staticmethod
     def check_camera_connection() -> None:
@@ -91,3 +249,4 @@ if __name__ == "__main__":
     save_path = "course.png"
     camera_interface = CameraInterface(args.camera_id)
     camera_interface.capture_frame(save_path)
+    camera_interface.wait_for_saving()
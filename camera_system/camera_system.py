@@ -13,30 +13,48 @@ os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
 from camera_calibrator import CameraCalibrator  # noqa
 from game_area_info import GameAreaInfo  # noqa
 from client import Client  # noqa
-from game_planner import GamePlanner  # noqa
+from game_state import GameState  # noqa
+from plan_library import PlanLibrary  # noqa
+from planning_server import PlanningServer  # noqa
+from transition_table import TransitionTable  # noqa
 
 
 class CameraSystem:
     """カメラシステムクラス."""
 
     __SUBMIT_DIRECTORY_PATH = "camera_system/datafiles/"
+    __TRANSITION_TABLE_DIRECTORY_PATH = "camera_system/transition_tables/"
 
-    def __init__(self, is_left_course: bool, robot_ip: str) -> None:
+    def __init__(self, is_left_course: bool, robot_ip: str, strategy: str = "greedy",
+                 time_limit: float = 1.0, frame_num: int = 1, recalibrate: bool = False) -> None:
         """カメラシステムのコンストラクタ.
 
         Args:
             is_left_course (bool, optional): 左コースの場合 True. Defaults to True.
             robot_ip: 走行体のIPアドレス
+            strategy: ゲーム攻略の計画の戦略("greedy", "exact" or "anytime")
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
+            frame_num: ゲームエリア情報の作成に用いる画像の最大数
+            recalibrate: 保存したキャリブレーションプロファイルを用いずにGUIから座標を取得する場合 True
         """
         self.__set_is_left_course(is_left_course)
         self.__robot_ip = robot_ip
+        self.__strategy = strategy
+        self.__time_limit = time_limit
+        self.__frame_num = frame_num
+        self.__recalibrate = recalibrate
 
     def start(self, camera_id=0) -> None:
         """ゲーム攻略を計画する."""
+        # 前回までに作成した遷移表を読み込む
+        TransitionTable.load(self.__TRANSITION_TABLE_DIRECTORY_PATH)
+        # 事前に計画した計画ライブラリを読み込む
+        PlanLibrary.load(PlanLibrary.DEFAULT_PATH)
+
         # カメラキャリブレーションを開始する
         camera_calibrator = CameraCalibrator(camera_id)
-        # GUIから座標を取得する
-        camera_calibrator.start_camera_calibration()
+        # 保存した座標を読み込む(読み込めない場合はGUIから座標を取得する)
+        camera_calibrator.start_camera_calibration(self.__recalibrate)
 
         # 通信を開始する
         client = Client(self.robot_ip, 8080)
@@ -44,9 +62,15 @@ class CameraSystem:
         client.wait_for_start_signal()
 
         # ゲームエリア情報を作成する
-        camera_calibrator.make_game_area_info(self.__is_left_course)
-        # ゲームエリア攻略を計画する
-        motion_commands = GamePlanner.plan(self.__is_left_course)
+        camera_calibrator.make_game_area_info(self.__is_left_course, frame_num=self.__frame_num)
+        # ゲームエリア攻略の動作コマンドを求める
+        motion_commands, stats = PlanningServer.plan_commands(
+            self.__is_left_course, GameState.from_game_area_info(), self.__strategy,
+            self.__time_limit)
+        if stats["source"] == "library":
+            print("Use the precomputed plan in %s" % PlanLibrary.DEFAULT_PATH)
+        print("Optimize commands: %d removed, %.3f[s] saved" % (stats["removed_commands"],
+                                                                stats["saved_time"]))
 
         # 転送用ディレクトリを作成する
         os.makedirs(self.__SUBMIT_DIRECTORY_PATH, exist_ok=True)
@@ -73,6 +97,9 @@ class CameraSystem:
         print("Copy %s to %s\n" % (bonus_command_source_path, bonus_command_file_path))
         print("Create %s\n" % color_command_file_path)
 
+        # 次回の計画のために、作成した遷移表を保存する
+        TransitionTable.save(self.__TRANSITION_TABLE_DIRECTORY_PATH)
+
         pass
 
     @property
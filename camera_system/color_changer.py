@@ -6,7 +6,7 @@
 import cv2
 import numpy as np
 from enum import Enum
-from typing import Tuple
+from typing import List, Tuple
 
 
 class Color(Enum):
@@ -27,18 +27,24 @@ class ColorChanger:
         __BGR_COLOR(ndarray): RGB値(黒、赤、黄、緑、青、白)
         __LOWER(ndarray): HSV閾値下限(赤1、赤2、黄、緑、青、白)
         __UPPER(ndarray): HSV閾値上限(赤1、赤2、黄、緑、青、白)
+        __COLOR_IDS(list): HSV閾値ごとの色ID(赤1、赤2、黄、緑、青、白)
+        __lut(ndarray): HSV値から色IDを引く参照テーブル(180*256*256、作成前はNone)
     """
 
     __BGR_COLOR = np.array([[0, 0, 0], [0, 0, 255], [0, 255, 255],
-                            [0, 255, 0], [255, 0, 0], [255, 255, 255]])
+                            [0, 255, 0], [255, 0, 0], [255, 255, 255]], np.uint8)
     __LOWER = np.array([[0, 90, 0], [151, 90, 0], [16, 130, 0],
                         [41, 70, 0], [104, 100, 0], [0, 0, 128]])
     __UPPER = np.array([[15, 255, 255], [180, 255, 255], [40, 255, 255],
                         [103, 255, 255], [150, 255, 255], [180, 70, 255]])
+    __COLOR_IDS = [Color.RED.value, Color.RED.value, Color.YELLOW.value,
+                   Color.GREEN.value, Color.BLUE.value, Color.WHITE.value]
+    __lut = None
 
     def __init__(self) -> None:
         """ColorChangerのコンストラクタ."""
         self.color_id_img = []  # カラーIDを格納する配列を宣言
+        self.__integral_imgs = None  # 各色(赤、黄、緑、青)の積分画像
 
     def change_color(self, game_area_img: cv2.Mat, save_path: str) -> None:
         """画像を6色画像に変換する関数.
@@ -47,38 +53,139 @@ class ColorChanger:
             game_area_img (cv2.Mat): ゲームエリア画像
             save_path (str): 出力画像ファイルの保存パス
         """
-        y_size = game_area_img.shape[0]  # 入力画像の縦サイズ
-        x_size = game_area_img.shape[1]  # 入力画像の横サイズ
-        color_size = game_area_img.shape[2]  # RGBの3次元
         # BGR色空間からHSV色空間への変換
         hsv = cv2.cvtColor(game_area_img, cv2.COLOR_BGR2HSV)
-        # 処理結果を保持する配列を宣言(色を黒で初期化)
-        self.result = np.zeros((x_size*y_size, color_size), np.uint8)
-        self.color_id_img = np.zeros(x_size*y_size)
-
-        # 色ID(赤1、赤2、黄、緑、青、白)
-        color_ids = [Color.RED.value, Color.RED.value, Color.YELLOW.value,
-                     Color.GREEN.value, Color.BLUE.value, Color.WHITE.value]
-
-        # 元画像を一次元の配列に変形
-        hsv = hsv.reshape(self.result.shape)
-
-        for i in range(len(color_ids)):
-            # 条件を満たすindexを取得
-            index = np.where(np.all(ColorChanger.__LOWER[i] <= hsv, axis=1)
-                             & np.all(hsv <= ColorChanger.__UPPER[i], axis=1))
-            # カラーIDの配列に変換
-            self.color_id_img[index] = color_ids[i]
-            # 6色画像(BGR)に変換
-            self.result[index] = ColorChanger.__BGR_COLOR[color_ids[i]]
-
-        # 元の形状に変形
-        self.result = self.result.reshape(game_area_img.shape)
-        self.color_id_img = self.color_id_img.reshape(y_size, x_size)
+        # カラーIDの配列に変換
+        self.color_id_img = ColorChanger.classify(hsv)
+        # 各色(赤、黄、緑、青)の画素を1とした画像の累積和(積分画像)を求める
+        # integral_imgs[i, y, x]は、(0, 0)から(x-1, y-1)までの矩形内の色ID(i+1)のピクセル数
+        self.__integral_imgs = np.stack([
+            cv2.integral((self.color_id_img == color_id).view(np.uint8))
+            for color_id in range(Color.RED.value, Color.BLUE.value+1)])
+        # 6色画像(BGR)に変換
+        self.result = ColorChanger.__BGR_COLOR[self.color_id_img]
 
         # 6色画像を保存
         cv2.imwrite(save_path, self.result)
 
+    @classmethod
+    def count_window_colors(cls, game_area_imgs: List[cv2.Mat], coords: List[Tuple[int, int]],
+                            search_area_xsize: int, search_area_ysize: int) -> np.ndarray:
+        """複数の画像の指定領域ごとに、各色(赤、黄、緑、青)のピクセル数を求める関数.
+
+        全ての画像の全ての領域の画素をまとめて1回でHSV色空間に変換し、色IDに変換して数える.
+        領域は画像全体を変換した場合のsearch_color関数と同じ範囲とし、ピクセル数も同じになる.
+
+        Args:
+            game_area_imgs (List[cv2.Mat]): ゲームエリア画像のリスト
+            coords (List[Tuple[int, int]]): 指定領域の中心の座標のリスト
+            search_area_xsize (int): 指定領域のxサイズ
+            search_area_ysize (int): 指定領域のyサイズ
+
+        Returns:
+            ndarray: 各色のピクセル数の配列(画像の数*領域の数*4)
+        """
+        # search_color関数と同じ範囲の画素を切り出し、全ての画素を1列に並べる
+        windows = [game_area_img[
+            coord_y-(search_area_ysize//2):coord_y+(search_area_ysize//2)+1,
+            coord_x-(search_area_xsize//2):coord_x+(search_area_xsize//2)+1].reshape(-1, 1, 3)
+            for game_area_img in game_area_imgs for coord_x, coord_y in coords]
+        pixels = np.concatenate(windows)
+        color_ids = cls.classify(cv2.cvtColor(pixels, cv2.COLOR_BGR2HSV)).ravel()
+
+        # 領域ごとに各色のピクセル数を数える
+        window_ids = np.repeat(np.arange(len(windows)), [len(window) for window in windows])
+        color_pixel_sums = np.bincount(window_ids * len(cls.__BGR_COLOR) + color_ids,
+                                       minlength=len(windows) * len(cls.__BGR_COLOR))
+        color_pixel_sums = color_pixel_sums.reshape(len(windows), len(cls.__BGR_COLOR))[
+            :, Color.RED.value:Color.BLUE.value+1]
+        # 白と黒しかない領域は、各色(白黒以外)が同じピクセル数だけ存在することとする
+        color_pixel_sums[color_pixel_sums.sum(axis=1) == 0] = \
+            search_area_xsize*search_area_ysize//4
+        return color_pixel_sums.reshape(len(game_area_imgs), len(coords), -1).astype(np.int64)
+
+    @classmethod
+    def count_pixel_colors(cls, window_pixels: np.ndarray) -> np.ndarray:
+        """取り出し済みの領域の画素ごとに、各色(赤、黄、緑、青)のピクセル数を求める関数.
+
+        FrameRectifier.sample_windowsで取り出した、同じ画素数の領域をまとめて数える.
+        白と黒しかない領域の扱いはcount_window_colors関数と同じとする.
+
+        Args:
+            window_pixels (ndarray): 領域ごとの画素の配列(...*領域の画素数*3、BGR)
+
+        Returns:
+            ndarray: 各色のピクセル数の配列(...*4)
+        """
+        shape = window_pixels.shape[:-2]
+        window_pixel_num = window_pixels.shape[-2]
+        window_num = int(np.prod(shape))
+        color_ids = cls.classify(cv2.cvtColor(window_pixels.reshape(-1, 1, 3),
+                                              cv2.COLOR_BGR2HSV)).ravel()
+        window_ids = np.repeat(np.arange(window_num), window_pixel_num)
+        color_pixel_sums = np.bincount(window_ids * len(cls.__BGR_COLOR) + color_ids,
+                                       minlength=window_num * len(cls.__BGR_COLOR))
+        color_pixel_sums = color_pixel_sums.reshape(window_num, len(cls.__BGR_COLOR))[
+            :, Color.RED.value:Color.BLUE.value+1]
+        color_pixel_sums[color_pixel_sums.sum(axis=1) == 0] = window_pixel_num//4
+        return color_pixel_sums.reshape(*shape, -1).astype(np.int64)
+
+    @classmethod
+    def classify(cls, hsv_img: np.ndarray) -> np.ndarray:
+        """HSV画像を色IDの配列に変換する.
+
+        参照テーブルから各画素の色IDを一度に引く. 複数のHSV閾値を満たす場合は後の閾値の色IDとする.
+
+        Args:
+            hsv_img (ndarray): HSV画像(OpenCVの8bitのHSV値)
+
+        Returns:
+            ndarray: 色IDの配列(uint8)
+        """
+        lut = cls.__get_lut()
+        return lut[hsv_img[..., 0], hsv_img[..., 1], hsv_img[..., 2]]
+
+    @classmethod
+    def __get_lut(cls) -> np.ndarray:
+        """HSV値から色IDを引く参照テーブルを取得する(初回のみ作成する).
+
+        Returns:
+            ndarray: 参照テーブル(180*256*256)
+        """
+        if cls.__lut is None:
+            # OpenCVの8bitのHSV値は、Hが0~179、S,Vが0~255
+            lut = np.zeros((180, 256, 256), np.uint8)
+            # 閾値の範囲を順に色IDで塗る(後の閾値で上書きする)
+            for lower, upper, color_id in zip(cls.__LOWER, cls.__UPPER, cls.__COLOR_IDS):
+                lut[lower[0]:upper[0]+1, lower[1]:upper[1]+1, lower[2]:upper[2]+1] = color_id
+            cls.__lut = lut
+        return cls.__lut
+
+    def count_colors(self, left, top, right, bottom) -> np.ndarray:
+        """矩形領域内の各色(赤、黄、緑、青)のピクセル数を、積分画像から矩形の大きさによらず定数時間で求める.
+
+        引数に配列を与えると、複数の矩形領域のピクセル数をまとめて求める.
+        矩形領域は画像の範囲に切り詰める.
+
+        Args:
+            left (int or ndarray): 矩形領域の左端のx座標
+            top (int or ndarray): 矩形領域の上端のy座標
+            right (int or ndarray): 矩形領域の右端のx座標(この座標を含まない)
+            bottom (int or ndarray): 矩形領域の下端のy座標(この座標を含まない)
+
+        Returns:
+            ndarray: 各色のピクセル数の配列(矩形領域の形状*4)
+        """
+        y_size, x_size = self.__integral_imgs.shape[1:]
+        left, right = np.clip(left, 0, x_size-1), np.clip(right, 0, x_size-1)
+        top, bottom = np.clip(top, 0, y_size-1), np.clip(bottom, 0, y_size-1)
+        right, bottom = np.maximum(left, right), np.maximum(top, bottom)
+        color_pixel_sums = self.__integral_imgs[:, bottom, right] \
+            - self.__integral_imgs[:, top, right] \
+            - self.__integral_imgs[:, bottom, left] \
+            + self.__integral_imgs[:, top, left]
+        return np.moveaxis(color_pixel_sums, 0, -1).astype(np.int64)
+
     def search_color(self, coord_x: int, coord_y: int,
                      search_area_xsize: int, search_area_ysize: int) -> Tuple[int, int]:
         """指定領域内の色IDと各色のピクセル数を取得する.
@@ -92,25 +199,24 @@ class ColorChanger:
         Returns:
             Tuple[int, int]: 指定領域内に存在する色IDの種類, 指定領域内の各色のピクセル数
         """
-        # 指定領域を配列として宣言
-        search_area = self.color_id_img[
-            coord_y-(search_area_ysize//2):coord_y+(search_area_ysize//2)+1,
-            coord_x-(search_area_xsize//2):coord_x+(search_area_xsize//2)+1]
-        # 配列から黒と白を除去
-        search_area = search_area[
-            np.where((search_area != Color.BLACK.value) & (search_area != Color.WHITE.value))]
+        # 指定領域の範囲を求める(配列のスライスと同じ範囲とする)
+        y_size, x_size = self.color_id_img.shape
+        top, bottom, _ = slice(coord_y-(search_area_ysize//2),
+                               coord_y+(search_area_ysize//2)+1).indices(y_size)
+        left, right, _ = slice(coord_x-(search_area_xsize//2),
+                               coord_x+(search_area_xsize//2)+1).indices(x_size)
+        # 積分画像から各色(白黒以外)のピクセル数を求める
+        color_pixel_sum = self.count_colors(left, top, right, bottom)
 
         # もし選択した領域内に白と黒しかなかった場合は、領域内に各色(白黒以外)が同じピクセル数だけ存在することとする
-        if search_area.size == 0:
+        if color_pixel_sum.sum() == 0:
             color_uniqs = np.array([1, 2, 3, 4])
             color_pixel_sum = np.full(4, search_area_xsize*search_area_ysize//4)
             return color_uniqs.astype(np.int64), color_pixel_sum.astype(np.int64)
 
-        # 配列に存在する色IDの種類とピクセル数を求める
-        color_uniqs, color_pixel_sum = np.unique(search_area, return_counts=True)
-
-        # int型配列に直して返す
-        return color_uniqs.astype(np.int64), color_pixel_sum.astype(np.int64)
+        # 領域に存在する色IDの種類とピクセル数を求める
+        color_uniqs = np.flatnonzero(color_pixel_sum) + Color.RED.value
+        return color_uniqs.astype(np.int64), color_pixel_sum[color_uniqs - Color.RED.value]
 
 
 if __name__ == "__main__":
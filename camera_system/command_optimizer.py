@@ -0,0 +1,138 @@
+"""動作コマンドの最適化モジュール.
+
+生成した動作コマンドの冗長な並びを、走行体の動作が変わらない短い並びに置き換える
+@author: miyashita64
+"""
+
+from typing import Dict, List, Tuple
+
+
+class CommandOptimizer:
+    """動作コマンドの並びを最適化する(覗き穴最適化)クラス.
+
+    動作コマンドは1行に1つの"コマンド名,引数...,コメント"で、引数の数はコマンドごとに決まっている.
+    以下の置き換えを行い、取り除いたコマンドのコメントは置き換え後のコマンドのコメントに連結する.
+        - 連続するスリープは、最も長いスリープ1つにまとめる
+        - 同じPWM値で連続する直進は、距離を合計した1つの直進にまとめる
+        - (remove_correctionsがTrueの場合のみ)回頭とスリープのみを挟んで次の角度補正が続く角度補正を取り除く
+    角度補正は後方カメラで捉えた線に対する向きに補正するため、後続の回頭の起点の向きを整える役割も持つ.
+    そのため角度補正の除去は走行体での検証が済むまで既定では行わない.
+
+    Attributes:
+        __ARGUMENT_NUMS (Dict[str, int]): コマンドごとの引数の数(コメントを除く)
+        __CORRECTION_GAP_COMMANDS (Tuple[str]): 角度補正を上書きするまでに挟んでよいコマンド
+        __COMMENT_SEPARATOR (str): 連結するコメントの区切り文字
+    """
+
+    __ARGUMENT_NUMS = {"SL": 1, "DS": 2, "RT": 3, "XR": 2, "EC": 1, "CS": 2,
+                       "DL": 6, "CL": 6, "AR": 2, "AF": 2}
+    __CORRECTION_GAP_COMMANDS = ("SL", "RT")
+    __COMMENT_SEPARATOR = "・"
+
+    @classmethod
+    def optimize(cls, motion_commands: str,
+                 remove_corrections: bool = False) -> Tuple[str, Dict[str, float]]:
+        """動作コマンドを最適化する.
+
+        Args:
+            motion_commands: 動作コマンド
+            remove_corrections: 次の角度補正が続く角度補正を取り除く場合True(走行体で未検証)
+        Returns:
+            最適化した動作コマンド: str
+            取り除いたコマンド数、まとめたスリープ数、まとめた直進数、取り除いた角度補正数、
+            短縮できる予測時間[s](取り除いたスリープの時間): Dict[str, float]
+        """
+        commands = [cls.__parse(line) for line in motion_commands.split("\n") if line != ""]
+        stats = {"removed_commands": 0, "merged_sleeps": 0, "merged_drives": 0,
+                 "removed_corrections": 0, "saved_time": 0.0}
+
+        # 次の角度補正で上書きされる角度補正を取り除く
+        kept_commands = []
+        for i, command in enumerate(commands):
+            if remove_corrections and command[0] == "XR" \
+                    and cls.__is_overridden_correction(commands, i):
+                commands[i + 1][2] = cls.__join_comments(command[2], commands[i + 1][2])
+                stats["removed_corrections"] += 1
+                continue
+            kept_commands.append(command)
+
+        # 連続するスリープと直進をまとめる
+        optimized_commands = []
+        for command in kept_commands:
+            previous = optimized_commands[-1] if optimized_commands != [] else None
+            if previous is not None and previous[0] == command[0] == "SL" \
+                    and len(previous[1]) == len(command[1]) == 1:
+                sleep_times = [int(previous[1][0]), int(command[1][0])]
+                stats["saved_time"] += min(sleep_times) / 1000
+                stats["merged_sleeps"] += 1
+                previous[1] = [str(max(sleep_times))]
+            elif previous is not None and previous[0] == command[0] == "DS" \
+                    and len(previous[1]) == len(command[1]) == 2 \
+                    and previous[1][1] == command[1][1]:
+                previous[1] = [str(int(previous[1][0]) + int(command[1][0])), command[1][1]]
+                stats["merged_drives"] += 1
+            else:
+                optimized_commands.append(command)
+                continue
+            previous[2] = cls.__join_comments(previous[2], command[2])
+
+        stats["removed_commands"] = len(commands) - len(optimized_commands)
+        return "".join(cls.__format(command) + "\n" for command in optimized_commands), stats
+
+    @classmethod
+    def __is_overridden_correction(cls, commands: List[list], index: int) -> bool:
+        """角度補正が、回頭とスリープのみを挟んで次の角度補正で上書きされるかを判定する.
+
+        Args:
+            commands: 解析したコマンドのリスト
+            index: 角度補正のコマンドの番号
+        Returns:
+            上書きされる場合True: bool
+        """
+        for command in commands[index + 1:]:
+            if command[0] == "XR":
+                return True
+            if command[0] not in cls.__CORRECTION_GAP_COMMANDS:
+                return False
+        return False
+
+    @classmethod
+    def __parse(cls, line: str) -> list:
+        """1行のコマンドを[コマンド名, 引数のリスト, コメント]に分解する.
+
+        引数の数が未知のコマンドは、全てのフィールドを引数とする.
+
+        Args:
+            line: 1行のコマンド
+        Returns:
+            [コマンド名, 引数のリスト, コメント(ない場合はNone)]: list
+        """
+        fields = line.split(",")
+        argument_num = cls.__ARGUMENT_NUMS.get(fields[0], len(fields) - 1)
+        comment = ",".join(fields[1 + argument_num:]) if len(fields) > 1 + argument_num else None
+        return [fields[0], fields[1:1 + argument_num], comment]
+
+    @staticmethod
+    def __format(command: list) -> str:
+        """[コマンド名, 引数のリスト, コメント]を1行のコマンドにする.
+
+        Args:
+            command: [コマンド名, 引数のリスト, コメント]
+        Returns:
+            1行のコマンド: str
+        """
+        name, arguments, comment = command
+        return ",".join([name] + arguments + ([comment] if comment is not None else []))
+
+    @classmethod
+    def __join_comments(cls, comment: str, other_comment: str) -> str:
+        """コメントを連結する.
+
+        Args:
+            comment: コメント(ない場合はNone)
+            other_comment: 後ろに連結するコメント(ない場合はNone)
+        Returns:
+            連結したコメント(どちらもない場合はNone): str
+        """
+        comments = [text for text in (comment, other_comment) if text is not None]
+        return cls.__COMMENT_SEPARATOR.join(comments) if comments != [] else None
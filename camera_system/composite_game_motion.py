@@ -4,7 +4,9 @@
 @author mutotaka0426
 """
 
-from game_motion import GameMotion
+from typing import Tuple
+from game_motion import GameMotion, Edge
+from motion_plan import MotionPlan
 
 
 class CompositeGameMotion:
@@ -22,17 +24,58 @@ class CompositeGameMotion:
         """
         self.__game_motion_list.append(game_motion)
 
+    @property
+    def game_motion_list(self) -> Tuple[GameMotion, ...]:
+        """Getter.
+
+        Returns:
+            Tuple[GameMotion, ...]: ゲーム動作のタプル
+        """
+        return tuple(self.__game_motion_list)
+
     def generate_command(self) -> str:
-        """ゲーム動作のリストからコマンドを生成する.
+        """ゲーム動作のリストからコマンドを生成し、現在のエッジを更新する.
 
         Returns:
             str: コマンド
         """
-        commands = ""
-        for game_motion in self.__game_motion_list:
-            commands += game_motion.generate_command()
+        commands, next_edge = self.generate_command_with_edge(Edge.get_current_edge())
+        Edge.set_current_edge(next_edge)
         return commands
 
+    def generate_command_with_edge(self, current_edge: str) -> Tuple[str, str]:
+        """動作開始時のエッジからゲーム動作のリストのコマンドを生成する.
+
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
+        Returns:
+            str: コマンド
+            str: 動作終了時のエッジ
+        """
+        # ゲーム動作ごとの(生成済みの)コマンドを連結する
+        commands = []
+        for game_motion in self.__game_motion_list:
+            command, current_edge = game_motion.generate_command_with_edge(current_edge)
+            commands.append(command)
+        return "".join(commands), current_edge
+
+    def generate_motion_plan_with_edge(self, current_edge: str) -> Tuple[MotionPlan, str]:
+        """動作開始時のエッジからゲーム動作のリストの動作計画の中間表現を生成する.
+
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
+        Returns:
+            MotionPlan: 動作計画の中間表現(ゲーム動作の番号はリストでの番号)
+            str: 動作終了時のエッジ
+        """
+        motion_plans = []
+        for game_motion in self.__game_motion_list:
+            motion_plan, current_edge = game_motion.generate_motion_plan_with_edge(current_edge)
+            motion_plans.append(motion_plan)
+        return MotionPlan.concatenate(motion_plans), current_edge
+
     def get_cost(self) -> float:
         """ゲーム動作のリストからコストを計算する.
 
@@ -0,0 +1,243 @@
+"""厳密なゲーム攻略計画モジュール.
+
+全てのブロックの運搬順と設置先の組み合わせから、合計コストが最小となる運搬動作を求める
+@author: miyashita64
+"""
+
+import heapq
+import itertools
+import time
+from typing import Dict, List, Tuple
+from robot import Robot
+from coordinate import Coordinate
+from game_state import GameState
+from optimal_motion_searcher import OptimalMotionSearcher
+from composite_game_motion import CompositeGameMotion
+from transition_table import TransitionTable
+
+
+class ExactGamePlanner:
+    """ブロックの運搬順と設置先を厳密に最適化する計画クラス.
+
+    (運搬済みのブロックの集合と設置先の使用状況を表すブロックの配置, ブロック設置後の走行体の状態)を
+    状態とした動的計画法を、合計コストの下限を推定コストとしたA*探索で解く.
+    1つのブロックの運搬(取得動作と設置動作)はOptimalMotionSearcherの最適動作とする.
+
+    Attributes:
+        __move_lower_bounds (List[List[float]]): ノード間の移動コストの下限(ノードの番号 y*7 + x で引く)
+    """
+
+    __move_lower_bounds = None
+
+    @classmethod
+    def plan(cls, robot: Robot,
+             game_state: GameState) -> Tuple[List[CompositeGameMotion], Dict[str, float]]:
+        """合計コストが最小となる全てのブロックの運搬動作を求める.
+
+        Args:
+            robot: 計画開始時の走行体(動作完了時の状態に更新する)
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            運搬動作を実現するゲーム動作群のリスト(全てのブロックを運搬できない場合はNone)
+            : List[CompositeGameMotion]
+            展開した状態数、生成した状態数、最適動作の探索回数、動作が探索できなかった回数、
+            計画の所要時間、合計コスト: Dict[str, float]
+        """
+        start_time = time.perf_counter()
+        lower_bounds = cls.__get_move_lower_bounds(game_state)
+
+        start_key = (game_state.occupancy, TransitionTable.encode(robot, False))
+        # 状態ごとに、開始時からの合計コストと、直前の状態と運搬動作を保持する
+        costs = {start_key: 0}
+        parents = {start_key: None}
+        # 探索する要素を(推定コスト, 登録順, 合計コスト, 状態, ゲーム状態, 走行体, 未評価の運搬)の
+        # 二分ヒープで保持する. 未評価の運搬(ブロックのノード, 設置先ノード)がある要素は、
+        # 運搬のコストを下限で見積もった遷移を表し、取り出した時に最適動作を探索して評価する
+        counter = itertools.count()
+        open_heap = [(cls.__predict_cost(game_state, lower_bounds), next(counter), 0,
+                      start_key, game_state, robot, None)]
+        # 状態とブロックごとのブロック取得動作(未評価の運搬の間で共有する)
+        get_results = {}
+        explored_count = 0
+        search_count = 0
+        infeasible_count = 0
+        goal_key = None
+        goal_robot = None
+
+        while open_heap:
+            _, _, cost, key, current_game_state, current_robot, carry = heapq.heappop(open_heap)
+            # より低コストな遷移で更新済みの古い要素は読み飛ばす
+            if cost > costs[key]:
+                continue
+
+            # 未評価の運搬の場合、最適動作を探索して遷移先の状態を求める
+            if carry is not None:
+                on_block_node, set_block_node = carry
+                get_key = (key, on_block_node.block_id)
+                if get_key not in get_results:
+                    # ブロック取得動作を探索する
+                    get_robot = cls.__copy_robot(current_robot)
+                    get_game_motion = OptimalMotionSearcher.search(
+                        get_robot, on_block_node, current_game_state, verbose=False)
+                    search_count += 1
+                    if get_game_motion.get_cost() == 0:
+                        infeasible_count += 1
+                    get_results[get_key] = (get_game_motion, get_robot)
+                get_game_motion, get_robot = get_results[get_key]
+                # 動作が探索できなかった場合は遷移しない
+                if get_game_motion.get_cost() == 0:
+                    continue
+                # ブロック設置動作を探索する
+                set_robot = cls.__copy_robot(get_robot)
+                set_game_motion = OptimalMotionSearcher.search(
+                    set_robot, set_block_node, current_game_state, verbose=False)
+                search_count += 1
+                if set_game_motion.get_cost() == 0:
+                    infeasible_count += 1
+                    continue
+                next_game_state = current_game_state.move_block(
+                    on_block_node.block_id, set_block_node)
+                next_key = (next_game_state.occupancy, TransitionTable.encode(set_robot, False))
+                next_cost = cost + get_game_motion.get_cost() + set_game_motion.get_cost()
+                # より低コストで遷移できない場合は破棄する
+                if costs.get(next_key, float("inf")) <= next_cost:
+                    continue
+                costs[next_key] = next_cost
+                parents[next_key] = (key, get_game_motion, set_game_motion)
+                estimated_cost = next_cost + cls.__predict_cost(next_game_state, lower_bounds)
+                heapq.heappush(open_heap, (estimated_cost, next(counter), next_cost,
+                                           next_key, next_game_state, set_robot, None))
+                continue
+
+            explored_count += 1
+            no_transported_nodes = current_game_state.get_no_transported_block()
+            # 全てのブロックを運搬した場合、探索を終了する
+            if no_transported_nodes == []:
+                goal_key = key
+                goal_robot = current_robot
+                break
+
+            # 未運搬のブロックと設置先の組ごとに、運搬のコストを下限で見積もった遷移を追加する
+            robot_node_id = current_robot.coord.y * 7 + current_robot.coord.x
+            for on_block_node in no_transported_nodes:
+                block_node_id = on_block_node.coord.y * 7 + on_block_node.coord.x
+                block_color = current_game_state.block_color_list[on_block_node.block_id]
+                for set_block_node in current_game_state.get_candidate_node(block_color):
+                    set_node_id = set_block_node.coord.y * 7 + set_block_node.coord.x
+                    next_game_state = current_game_state.move_block(
+                        on_block_node.block_id, set_block_node)
+                    estimated_cost = cost + lower_bounds[robot_node_id][block_node_id] \
+                        + lower_bounds[block_node_id][set_node_id] \
+                        + cls.__predict_cost(next_game_state, lower_bounds)
+                    heapq.heappush(open_heap, (estimated_cost, next(counter), cost, key,
+                                               current_game_state, current_robot,
+                                               (on_block_node, set_block_node)))
+
+        stats = {"explored": explored_count, "generated": len(costs), "searches": search_count,
+                 "infeasible": infeasible_count, "time": time.perf_counter() - start_time,
+                 "cost": costs[goal_key] if goal_key is not None else float("inf")}
+        if goal_key is None:
+            return None, stats
+
+        # 直前の状態を辿って、運搬動作を復元する
+        game_motions_list = []
+        trace_key = goal_key
+        while parents[trace_key] is not None:
+            trace_key, get_game_motion, set_game_motion = parents[trace_key]
+            game_motions_list[:0] = [get_game_motion, set_game_motion]
+        # 動作を実行したとして、走行体を更新する
+        robot.coord = goal_robot.coord
+        robot.direct = goal_robot.direct
+        robot.edge = goal_robot.edge
+        return game_motions_list, stats
+
+    @staticmethod
+    def __copy_robot(robot: Robot) -> Robot:
+        """走行体を複製する.
+
+        Args:
+            robot: 走行体
+        Returns:
+            複製した走行体: Robot
+        """
+        return Robot(Coordinate(robot.coord.x, robot.coord.y), robot.direct, robot.edge)
+
+    @staticmethod
+    def __predict_cost(game_state: GameState, lower_bounds: List[List[float]]) -> float:
+        """未運搬のブロックを全て運搬するのに必要なコストの下限を求める.
+
+        各ブロックについて、ブロック置き場に進入するコストの下限と、
+        最も近い設置先までの移動コストの下限を足し合わせる.
+
+        Args:
+            game_state: ゲーム状態
+            lower_bounds: ノード間の移動コストの下限
+        Returns:
+            コストの下限: float
+        """
+        predicted_cost = 0
+        for node in game_state.get_no_transported_block():
+            node_id = node.coord.y * 7 + node.coord.x
+            block_color = game_state.block_color_list[node.block_id]
+            set_costs = [lower_bounds[node_id][candidate_node.coord.y * 7 + candidate_node.coord.x]
+                         for candidate_node in game_state.get_candidate_node(block_color)]
+            if set_costs == []:
+                return float("inf")
+            enter_cost = min(lower_bounds[other_id][node_id]
+                             for other_id in range(49) if other_id != node_id)
+            predicted_cost += enter_cost + min(set_costs)
+        return predicted_cost
+
+    @classmethod
+    def __get_move_lower_bounds(cls, game_state: GameState) -> List[List[float]]:
+        """ノード間の移動コストの下限を求める.
+
+        遷移は走行体がいるノードの東西南北のブロックのパターンのみで決まるため、
+        全てのノードとパターンについての遷移のコストの最小値を辺とし、
+        ワーシャルフロイド法で全てのノード間の最短コストを求める.
+
+        Args:
+            game_state: 遷移の作成に用いるゲーム状態
+        Returns:
+            ノード間の移動コストの下限: List[List[float]]
+        """
+        if cls.__move_lower_bounds is not None:
+            return cls.__move_lower_bounds
+
+        # 東西南北のブロックのパターンの各ビットに対応する座標の差分
+        neighbor_vectors = ((1, 0), (0, 1), (-1, 0), (0, -1))
+        lower_bounds = [[float("inf")] * 49 for _ in range(49)]
+        for node_id in range(49):
+            lower_bounds[node_id][node_id] = 0
+            x, y = node_id % 7, node_id // 7
+            for pattern in range(TransitionTable.PATTERN_NUM):
+                # パターンを実現するブロックの配置を作る(コース外にブロックが必要なパターンは除く)
+                neighbor_coords = [Coordinate(x + dx, y + dy)
+                                   for bit, (dx, dy) in enumerate(neighbor_vectors)
+                                   if pattern >> bit & 1]
+                if any(not (0 <= coord.x <= 6 and 0 <= coord.y <= 6)
+                       for coord in neighbor_coords):
+                    continue
+                occupancy = sum(1 << (coord.y * 7 + coord.x) for coord in neighbor_coords)
+                table = TransitionTable.get(occupancy)
+                for state in range(node_id * 24, node_id * 24 + 24):
+                    for with_block_offset in (0, 49 * 24):
+                        next_states, move_costs = table.transitions(
+                            state + with_block_offset, game_state)
+                        for next_state, move_cost in zip(next_states.tolist(), move_costs.tolist()):
+                            if next_state < 0:
+                                continue
+                            next_node_id = TransitionTable.node_id(next_state)
+                            if move_cost < lower_bounds[node_id][next_node_id]:
+                                lower_bounds[node_id][next_node_id] = move_cost
+        # 全てのノード間の最短コストを求める
+        for via_id in range(49):
+            via_costs = lower_bounds[via_id]
+            for from_id in range(49):
+                from_costs = lower_bounds[from_id]
+                from_via_cost = from_costs[via_id]
+                for to_id in range(49):
+                    if from_via_cost + via_costs[to_id] < from_costs[to_id]:
+                        from_costs[to_id] = from_via_cost + via_costs[to_id]
+        cls.__move_lower_bounds = lower_bounds
+        return lower_bounds
@@ -0,0 +1,209 @@
+"""カメラ画像の射影補正モジュール.
+
+ゲームエリアを真上から見た画像(正面画像)に変換し、各ノードを固定の画素の位置に置く
+@author: miyashita64
+"""
+
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+class FrameRectifier:
+    """カメラ画像をゲームエリアの正面画像に変換するクラス.
+
+    キャリブレーションの座標(ブロック置き場8個、ベースサークル4個、端点サークル1個の順)から、
+    7*7のノードの座標系からカメラ画像への射影変換を求める. 正面画像ではノード(x, y)を
+    ((x - 原点のx) * ノードの間隔, (y - 原点のy) * ノードの間隔)の画素に置き、
+    全ての座標が収まるように原点と画像サイズを決める.
+    正面画像の各画素に対応するカメラ画像の画素の位置(cv2.remapのマップ)は、キャリブレーションごとに
+    1度だけ求めて保持する. 各座標の領域の色を調べる場合は、正面画像全体を作らずに、領域の画素に対応する
+    カメラ画像の画素の番号の配列を保持しておき、画素を直接取り出す.
+    レンズの歪み係数を与えた場合は、歪みを除いた座標で射影変換を求め、マップに歪みを含める.
+
+    Attributes:
+        BLOCK_SPOT_COORDINATES (np.ndarray): ブロック置き場のノードの座標(ブロックのIDの順)
+        __NODE_INTERVAL (int): 正面画像のノードの間隔[px]
+        __MARGIN (int): 正面画像の、全ての座標とノードを囲む矩形の外側の余白[ノード]
+    """
+
+    BLOCK_SPOT_COORDINATES = np.array([(1, 1), (3, 1), (5, 1), (1, 3), (5, 3),
+                                       (1, 5), (3, 5), (5, 5)], np.float32)
+
+    __NODE_INTERVAL = 48
+    __MARGIN = 1
+
+    def __init__(self, points: List[Tuple[int, int]], img_size: Tuple[int, int],
+                 camera_matrix: Optional[np.ndarray] = None,
+                 dist_coeffs: Optional[np.ndarray] = None) -> None:
+        """FrameRectifierのコンストラクタ.
+
+        Args:
+            points: キャリブレーションの座標(ブロック置き場8個、ベースサークル4個、端点サークル1個の順)
+            img_size: カメラ画像のサイズ(横幅, 高さ)
+            camera_matrix: カメラ行列(Noneの場合はレンズの歪みを補正しない)
+            dist_coeffs: レンズの歪み係数
+        Raises:
+            ValueError: 座標から射影変換を求められない場合
+        """
+        self.__img_size = img_size
+        self.__camera_matrix = camera_matrix
+        self.__dist_coeffs = dist_coeffs
+        image_points = self.__undistort(np.array(points, np.float32).reshape(-1, 2))
+        node_homography = self.find_node_homography(image_points)
+        if node_homography is None:
+            raise ValueError("キャリブレーションの座標から射影変換を求められません")
+
+        # 全ての座標とノードが収まるように、正面画像の原点(ノードの座標系)とサイズを決める
+        node_points = cv2.perspectiveTransform(image_points.reshape(-1, 1, 2),
+                                               np.linalg.inv(node_homography)).reshape(-1, 2)
+        corners = np.concatenate([node_points, [(0, 0), (6, 6)]])
+        origin = np.floor(corners.min(axis=0)) - FrameRectifier.__MARGIN
+        end = np.ceil(corners.max(axis=0)) + FrameRectifier.__MARGIN
+        self.__size = tuple(int(length) + 1
+                            for length in (end - origin) * FrameRectifier.__NODE_INTERVAL)
+        # 正面画像の座標からノードの座標への変換
+        rectified_to_node = np.array([[1 / FrameRectifier.__NODE_INTERVAL, 0, origin[0]],
+                                      [0, 1 / FrameRectifier.__NODE_INTERVAL, origin[1]],
+                                      [0, 0, 1]])
+        self.__origin = origin
+        self.__homography = node_homography @ rectified_to_node
+        self.__points = [self.node_to_pixel(x, y) for x, y in node_points]
+        self.__maps = None
+        self.__window_indexes = {}  # 領域のサイズごとの、領域の画素に対応するカメラ画像の画素の番号
+
+    @classmethod
+    def find_node_homography(cls, points: np.ndarray) -> Optional[np.ndarray]:
+        """ブロック置き場の座標から、ノードの座標系からカメラ画像への射影変換を求める.
+
+        Args:
+            points: ブロック置き場8個の座標を先頭に含む座標の配列
+        Returns:
+            射影変換の行列(ブロック置き場が一直線上に並ぶなど、求められない場合はNone): ndarray
+        """
+        block_spot_num = len(cls.BLOCK_SPOT_COORDINATES)
+        if len(points) < block_spot_num:
+            return None
+        homography, _ = cv2.findHomography(cls.BLOCK_SPOT_COORDINATES,
+                                           np.asarray(points, np.float32)[:block_spot_num])
+        if homography is None or abs(np.linalg.det(homography)) < 1e-9:
+            return None
+        return homography
+
+    def node_to_pixel(self, x: float, y: float) -> Tuple[int, int]:
+        """ノードの座標系の位置を正面画像の画素の位置に変換する.
+
+        Args:
+            x: ノードの座標系のx座標
+            y: ノードの座標系のy座標
+        Returns:
+            正面画像の画素の位置: Tuple[int, int]
+        """
+        return (int(round((x - self.__origin[0]) * FrameRectifier.__NODE_INTERVAL)),
+                int(round((y - self.__origin[1]) * FrameRectifier.__NODE_INTERVAL)))
+
+    @classmethod
+    def node_length_to_window_size(cls, length: float) -> int:
+        """ノードの座標系での長さを、その長さに収まる正面画像での領域のサイズに変換する.
+
+        Args:
+            length: ノードの座標系での長さ(ノードの間隔を1とする)
+        Returns:
+            正面画像での領域のサイズ(奇数)[px]: int
+        """
+        return 2 * int(length * cls.__NODE_INTERVAL / 2) + 1
+
+    def rectify(self, img: np.ndarray) -> np.ndarray:
+        """カメラ画像を正面画像に変換する.
+
+        Args:
+            img: カメラ画像
+        Returns:
+            正面画像: ndarray
+        """
+        if self.__maps is None:
+            width, height = self.__size
+            xs, ys = np.meshgrid(np.arange(width, dtype=np.float32),
+                                 np.arange(height, dtype=np.float32))
+            source_points = self.__get_source_points(np.stack([xs, ys], axis=2))
+            # 固定小数点のマップに変換しておき、変換ごとの補間を高速にする
+            self.__maps = cv2.convertMaps(source_points[..., 0], source_points[..., 1],
+                                          cv2.CV_16SC2)
+        return cv2.remap(img, self.__maps[0], self.__maps[1], cv2.INTER_LINEAR,
+                         borderMode=cv2.BORDER_CONSTANT)
+
+    def sample_windows(self, imgs: List[np.ndarray], search_area_xsize: int,
+                       search_area_ysize: int) -> np.ndarray:
+        """正面画像での各座標を中心とする領域の画素を、カメラ画像から取り出す.
+
+        Args:
+            imgs: カメラ画像のリスト
+            search_area_xsize: 正面画像での領域のxサイズ
+            search_area_ysize: 正面画像での領域のyサイズ
+        Returns:
+            領域の画素の配列(画像の数*座標の数*領域の画素数*チャンネル数): ndarray
+        """
+        key = (search_area_xsize, search_area_ysize)
+        if key not in self.__window_indexes:
+            # 領域の各画素に最も近いカメラ画像の画素の番号を求めておく(画像外は端の画素とする)
+            dxs, dys = np.meshgrid(np.arange(search_area_xsize) - search_area_xsize // 2,
+                                   np.arange(search_area_ysize) - search_area_ysize // 2)
+            offsets = np.stack([dxs.ravel(), dys.ravel()], axis=1)
+            window_points = (np.array(self.__points)[:, np.newaxis] + offsets).astype(np.float32)
+            source_points = np.rint(self.__get_source_points(window_points)).astype(np.int64)
+            width, height = self.__img_size
+            source_xs = np.clip(source_points[..., 0], 0, width - 1)
+            source_ys = np.clip(source_points[..., 1], 0, height - 1)
+            self.__window_indexes[key] = source_ys * width + source_xs
+        indexes = self.__window_indexes[key]
+        return np.stack([img.reshape(-1, img.shape[2])[indexes] for img in imgs])
+
+    def __get_source_points(self, rectified_points: np.ndarray) -> np.ndarray:
+        """正面画像の画素の位置に対応するカメラ画像の画素の位置を求める.
+
+        Args:
+            rectified_points: 正面画像の画素の位置の配列(..., 2)
+        Returns:
+            カメラ画像の画素の位置の配列(..., 2): ndarray
+        """
+        shape = rectified_points.shape
+        points = cv2.perspectiveTransform(rectified_points.reshape(-1, 1, 2).astype(np.float32),
+                                          self.__homography)
+        if self.__camera_matrix is not None:
+            # 歪みのない画像の位置を正規化座標に戻し、歪みを加えて投影する
+            normalized_points = cv2.convertPointsToHomogeneous(cv2.undistortPoints(
+                points, self.__camera_matrix, None)).reshape(-1, 3)
+            points, _ = cv2.projectPoints(normalized_points, np.zeros(3), np.zeros(3),
+                                          self.__camera_matrix, self.__dist_coeffs)
+        return points.reshape(shape).astype(np.float32)
+
+    def __undistort(self, points: np.ndarray) -> np.ndarray:
+        """カメラ画像の画素の位置から、レンズの歪みを除いた位置を求める.
+
+        Args:
+            points: カメラ画像の画素の位置の配列(N, 2)
+        Returns:
+            歪みを除いた位置の配列(N, 2): ndarray
+        """
+        if self.__camera_matrix is None or len(points) == 0:
+            return points
+        return cv2.undistortPoints(points.reshape(-1, 1, 2), self.__camera_matrix,
+                                   self.__dist_coeffs, P=self.__camera_matrix).reshape(-1, 2)
+
+    @property
+    def points(self) -> List[Tuple[int, int]]:
+        """Getter.
+
+        Returns:
+            正面画像でのキャリブレーションの座標のリスト: List[Tuple[int, int]]
+        """
+        return self.__points
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Getter.
+
+        Returns:
+            正面画像のサイズ(横幅, 高さ): Tuple[int, int]
+        """
+        return self.__size
@@ -24,6 +24,7 @@ class GameAreaInfo:
         __south_cand_coordinates = (List[Node]): 南の候補ノードになりうる座標リスト
         __west_cand_coordinates = (List[Node]): 西の候補ノードになりうる座標リスト
         __north_cand_coordinates = (List[Node]): 北の候補ノードになりうる座標リスト
+        __mask_tables (dict): 周囲のブロックのパターンから行動制限を引くための事前計算テーブル
     """
 
     block_color_list = []
@@ -67,47 +68,88 @@ class GameAreaInfo:
     __west_cand_coordinates = [Coordinate(0, 2), Coordinate(0, 3), Coordinate(0, 4)]
     __north_cand_coordinates = [Coordinate(2, 0), Coordinate(3, 0), Coordinate(4, 0)]
 
+    # 周囲のブロックのパターンにおける東西南北のビット
+    __EAST_BIT = 0b0001
+    __SOUTH_BIT = 0b0010
+    __WEST_BIT = 0b0100
+    __NORTH_BIT = 0b1000
+    # 行動制限の事前計算テーブル(初回参照時に作成する)
+    __mask_tables = None
+
     @staticmethod
-    def get_candidate_node(color: Color) -> List[Node]:
-        """設置先ノードの候補を取得する関数.
+    def get_candidate_coordinates(color: Color, base_color_list: List[Color] = None) \
+            -> List[Coordinate]:
+        """設置先ノードになりうる座標を取得する関数.
 
         Args:
             color: 運搬するブロックの色
+            base_color_list: ベースブロックの色のリスト(省略時はbase_color_listを用いる)
 
         Returns:
-            List[Node]: 候補ノード
+            List[Coordinate]: 設置先ノードになりうる座標
         """
+        if base_color_list is None:
+            base_color_list = GameAreaInfo.base_color_list
         # ベースエリアの色と東西南北の対応表
-        base_color_dict = {GameAreaInfo.base_color_list[0].value: "東",
-                           GameAreaInfo.base_color_list[1].value: "南",
-                           GameAreaInfo.base_color_list[2].value: "西",
-                           GameAreaInfo.base_color_list[3].value: "北"}
+        base_color_dict = {base_color_list[0].value: "東",
+                           base_color_list[1].value: "南",
+                           base_color_list[2].value: "西",
+                           base_color_list[3].value: "北"}
 
         color_id = color.value  # colorをidに直す
-        # 一致する要素(候補ノードになりうるノードの中で設置済みのブロックが無いノード)を返す
         if base_color_dict[color_id] == "東":
-            cand = [node for node in GameAreaInfo.node_list
-                    if node.coord in GameAreaInfo.__east_cand_coordinates and node.block_id == -1]
+            return GameAreaInfo.__east_cand_coordinates
         elif base_color_dict[color_id] == "南":
-            cand = [node for node in GameAreaInfo.node_list
-                    if node.coord in GameAreaInfo.__south_cand_coordinates and node.block_id == -1]
+            return GameAreaInfo.__south_cand_coordinates
         elif base_color_dict[color_id] == "西":
-            cand = [node for node in GameAreaInfo.node_list
-                    if node.coord in GameAreaInfo.__west_cand_coordinates and node.block_id == -1]
+            return GameAreaInfo.__west_cand_coordinates
         else:
-            cand = [node for node in GameAreaInfo.node_list
-                    if node.coord in GameAreaInfo.__north_cand_coordinates and node.block_id == -1]
+            return GameAreaInfo.__north_cand_coordinates
+
+    @staticmethod
+    def get_candidate_node(color: Color) -> List[Node]:
+        """設置先ノードの候補を取得する関数.
+
+        Args:
+            color: 運搬するブロックの色
+
+        Returns:
+            List[Node]: 候補ノード
+        """
+        cand_coordinates = GameAreaInfo.get_candidate_coordinates(color)
+        # 一致する要素(候補ノードになりうるノードの中で設置済みのブロックが無いノード)を返す
+        return [node for node in GameAreaInfo.node_list
+                if node.coord in cand_coordinates and node.block_id == -1]
+
+    @staticmethod
+    def get_occupancy() -> int:
+        """ブロックがあるノードを表すビットボードを取得する関数.
 
-        return cand
+        座標(x, y)のノードにブロックがある場合、(y*7 + x)ビット目が1になる.
+
+        Returns:
+            int: ブロックがあるノードのビットボード
+        """
+        occupancy = 0
+        for node_id, node in enumerate(GameAreaInfo.node_list):
+            if node.block_id != -1:
+                occupancy |= 1 << node_id
+        return occupancy
 
     @staticmethod
-    def get_on_block_coordinate() -> List[Coordinate]:
+    def get_on_block_coordinate(occupancy: int = None) -> List[Coordinate]:
         """ブロックがある座標を取得する関数.
 
+        Args:
+            occupancy: ブロックがあるノードのビットボード(省略時はnode_listから求める)
+
         Returns:
             List[Coordinate]: ブロックがある座標のリスト
         """
-        on_block_coords = [node.coord for node in GameAreaInfo.node_list if node.block_id != -1]
+        if occupancy is None:
+            occupancy = GameAreaInfo.get_occupancy()
+        on_block_coords = [Coordinate(node_id % 7, node_id // 7) for node_id in range(49)
+                           if occupancy >> node_id & 1]
         return on_block_coords
 
     @staticmethod
@@ -128,129 +170,206 @@ class GameAreaInfo:
         return no_trans_block_color_list
 
     @staticmethod
-    def get_no_entry_coordinate(robot) -> List[Coordinate]:
+    def get_no_entry_mask(robot, occupancy: int = None) -> int:
+        """走行禁止座標のビットマスクを取得する関数.
+
+        Args:
+            robot: 仮想走行体
+            occupancy: ブロックがあるノードのビットボード(省略時はnode_listから求める)
+
+        Returns:
+            int: 走行禁止座標のビットマスク
+        """
+        if occupancy is None:
+            occupancy = GameAreaInfo.get_occupancy()
+        node_id = robot.coord.y * 7 + robot.coord.x
+        pattern = GameAreaInfo.get_neighbor_pattern(robot.coord, occupancy)
+        return GameAreaInfo.__get_mask_tables()["no_entry_mask"][node_id][pattern]
+
+    @staticmethod
+    def get_no_entry_coordinate(robot, occupancy: int = None) -> List[Coordinate]:
         """走行禁止座標を取得する関数.
 
         Args:
             robot: 仮想走行体
+            occupancy: ブロックがあるノードのビットボード(省略時はnode_listから求める)
 
         Returns:
             List[Coordinate]: 走行禁止座標の座標リスト
         """
-        no_entry_coords = []
+        if occupancy is None:
+            occupancy = GameAreaInfo.get_occupancy()
+        node_id = robot.coord.y * 7 + robot.coord.x
+        pattern = GameAreaInfo.get_neighbor_pattern(robot.coord, occupancy)
+        no_entry_xys = GameAreaInfo.__get_mask_tables()["no_entry_coords"][node_id][pattern]
+        return [Coordinate(x, y) for x, y in no_entry_xys]
+
+    @staticmethod
+    def get_no_rotate_mask(robot, occupancy: int = None) -> int:
+        """回頭禁止方向のビットマスクを取得する関数.
+
+        方位Directionのvalueビット目が1の場合、その方位は回頭禁止方向である.
+
+        Args:
+            robot: 仮想走行体
+            occupancy: ブロックがあるノードのビットボード(省略時はnode_listから求める)
+
+        Returns:
+            int: 回頭禁止方向のビットマスク
+        """
+        if occupancy is None:
+            occupancy = GameAreaInfo.get_occupancy()
+        pattern = GameAreaInfo.get_neighbor_pattern(robot.coord, occupancy)
+        return GameAreaInfo.__get_mask_tables()["no_rotate_mask"][pattern][robot.direct.value]
+
+    @staticmethod
+    def get_no_rotate_direction(robot, occupancy: int = None) -> List[Direction]:
+        """回頭禁止方向を取得する関数.
+
+        Args:
+            robot: 仮想走行体
+            occupancy: ブロックがあるノードのビットボード(省略時はnode_listから求める)
+
+        Returns:
+            List[Direction]: 回頭禁止方向の方位リスト
+        """
+        no_rotate_mask = GameAreaInfo.get_no_rotate_mask(robot, occupancy)
+        return [direction for direction in Direction if no_rotate_mask >> direction.value & 1]
+
+    @staticmethod
+    def get_neighbor_pattern(coord: Coordinate, occupancy: int) -> int:
+        """指定座標の東西南北のノードにブロックがあるかを4ビットで表したパターンを求める.
+
+        Args:
+            coord: 座標
+            occupancy: ブロックがあるノードのビットボード
+
+        Returns:
+            int: 東(1ビット目),南(2ビット目),西(3ビット目),北(4ビット目)にブロックがあれば1となるパターン
+        """
+        node_id = coord.y * 7 + coord.x
+        pattern = 0
+        if coord.x < 6 and occupancy >> (node_id+1) & 1:
+            pattern |= GameAreaInfo.__EAST_BIT
+        if coord.y < 6 and occupancy >> (node_id+7) & 1:
+            pattern |= GameAreaInfo.__SOUTH_BIT
+        if coord.x > 0 and occupancy >> (node_id-1) & 1:
+            pattern |= GameAreaInfo.__WEST_BIT
+        if coord.y > 0 and occupancy >> (node_id-7) & 1:
+            pattern |= GameAreaInfo.__NORTH_BIT
+        return pattern
+
+    @staticmethod
+    def __get_mask_tables() -> dict:
+        """(座標, 周囲のブロックのパターン)から行動制限を引くためのテーブルを取得する.
+
+        テーブルは初回呼び出し時に全パターンについて事前計算する.
+
+        Returns:
+            dict: no_entry_mask[node_id][pattern], no_entry_coords[node_id][pattern],
+                  no_rotate_mask[pattern][direction]のテーブル
+        """
+        if GameAreaInfo.__mask_tables is None:
+            no_entry_mask = []
+            no_entry_coords = []
+            for node_id in range(49):
+                coord = Coordinate(node_id % 7, node_id // 7)
+                xys_list = [GameAreaInfo.__make_no_entry_xys(coord, pattern)
+                            for pattern in range(16)]
+                no_entry_coords.append(tuple(xys_list))
+                no_entry_mask.append(tuple(sum({1 << (y*7+x) for x, y in xys}) for xys in xys_list))
+            no_rotate_mask = tuple(
+                tuple(GameAreaInfo.__make_no_rotate_mask(pattern, direction)
+                      for direction in Direction)
+                for pattern in range(16))
+            GameAreaInfo.__mask_tables = {"no_entry_mask": tuple(no_entry_mask),
+                                          "no_entry_coords": tuple(no_entry_coords),
+                                          "no_rotate_mask": no_rotate_mask}
+        return GameAreaInfo.__mask_tables
+
+    @staticmethod
+    def __make_no_entry_xys(coord: Coordinate, pattern: int) -> tuple:
+        """指定座標と周囲のブロックのパターンから走行禁止座標を求める(テーブル作成用).
+
+        Args:
+            coord: 走行体の座標
+            pattern: 周囲のブロックのパターン
+
+        Returns:
+            tuple: 走行禁止座標の(x, y)のタプル
+        """
+        no_entry_xys = []
 
         # 東にブロック
-        if robot.coord.x < 6:
-            # 東の座標
-            east_coord = Coordinate(robot.coord.x+1, robot.coord.y)
-            east_node = GameAreaInfo.node_list[east_coord.y*7+east_coord.x]
-            # 東の座標にブロックが存在する場合
-            if east_node.block_id != -1:
-                if east_coord.y > 0:
-                    # 北東を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(east_coord.x, east_coord.y-1)]
-                if east_coord.y < 6:
-                    # 南東を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(east_coord.x, east_coord.y+1)]
+        if coord.x < 6 and pattern & GameAreaInfo.__EAST_BIT:
+            if coord.y > 0:
+                # 北東を走行禁止座標に追加
+                no_entry_xys += [(coord.x+1, coord.y-1)]
+            if coord.y < 6:
+                # 南東を走行禁止座標に追加
+                no_entry_xys += [(coord.x+1, coord.y+1)]
 
         # 南にブロック
-        if robot.coord.y < 6:
-            # 南の座標
-            south_coord = Coordinate(robot.coord.x, robot.coord.y+1)
-            south_node = GameAreaInfo.node_list[south_coord.y*7+south_coord.x]
-            # 南の座標にブロックが存在する場合
-            if south_node.block_id != -1:
-                if south_coord.x > 0:
-                    # 南西を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(south_coord.x-1, south_coord.y)]
-                if south_coord.x < 6:
-                    # 南東を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(south_coord.x+1, south_coord.y)]
+        if coord.y < 6 and pattern & GameAreaInfo.__SOUTH_BIT:
+            if coord.x > 0:
+                # 南西を走行禁止座標に追加
+                no_entry_xys += [(coord.x-1, coord.y+1)]
+            if coord.x < 6:
+                # 南東を走行禁止座標に追加
+                no_entry_xys += [(coord.x+1, coord.y+1)]
 
         # 西にブロック
-        if robot.coord.x > 0:
-            # 西の座標
-            west_coord = Coordinate(robot.coord.x-1, robot.coord.y)
-            west_node = GameAreaInfo.node_list[west_coord.y*7+west_coord.x]
-            # 西の座標にブロックが存在する場合
-            if west_node.block_id != -1:
-                if west_coord.y > 0:
-                    # 北西を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(west_coord.x, west_coord.y-1)]
-                if west_coord.y < 6:
-                    # 南西を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(west_coord.x, west_coord.y+1)]
+        if coord.x > 0 and pattern & GameAreaInfo.__WEST_BIT:
+            if coord.y > 0:
+                # 北西を走行禁止座標に追加
+                no_entry_xys += [(coord.x-1, coord.y-1)]
+            if coord.y < 6:
+                # 南西を走行禁止座標に追加
+                no_entry_xys += [(coord.x-1, coord.y+1)]
 
         # 北にブロック
-        if robot.coord.y > 0:
-            # 北の座標
-            north_coord = Coordinate(robot.coord.x, robot.coord.y-1)
-            north_node = GameAreaInfo.node_list[north_coord.y*7+north_coord.x]
-            # 北の座標にブロックが存在する場合
-            if north_node.block_id != -1:
-                if north_coord.x > 0:
-                    # 北西を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(north_coord.x-1, north_coord.y)]
-                if north_coord.x < 6:
-                    # 北東を走行禁止座標に追加
-                    no_entry_coords += [Coordinate(north_coord.x+1, north_coord.y)]
-
-        return no_entry_coords
+        if coord.y > 0 and pattern & GameAreaInfo.__NORTH_BIT:
+            if coord.x > 0:
+                # 北西を走行禁止座標に追加
+                no_entry_xys += [(coord.x-1, coord.y-1)]
+            if coord.x < 6:
+                # 北東を走行禁止座標に追加
+                no_entry_xys += [(coord.x+1, coord.y-1)]
+
+        return tuple(no_entry_xys)
 
     @staticmethod
-    def get_no_rotate_direction(robot) -> List[Direction]:
-        """回頭禁止方向を取得する関数.
+    def __make_no_rotate_mask(pattern: int, direct: Direction) -> int:
+        """周囲のブロックのパターンと走行体の方位から回頭禁止方向を求める(テーブル作成用).
 
         Args:
-            robot: 仮想走行体
+            pattern: 周囲のブロックのパターン
+            direct: 走行体の方位
 
         Returns:
-            List[Direction]: 回頭禁止方向の方位リスト
+            int: 回頭禁止方向のビットマスク
         """
         # 回頭禁止方向の方位リスト
         no_rotate_directions = []
 
-        # 走行体の東のノード
-        east_coord = Coordinate(robot.coord.x+1, robot.coord.y)
-        if 0 <= east_coord.x < 7 and 0 <= east_coord.y < 7:
-            node_id = int(east_coord.y * 7 + east_coord.x)
-            east_node = GameAreaInfo.node_list[node_id]
-            # ノードにブロックが存在する場合、西を回頭禁止方向に追加
-            if east_node.block_id != -1:
-                no_rotate_directions += [Direction.W]
-
-        # 走行体の南のノード
-        south_coord = Coordinate(robot.coord.x, robot.coord.y+1)
-        if 0 <= south_coord.x < 7 and 0 <= south_coord.y < 7:
-            node_id = int(south_coord.y * 7 + south_coord.x)
-            south_node = GameAreaInfo.node_list[node_id]
-            # ノードにブロックが存在する場合、北を回頭禁止方向に追加
-            if south_node.block_id != -1:
-                no_rotate_directions += [Direction.N]
-
-        # 走行体の西のノード
-        west_coord = Coordinate(robot.coord.x-1, robot.coord.y)
-        if 0 <= west_coord.x < 7 and 0 <= west_coord.y < 7:
-            node_id = int(west_coord.y * 7 + west_coord.x)
-            west_node = GameAreaInfo.node_list[node_id]
-            # ノードにブロックが存在する場合、東を回頭禁止方向に追加
-            if west_node.block_id != -1:
-                no_rotate_directions += [Direction.E]
-
-        # 走行体の北のノード
-        north_coord = Coordinate(robot.coord.x, robot.coord.y-1)
-        if 0 <= north_coord.x < 7 and 0 <= north_coord.y < 7:
-            node_id = int(north_coord.y * 7 + north_coord.x)
-            north_node = GameAreaInfo.node_list[node_id]
-            # ノードにブロックが存在する場合、南を回頭禁止方向に追加
-            if north_node.block_id != -1:
-                no_rotate_directions += [Direction.S]
+        # 東にブロックが存在する場合、西を回頭禁止方向に追加
+        if pattern & GameAreaInfo.__EAST_BIT:
+            no_rotate_directions += [Direction.W]
+        # 南にブロックが存在する場合、北を回頭禁止方向に追加
+        if pattern & GameAreaInfo.__SOUTH_BIT:
+            no_rotate_directions += [Direction.N]
+        # 西にブロックが存在する場合、東を回頭禁止方向に追加
+        if pattern & GameAreaInfo.__WEST_BIT:
+            no_rotate_directions += [Direction.E]
+        # 北にブロックが存在する場合、南を回頭禁止方向に追加
+        if pattern & GameAreaInfo.__NORTH_BIT:
+            no_rotate_directions += [Direction.S]
 
         # 回頭禁止方向が2つ以上ある場合、それらの間にある方位も回頭禁止方向
         if len(no_rotate_directions) >= 2:
             min_direction_value = min([direction.value for direction in no_rotate_directions])
             max_direction_value = max([direction.value for direction in no_rotate_directions])
-            if min_direction_value < robot.direct.value < max_direction_value:
+            if min_direction_value < direct.value < max_direction_value:
                 for direction_value in range(min_direction_value):
                     no_rotate_directions += [Direction(direction_value)]
                 for direction_value in range(max_direction_value+1, 8):
@@ -259,7 +378,7 @@ class GameAreaInfo:
                 for direction_value in range(min_direction_value+1, max_direction_value):
                     no_rotate_directions += [Direction(direction_value)]
 
-        return no_rotate_directions
+        return sum({1 << direction.value for direction in no_rotate_directions})
 
     @staticmethod
     def move_block(target_block_id: int, target_node: Node) -> None:
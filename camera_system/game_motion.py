@@ -4,12 +4,19 @@
 @author mutotaka0426
 """
 
+import inspect
+import threading
 from abc import ABCMeta, abstractmethod
+from typing import Tuple
+from motion_plan import MotionPlan
 
 
 class Edge:
     """エッジを疑似的なstatic変数として保持するためのクラス.
 
+    generate_commandで単体のゲーム動作のコマンドを順に生成する場合に用いる.
+    計画全体のコマンドは、エッジを明示的に受け渡すgenerate_command_with_edgeで生成し、このクラスは用いない.
+
     __current_edge: 現在のエッジ("left" or "right" or "none")
     """
 
@@ -34,9 +41,65 @@ class Edge:
         Edge.__current_edge = next_edge
 
 
-class GameMotion(metaclass=ABCMeta):
+class GameMotionMeta(ABCMeta):
+    """ゲーム動作のインスタンスをパラメータごとに1つだけ生成する(インターンする)メタクラス.
+
+    同じクラスとパラメータでゲーム動作を生成した場合、初回に生成したインスタンスを返す.
+    動作の探索では同じパラメータのゲーム動作を繰り返し生成するため、生成のたびの確保や計算を省く.
+    複数のスレッドから生成した場合も同じインスタンスを返すように、生成と登録はロックして行う.
+
+    Attributes:
+        __instances: (ゲーム動作のクラス, 引数)ごとのインスタンス
+        __lock (threading.RLock): インスタンスの生成と登録を排他するロック
+    """
+
+    __instances = {}
+    __lock = threading.RLock()
+
+    def __call__(cls, *args, **kwargs):
+        """パラメータに対応するゲーム動作のインスタンスを取得する(初回のみ生成する).
+
+        Returns:
+            GameMotion: ゲーム動作のインスタンス
+        """
+        key = (cls, args, tuple(kwargs.items()))
+        game_motion = GameMotionMeta.__instances.get(key)
+        if game_motion is not None:
+            return game_motion
+        with GameMotionMeta.__lock:
+            # ロックを待つ間に他のスレッドが登録した場合は、そのインスタンスを用いる
+            game_motion = GameMotionMeta.__instances.get(key)
+            if game_motion is None:
+                # キーワード引数や既定値の違いによらず、同じパラメータには同じインスタンスを用いる
+                arguments = inspect.signature(cls.__init__).bind(None, *args, **kwargs)
+                arguments.apply_defaults()
+                params = tuple(arguments.arguments.values())[1:]
+                game_motion = GameMotionMeta.__instances.get((cls, params))
+                if game_motion is None:
+                    game_motion = super().__call__(*params)
+                    game_motion.freeze(params)
+                    GameMotionMeta.__instances[(cls, params)] = game_motion
+                GameMotionMeta.__instances[key] = game_motion
+        return game_motion
+
+    @staticmethod
+    def get_instance_num() -> int:
+        """インターンしたゲーム動作のインスタンスの数を取得する.
+
+        Returns:
+            int: インスタンスの数
+        """
+        with GameMotionMeta.__lock:
+            return len({id(game_motion)
+                        for game_motion in GameMotionMeta.__instances.values()})
+
+
+class GameMotion(metaclass=GameMotionMeta):
     """ゲーム動作の親クラス.
 
+    ゲーム動作はパラメータごとにインターンされ(GameMotionMeta)、生成時にコストを求めた後は変更できない.
+    そのため、インスタンス変数は各クラスの__slots__で宣言する.
+
     attributes:
         MAX_TIME: 最大計測時間
         ROTATION_BLOCK_PWM: ブロックを保持した時の回頭のPWM値
@@ -46,8 +109,14 @@ class GameMotion(metaclass=ABCMeta):
         VERTICAL_TIME: 縦調整の動作時間
         DIAGONAL_TIME: 斜め調整の動作時間
         SLEEP_TIME: 回頭前後のスリープ時間
+        __params: 生成時のパラメータ
+        __cost: 生成時に求めたコスト
+        __commands: 動作開始時のエッジごとの(コマンド, 動作終了時のエッジ)
+        __motion_plans: 動作開始時のエッジごとの(動作計画の中間表現, 動作終了時のエッジ)
     """
 
+    __slots__ = ("__params", "__commands", "__motion_plans", "__cost")
+
     MAX_TIME = 120
     ROTATION_BLOCK_PWM = 70
     ROTATION_NO_BLOCK_PWM = 70
@@ -73,25 +142,123 @@ class GameMotion(metaclass=ABCMeta):
     CORRECTION_BLOCK_PWM = 59       # ブロック保持時の回頭補正に用いるPWM値
     CORRECTION_NO_BLOCK_PWM = 47    # ブロック未保持時の回頭補正に用いるPWM値
 
+    def freeze(self, params: tuple) -> None:
+        """生成時のパラメータを記録してコストを求め、以降の変更を禁止する(GameMotionMetaから呼ばれる).
+
+        Args:
+            params: 生成時のパラメータ
+        """
+        self.__params = params
+        self.__commands = {}
+        self.__motion_plans = {}
+        self.__cost = self.calculate_cost()
+
+    def __setattr__(self, name: str, value) -> None:
+        """生成後のインスタンス変数の変更を禁止する(プロパティは変更できる).
+
+        Raises:
+            AttributeError: 生成後にインスタンス変数を変更した場合
+        """
+        if hasattr(self, "_GameMotion__cost") \
+                and not isinstance(getattr(type(self), name, None), property):
+            raise AttributeError("%s is immutable" % type(self).__name__)
+        super().__setattr__(name, value)
+
     def __eq__(self, other) -> bool:
         """オブジェクトの等価比較をする.
 
         Returns:
             bool: 等価比較の結果
         """
-        return self.__dict__ == other.__dict__  # 全てのインスタンス変数を比較
+        if not isinstance(other, GameMotion):
+            return NotImplemented
+        return type(self) is type(other) and self.__params == other.__params  # パラメータを比較
+
+    def __hash__(self) -> int:
+        """ハッシュ値を求める.
+
+        Returns:
+            int: ハッシュ値
+        """
+        return hash((type(self), self.__params))
+
+    def __reduce__(self) -> tuple:
+        """複製や直列化の際に、パラメータからインターンしたインスタンスを得る.
+
+        Returns:
+            tuple: ゲーム動作のクラス, パラメータ
+        """
+        return type(self), self.__params
 
-    @abstractmethod
     def generate_command(self) -> str:
-        """ゲーム動作に必要なコマンドを生成する抽象メソッド.
+        """現在のエッジからゲーム動作に必要なコマンドを生成し、現在のエッジを更新する.
 
         Returns:
             str: コマンド
         """
-        pass
+        command, self.current_edge = self.generate_command_with_edge(self.current_edge)
+        return command
+
+    def generate_command_with_edge(self, current_edge: str) -> Tuple[str, str]:
+        """動作開始時のエッジからゲーム動作に必要なコマンドを生成する.
+
+        コマンドはゲーム動作のクラス、パラメータ、動作開始時のエッジのみで決まるため、
+        1度生成したコマンドを再利用する(同じパラメータのゲーム動作は同じインスタンスのため共有される).
+
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
+        Returns:
+            str: コマンド
+            str: 動作終了時のエッジ
+        """
+        commands = self.__commands.get(current_edge)
+        if commands is None:
+            commands = self.__commands[current_edge] = self.build_command(current_edge)
+        return commands
+
+    def generate_motion_plan_with_edge(self, current_edge: str) -> Tuple[MotionPlan, str]:
+        """動作開始時のエッジからゲーム動作の動作計画の中間表現を生成する.
+
+        generate_command_with_edgeと同様に、1度生成した中間表現を再利用する.
+
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
+        Returns:
+            MotionPlan: 動作計画の中間表現
+            str: 動作終了時のエッジ
+        """
+        motion_plan = self.__motion_plans.get(current_edge)
+        if motion_plan is None:
+            command, next_edge = self.generate_command_with_edge(current_edge)
+            motion_plan = self.__motion_plans[current_edge] = \
+                (MotionPlan.from_csv(command), next_edge)
+        return motion_plan
 
     @abstractmethod
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
+        """動作開始時のエッジからゲーム動作に必要なコマンドを生成する抽象メソッド.
+
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
+        Returns:
+            str: コマンド
+            str: 動作終了時のエッジ
+        """
+        pass
+
     def get_cost(self) -> float:
+        """生成時に求めたゲーム動作のコストを取得する.
+
+        Returns:
+            float: コスト
+        """
+        return self.__cost
+
+    @abstractmethod
+    def calculate_cost(self) -> float:
         """ゲーム動作のコストを計算する抽象メソッド.
 
         Returns:
@@ -99,17 +266,19 @@ class GameMotion(metaclass=ABCMeta):
         """
         pass
 
-    def get_next_edge(self, angle: int) -> str:
+    def get_next_edge(self, angle: int, current_edge: str = None) -> str:
         """現在のエッジと回頭角度から次のエッジを求める.
 
         Args:
             angle: 方向転換の角度
+            current_edge: 現在のエッジ(省略時はEdgeが保持するエッジ)
 
         Returns:
             str: 次のエッジ("left" or "right" or "none")
         """
         conv_angle = angle % 360  # 時計回りの場合の角度に直す（0~360）
-        current_edge = self.current_edge
+        if current_edge is None:
+            current_edge = self.current_edge
         if current_edge == "left":
             if conv_angle >= 90 and conv_angle <= 225:  # 後方に回頭する場合エッジを反転する
                 return "right"
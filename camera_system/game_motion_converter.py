@@ -8,6 +8,7 @@
 from robot import Robot, Direction
 from coordinate import Coordinate
 from game_area_info import GameAreaInfo
+from game_state import GameState
 from node import Node, NodeType
 from color_changer import Color
 from game_motion import GameMotion
@@ -27,13 +28,16 @@ class GameMotionConverter:
     """動作変換クラス."""
 
     def convert_game_motion(self, current_robot: Robot, next_robot: Robot,
-                            is_set_motion: bool) -> GameMotion:
+                            is_set_motion: bool, occupancy: int = None,
+                            game_state: GameState = None) -> GameMotion:
         """現在の走行体から次の走行体に至るのに必要なゲーム動作を生成する.
 
         Args:
             current_robot: 現在の走行体
             next_robot: 次の走行体
             is_set_motion: 設置動作か取得動作か(True:設置, False:取得)
+            occupancy: ブロックがあるノードのビットボード(省略時はgame_stateから求める)
+            game_state: ゲーム状態(省略時はゲームエリア情報を用いる)
 
         Returns:
             GameMotion: ゲーム動作
@@ -45,8 +49,10 @@ class GameMotionConverter:
         current_node_type = self.__convert_to_node_type(current_robot.coord)
         next_node_type = self.__convert_to_node_type(next_robot.coord)
 
+        if occupancy is None and game_state is not None:
+            occupancy = game_state.occupancy
         # 回頭角度を求める
-        angle = self.__get_rotation_angle(current_robot, next_robot)
+        angle = self.__get_rotation_angle(current_robot, next_robot, occupancy)
 
         # 次の走行体のエッジをセットする
         if current_node_type == NodeType.BLOCK or next_node_type == NodeType.BLOCK:
@@ -60,10 +66,8 @@ class GameMotionConverter:
         # ゲーム動作を生成する
         if current_node_type == NodeType.BLOCK:  # 現在の地点がブロック置き場の場合
             if next_node_type == NodeType.INTERSECTION:  # 次の地点が交点の場合
-                # 交点座標をintersection_listの座標(2*2)に直す
-                conv_x = (next_robot.coord.x // 2) // 2
-                conv_y = (next_robot.coord.y // 2) // 2
-                target_color = GameAreaInfo.intersection_list[conv_x+conv_y*2]  # 交点の色をセットする
+                # 交点の色をセットする
+                target_color = self.__get_intersection_color(next_robot.coord, game_state)
 
                 game_motion = BlockToIntersection(angle, target_color, with_block, can_correction)
 
@@ -145,10 +149,8 @@ class GameMotionConverter:
                 game_motion = MiddleToBlock(angle, need_adjustment, with_block, can_correction)
 
             elif next_node_type == NodeType.INTERSECTION:  # 次の地点が交点の場合
-                # 交点座標をintersection_listの座標(2*2)に直す
-                conv_x = (next_robot.coord.x // 2) // 2
-                conv_y = (next_robot.coord.y // 2) // 2
-                target_color = GameAreaInfo.intersection_list[conv_x+conv_y*2]  # 交点の色をセットする
+                # 交点の色をセットする
+                target_color = self.__get_intersection_color(next_robot.coord, game_state)
 
                 game_motion = MiddleToIntersection(angle, target_color, with_block, can_correction)
 
@@ -173,12 +175,15 @@ class GameMotionConverter:
 
         return game_motion  # ゲーム動作を返す
 
-    def convert_return_motion(self, current_robot: Robot, next_robot: Robot) -> GameMotion:
+    def convert_return_motion(self, current_robot: Robot, next_robot: Robot,
+                              occupancy: int = None, game_state: GameState = None) -> GameMotion:
         """現在の走行体から次の走行体に至るのに必要な復帰動作を生成する.
 
         Args:
             current_robot: 現在の走行体
             next_robot: 次の走行体
+            occupancy: ブロックがあるノードのビットボード(省略時はgame_stateから求める)
+            game_state: ゲーム状態(省略時はゲームエリア情報を用いる)
 
         Returns:
             GameAreaInfo: ゲーム動作
@@ -188,8 +193,10 @@ class GameMotionConverter:
         # 次の走行体のノードタイプを求める
         next_node_type = self.__convert_to_node_type(next_robot.coord)
 
+        if occupancy is None and game_state is not None:
+            occupancy = game_state.occupancy
         # 回頭角度を求める
-        angle = self.__get_rotation_angle(current_robot, next_robot)
+        angle = self.__get_rotation_angle(current_robot, next_robot, occupancy)
 
         # 次の走行体のエッジをセットする
         if next_node_type == NodeType.BLOCK:
@@ -210,10 +217,8 @@ class GameMotionConverter:
             game_motion = ReturnToBlock(angle, need_adjustment)
 
         elif next_node_type == NodeType.INTERSECTION:  # 次の地点が交点の場合
-            # 交点座標をintersection_listの座標(2*2)に直す
-            conv_x = (next_robot.coord.x // 2) // 2
-            conv_y = (next_robot.coord.y // 2) // 2
-            target_color = GameAreaInfo.intersection_list[conv_x+conv_y*2]  # 交点の色をセットする
+            # 交点の色をセットする
+            target_color = self.__get_intersection_color(next_robot.coord, game_state)
 
             game_motion = ReturnToIntersection(angle, target_color)
 
@@ -231,16 +236,35 @@ class GameMotionConverter:
         Returns:
             NodeType: 指定した座標のノードタイプ
         """
-        # 2次元座標を1次配列の形に直してゲームエリア情報のノードリストから取得する
-        node = GameAreaInfo.node_list[coord.x+coord.y*7]
-        return node.node_type
+        # ノードタイプは座標のみから決まるため、ゲームエリア情報を参照せずに求める
+        return Node(-1, coord).node_type
 
-    def __get_rotation_angle(self, current_robot: Robot, next_robot: Robot) -> int:
+    def __get_intersection_color(self, coord: Coordinate, game_state: GameState = None) -> Color:
+        """指定した交点の色を返す.
+
+        Args:
+            coord: 交点の座標
+            game_state: ゲーム状態(省略時はゲームエリア情報を用いる)
+
+        Returns:
+            Color: 交点の色
+        """
+        intersection_list = GameAreaInfo.intersection_list
+        if game_state is not None:
+            intersection_list = game_state.intersection_list
+        # 交点座標をintersection_listの座標(2*2)に直す
+        conv_x = (coord.x // 2) // 2
+        conv_y = (coord.y // 2) // 2
+        return intersection_list[conv_x+conv_y*2]
+
+    def __get_rotation_angle(self, current_robot: Robot, next_robot: Robot,
+                             occupancy: int = None) -> int:
         """二つの走行体の方位から回頭角度を求める.
 
         Args:
             current_robot: 現在の走行体
             next_robot: 次の走行体
+            occupancy: ブロックがあるノードのビットボード(省略時はnode_listから求める)
 
         Returns:
             int: 回頭角度
@@ -249,23 +273,23 @@ class GameMotionConverter:
         current_value = current_robot.direct.value
         next_value = next_robot.direct.value
 
-        # 回頭禁止方向のリストを取得
-        no_rotate_list = GameAreaInfo.get_no_rotate_direction(current_robot)
+        # 回頭禁止方向のビットマスクを取得
+        no_rotate_mask = GameAreaInfo.get_no_rotate_mask(current_robot, occupancy)
 
         # 時計回りの場合を考える
         clockwise_angle = 360
         direct_diff = ((next_value+8)-current_value) % 8  # 時計回りの場合の方位差
-        # next_directまで時計回りした場合に向く方位のリストをセットする
-        direct_list = [Direction((current_value+diff) % 8) for diff in range(1, direct_diff+1)]
-        if set(direct_list) & set(no_rotate_list) == set():  # 時計回りする時に回頭禁止方向に当たらない場合(同じ方位がない場合)
+        # next_directまで時計回りした場合に向く方位のビットマスクをセットする
+        direct_mask = sum(1 << ((current_value+diff) % 8) for diff in range(1, direct_diff+1))
+        if direct_mask & no_rotate_mask == 0:  # 時計回りする時に回頭禁止方向に当たらない場合(同じ方位がない場合)
             clockwise_angle = direct_diff * 45
 
         # 反時計回りの場合を考える
         anticlockwise_angle = -360
         direct_diff = ((current_value+8)-next_value) % 8  # 反時計回りの場合の方位差
-        # next_directまで反時計回りした場合に向く方位のリストをセットする
-        direct_list = [Direction((current_value-diff) % 8) for diff in range(1, direct_diff+1)]
-        if set(direct_list) & set(no_rotate_list) == set():  # 反時計回りする時に回頭禁止方向に当たらない場合(同じ方位がない場合)
+        # next_directまで反時計回りした場合に向く方位のビットマスクをセットする
+        direct_mask = sum(1 << ((current_value-diff) % 8) for diff in range(1, direct_diff+1))
+        if direct_mask & no_rotate_mask == 0:  # 反時計回りする時に回頭禁止方向に当たらない場合(同じ方位がない場合)
             anticlockwise_angle = direct_diff * -45
 
         # 時計回りも反時計回りも角度が360の場合，目的の方位まで回頭できないためエラーを出す
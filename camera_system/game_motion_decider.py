@@ -5,8 +5,9 @@
 """
 
 import copy
-from typing import List
+from typing import List, Tuple
 from game_area_info import GameAreaInfo
+from game_state import GameState
 from node import Node, NodeType
 from robot import Robot, Direction
 from color_changer import Color
@@ -22,60 +23,69 @@ class GameMotionDecider:
     def decide(cls, current_robot: Robot, target_block_id: int) -> List[CompositeGameMotion]:
         """指定されたブロックの運搬動作を決定して返す.
 
+        ゲームエリア情報からゲーム状態を生成して運搬動作を決定し、運搬後のブロックの配置をゲームエリア情報に反映する.
+
+        Args:
+            current_robot:   現在の走行体
+            target_block_id: 運搬対象ブロックのID
+        Returns:
+            運搬動作: List[CompositeGameMotion]
+        """
+        game_motions, next_game_state = cls.decide_with_state(
+            current_robot, target_block_id, GameState.from_game_area_info())
+        next_game_state.apply_to_game_area_info()
+        return game_motions
+
+    @classmethod
+    def decide_with_state(cls, current_robot: Robot, target_block_id: int,
+                          game_state: GameState) -> Tuple[List[CompositeGameMotion], GameState]:
+        """指定されたゲーム状態において、指定されたブロックの運搬動作を決定して返す.
+
         Args:
             current_robot:   現在の走行体
             target_block_id: 運搬対象ブロックのID
+            game_state:      現在のゲーム状態
         Returns:
-            運搬動作後の走行体: Robot
+            運搬動作: List[CompositeGameMotion]
+            運搬後のゲーム状態: GameState
         """
         # ブロックがあるノードを取得する
-        on_block_node = [node for node in GameAreaInfo.node_list
+        on_block_node = [node for node in game_state.node_list
                          if node.block_id == target_block_id]
         if on_block_node == []:
             print("Block %d is not exist." % (target_block_id))
-            return []
+            return [], game_state
         on_block_node = on_block_node[0]
         if on_block_node.node_type != NodeType.BLOCK:
             print("This block is already transported.")
-            return []
+            return [], game_state
 
         # ブロック取得動作の探索用ロボット
         get_robot = copy.deepcopy(current_robot)
         # ブロック取得動作を探索する
-        get_block_game_motion = OptimalMotionSearcher.search(get_robot, on_block_node)
+        get_block_game_motion = OptimalMotionSearcher.search(get_robot, on_block_node, game_state)
 
         # 設置先ノードの候補を取得する
-        target_block_color = GameAreaInfo.block_color_list[target_block_id]
-        candidate_nodes = GameAreaInfo.get_candidate_node(target_block_color)
-        candidate_set_block_game_motions = []
-        candidate_set_robots = []
-        costs = []
-        # 各設置先ノードの候補について設置動作を探索する
-        for candidate_node in candidate_nodes:
-            # ブロック設置動作の探索用ロボット
-            candidate_set_robot = copy.deepcopy(get_robot)
-            # ブロック設置動作を探索する
-            candidate_set_block_game_motion = OptimalMotionSearcher.search(
-                candidate_set_robot, candidate_node)
-            candidate_set_block_game_motions += [candidate_set_block_game_motion]
-            candidate_set_robots += [candidate_set_robot]
-            # 動作が探索できなかった場合、コストを無限大にする
-            cost = candidate_set_block_game_motion.get_cost()
-            costs += [cost if cost > 0 else float("inf")]
-        # コストが最小なブロック設置動作を採用する
-        mindex = costs.index(min(costs))
+        target_block_color = game_state.block_color_list[target_block_id]
+        candidate_nodes = game_state.get_candidate_node(target_block_color)
+        # ブロック設置動作の探索用ロボット
+        set_robot = copy.deepcopy(get_robot)
+        # 全ての設置先ノードの候補について一度に設置動作を探索し、コストが最小なブロック設置動作を採用する
+        mindex, set_block_game_motion, _ = OptimalMotionSearcher.search_multi(
+            set_robot, candidate_nodes, game_state)
+        # 動作が探索できなかった場合、先頭の候補に設置したとみなす
+        if mindex == -1:
+            mindex = 0
         set_block_node = candidate_nodes[mindex]
-        set_block_game_motion = candidate_set_block_game_motions[mindex]
-        set_robot = candidate_set_robots[mindex]
 
-        # 運搬対象のブロックを更新する
-        GameAreaInfo.move_block(target_block_id, set_block_node)
+        # 運搬対象のブロックを移動したゲーム状態を求める
+        next_game_state = game_state.move_block(target_block_id, set_block_node)
         # ブロックを取得したとして、走行体の座標を更新する
         current_robot.coord = set_robot.coord
         current_robot.direct = set_robot.direct
         current_robot.edge = set_robot.edge
         # 運搬動作を返す
-        return [get_block_game_motion, set_block_game_motion]
+        return [get_block_game_motion, set_block_game_motion], next_game_state
 
 
 if __name__ == "__main__":
@@ -4,65 +4,177 @@
 @author: miyashita64
 """
 
+from typing import Dict, List, Tuple
 from game_area_info import GameAreaInfo
+from game_state import GameState
 from robot import Robot, Direction
 from coordinate import Coordinate
 from color_changer import Color
 from block_selector import BlockSelector
 from game_motion_decider import GameMotionDecider
+from composite_game_motion import CompositeGameMotion
+from motion_plan import MotionPlan
+from exact_game_planner import ExactGamePlanner
+from anytime_game_planner import AnytimeGamePlanner
 
 
 class GamePlanner:
-    """ゲーム攻略を計画するクラス."""
+    """ゲーム攻略を計画するクラス.
+
+    Attributes:
+        STRATEGIES (Tuple[str]): 計画の戦略
+            "greedy": 次に運搬するブロックと設置先を1つずつ決める
+            "exact": 全てのブロックの運搬順と設置先の組み合わせから合計コストが最小の計画を求める
+            "anytime": 貪欲法の計画を制限時間まで改善する
+        __last_stats (Dict[str, object]): 直前の計画の統計情報
+    """
+
+    STRATEGIES = ("greedy", "exact", "anytime")
+    __last_stats = {}
 
     @classmethod
-    def plan(cls, is_left_course) -> str:
+    def plan(cls, is_left_course, game_state: GameState = None, strategy: str = "greedy",
+             time_limit: float = 1.0) -> str:
         """ゲーム攻略を計画する.
 
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態(省略時はゲームエリア情報から生成する)
+            strategy: 計画の戦略("greedy", "exact" or "anytime")
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
         Returns:
             動作コマンド: str
         """
-        # 運搬動作を実現するゲーム動作群のリスト
-        game_motions_list = []
+        game_motions_list, current_edge = cls.__plan_game_motions(
+            is_left_course, game_state, strategy, time_limit)
+        # ボーナスブロック設置後の走行体のエッジから順に、ゲーム動作群のリストからコマンドを生成する
+        motion_commands = []
+        for game_motions in game_motions_list:
+            commands, current_edge = game_motions.generate_command_with_edge(current_edge)
+            motion_commands.append(commands)
+
+        # 動作コマンドの文字列を返す
+        return "".join(motion_commands)
+
+    @classmethod
+    def plan_motion_plan(cls, is_left_course, game_state: GameState = None,
+                         strategy: str = "greedy", time_limit: float = 1.0) -> MotionPlan:
+        """ゲーム攻略を計画し、動作計画の中間表現を生成する.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態(省略時はゲームエリア情報から生成する)
+            strategy: 計画の戦略("greedy", "exact" or "anytime")
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
+        Returns:
+            動作計画の中間表現(ゲーム動作の番号は計画全体での番号): MotionPlan
+        """
+        game_motions_list, current_edge = cls.__plan_game_motions(
+            is_left_course, game_state, strategy, time_limit)
+        motion_plans = []
+        for game_motions in game_motions_list:
+            for game_motion in game_motions.game_motion_list:
+                motion_plan, current_edge = game_motion.generate_motion_plan_with_edge(
+                    current_edge)
+                motion_plans.append(motion_plan)
+        return MotionPlan.concatenate(motion_plans)
+
+    @classmethod
+    def __plan_game_motions(cls, is_left_course, game_state: GameState, strategy: str,
+                            time_limit: float) -> Tuple[List[CompositeGameMotion], str]:
+        """ゲーム攻略を計画し、運搬動作を実現するゲーム動作群のリストを求める.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態(Noneの場合はゲームエリア情報から生成する)
+            strategy: 計画の戦略("greedy", "exact" or "anytime")
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
+        Returns:
+            ゲーム動作群のリスト: List[CompositeGameMotion]
+            ボーナスブロック設置後の走行体のエッジ: str
+        """
+        if strategy not in cls.STRATEGIES:
+            raise ValueError("Unknown strategy '%s'. Expected one of %s." %
+                             (strategy, ", ".join(cls.STRATEGIES)))
+        if game_state is None:
+            game_state = GameState.from_game_area_info()
+        # ボーナスブロック設置後の走行体を求める
+        robot = cls.get_start_robot(is_left_course, game_state)
+        start_edge = robot.edge
+        # ボーナスブロックを運搬する
+        game_state = game_state.carry_bonus()
+
+        # 全てのカラーブロックについて、運搬動作を決定する
+        if strategy == "exact":
+            game_motions_list, cls.__last_stats = ExactGamePlanner.plan(robot, game_state)
+            print("Exact planning explored %d states with %d searches (%d infeasible) "
+                  "in %.2f s (cost %.4f)." %
+                  (cls.__last_stats["explored"], cls.__last_stats["searches"],
+                   cls.__last_stats["infeasible"], cls.__last_stats["time"],
+                   cls.__last_stats["cost"]))
+            # 全てのブロックを運搬する計画が見つからない場合、貪欲法で計画する
+            if game_motions_list is None:
+                print("Exact planning failed. Fall back to the greedy strategy.")
+                strategy = "greedy"
+        if strategy == "anytime":
+            game_motions_list, cls.__last_stats = AnytimeGamePlanner.plan(
+                robot, game_state, time_limit)
+        if strategy == "greedy":
+            # 運搬動作を実現するゲーム動作群のリスト
+            game_motions_list = []
+            block_selector = BlockSelector()
+            while game_state.get_no_transported_block() != []:
+                on_block_node = block_selector.select_block(robot, game_state)
+                game_motions, game_state = GameMotionDecider.decide_with_state(
+                    robot, on_block_node.block_id, game_state)
+                game_motions_list += game_motions
+            cls.__last_stats = {"cost": sum(game_motions.get_cost()
+                                            for game_motions in game_motions_list)}
+        return game_motions_list, start_edge
+
+    @staticmethod
+    def get_start_robot(is_left_course, game_state: GameState) -> Robot:
+        """ボーナスブロックを運搬・復帰した後の走行体を求める.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            ボーナスブロック設置後の走行体: Robot
+        """
         # 各ボーナスブロック運搬・復帰後の走行体
         setted_bonus_robots = {
             "left": {
-                GameAreaInfo.base_color_list[0].value:
+                game_state.base_color_list[0].value:
                     Robot(Coordinate(4, 4), Direction.E, "left"),
-                GameAreaInfo.base_color_list[1].value:
+                game_state.base_color_list[1].value:
                     Robot(Coordinate(4, 4), Direction.S, "right"),
-                GameAreaInfo.base_color_list[2].value:
+                game_state.base_color_list[2].value:
                     Robot(Coordinate(2, 4), Direction.W, "right"),
-                GameAreaInfo.base_color_list[3].value:
+                game_state.base_color_list[3].value:
                     Robot(Coordinate(4, 2), Direction.N, "right")},
             "right": {
-                GameAreaInfo.base_color_list[0].value:
+                game_state.base_color_list[0].value:
                     Robot(Coordinate(4, 4), Direction.E, "left"),
-                GameAreaInfo.base_color_list[1].value:
+                game_state.base_color_list[1].value:
                     Robot(Coordinate(2, 4), Direction.S, "left"),
-                GameAreaInfo.base_color_list[2].value:
+                game_state.base_color_list[2].value:
                     Robot(Coordinate(2, 4), Direction.W, "right"),
-                GameAreaInfo.base_color_list[3].value:
+                game_state.base_color_list[3].value:
                     Robot(Coordinate(2, 2), Direction.N, "left")}}
-        # ボーナスブロック設置後の走行体を求める
-        bonus_color = GameAreaInfo.bonus_color.value
+        bonus_color = game_state.bonus_color.value
         course_text = "left" if is_left_course else "right"
-        robot = setted_bonus_robots[course_text][bonus_color]
-        # ボーナスブロックを運搬する
-        GameAreaInfo.carry_bonus()
+        return setted_bonus_robots[course_text][bonus_color]
 
-        # 全てのカラーブロックについて、運搬動作を決定する
-        block_selector = BlockSelector()
-        while GameAreaInfo.get_no_transported_block() != []:
-            on_block_node = block_selector.select_block(robot)
-            game_motions_list += GameMotionDecider.decide(robot, on_block_node.block_id)
-        # ゲーム動作群のリストからコマンドを生成する
-        motion_commands = ""
-        for game_motions in game_motions_list:
-            motion_commands += game_motions.generate_command()
+    @classmethod
+    def get_last_stats(cls) -> Dict[str, object]:
+        """直前の計画の統計情報を取得する.
 
-        # 動作コマンドの文字列を返す
-        return motion_commands
+        Returns:
+            合計コスト(戦略が"exact"の場合は展開した状態数、生成した状態数、最適動作の探索回数、所要時間、
+            "anytime"の場合は所要時間、評価した計画数、改善の推移も含む): Dict[str, object]
+        """
+        return dict(cls.__last_stats)
 
 
 if __name__ == "__main__":
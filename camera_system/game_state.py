@@ -0,0 +1,251 @@
+"""ゲーム状態モジュール.
+
+ゲームの計画に必要な状態を保持する不変クラスを定義している
+@author: miyashita64
+"""
+
+from typing import List, Tuple
+from color_changer import Color
+from node import Node, NodeType
+from coordinate import Coordinate
+from game_area_info import GameAreaInfo
+
+
+class GameState:
+    """ゲームの計画に必要な状態を保持する不変クラス.
+
+    GameAreaInfoのクラス変数と異なり、インスタンスは変更されないため、
+    複数の計画を並行して実行したり、状態をキーに計画結果をキャッシュしたりできる.
+    ブロックの移動は、変更を反映した新しいインスタンスを返す.
+
+    Attributes:
+        __block_ids (Tuple[int]): 各ノード(y*7 + x番目)にあるブロックのID(ブロックがない場合は-1)
+        __block_colors (Tuple[Color]): ブロックの色のタプル
+        __base_colors (Tuple[Color]): ベースブロックの色のタプル
+        __bonus_color (Color): ボーナスブロックの色
+        __intersection_colors (Tuple[Color]): 交点の色のタプル
+        __occupancy (int): ブロックがあるノードのビットボード
+    """
+
+    def __init__(self, block_ids: Tuple[int, ...], block_colors: Tuple[Color, ...],
+                 base_colors: Tuple[Color, ...], bonus_color: Color,
+                 intersection_colors: Tuple[Color, ...]) -> None:
+        """GameStateのコンストラクタ.
+
+        Args:
+            block_ids: 各ノード(y*7 + x番目)にあるブロックのID(ブロックがない場合は-1)
+            block_colors: ブロックの色
+            base_colors: ベースブロックの色
+            bonus_color: ボーナスブロックの色
+            intersection_colors: 交点の色
+        """
+        self.__block_ids = tuple(block_ids)
+        self.__block_colors = tuple(block_colors)
+        self.__base_colors = tuple(base_colors)
+        self.__bonus_color = bonus_color
+        self.__intersection_colors = tuple(intersection_colors)
+        self.__occupancy = sum(1 << node_id for node_id, block_id in enumerate(self.__block_ids)
+                               if block_id != -1)
+        self.__hash = None
+
+    @classmethod
+    def from_game_area_info(cls) -> "GameState":
+        """現在のゲームエリア情報からゲーム状態を生成する.
+
+        Returns:
+            GameState: ゲーム状態
+        """
+        block_ids = [-1] * 49
+        for node in GameAreaInfo.node_list:
+            block_ids[node.coord.y * 7 + node.coord.x] = node.block_id
+        # ボーナスブロックの色が未設定の場合はNoneとする
+        bonus_color = GameAreaInfo.bonus_color
+        if not isinstance(bonus_color, Color):
+            bonus_color = None
+        return cls(block_ids, GameAreaInfo.block_color_list, GameAreaInfo.base_color_list,
+                   bonus_color, GameAreaInfo.intersection_list)
+
+    def apply_to_game_area_info(self) -> None:
+        """ブロックの配置をゲームエリア情報のノードに反映する."""
+        for node in GameAreaInfo.node_list:
+            node.block_id = self.__block_ids[node.coord.y * 7 + node.coord.x]
+
+    def __eq__(self, other) -> bool:
+        """オブジェクトの等価比較をする.
+
+        Returns:
+            bool: 等価比較の結果
+        """
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self.__key() == other.__key()
+
+    def __hash__(self) -> int:
+        """ハッシュ値を求める.
+
+        Returns:
+            int: ハッシュ値
+        """
+        if self.__hash is None:
+            self.__hash = hash(self.__key())
+        return self.__hash
+
+    def __key(self) -> tuple:
+        """等価比較とハッシュ値に用いるタプルを求める.
+
+        Returns:
+            tuple: 状態を表すタプル
+        """
+        return (self.__block_ids, self.__block_colors, self.__base_colors,
+                self.__bonus_color, self.__intersection_colors)
+
+    @property
+    def block_ids(self) -> Tuple[int, ...]:
+        """Getter.
+
+        Returns:
+            Tuple[int, ...]: 各ノード(y*7 + x番目)にあるブロックのID
+        """
+        return self.__block_ids
+
+    @property
+    def block_color_list(self) -> Tuple[Color, ...]:
+        """Getter.
+
+        Returns:
+            Tuple[Color, ...]: ブロックの色
+        """
+        return self.__block_colors
+
+    @property
+    def base_color_list(self) -> Tuple[Color, ...]:
+        """Getter.
+
+        Returns:
+            Tuple[Color, ...]: ベースブロックの色
+        """
+        return self.__base_colors
+
+    @property
+    def bonus_color(self) -> Color:
+        """Getter.
+
+        Returns:
+            Color: ボーナスブロックの色
+        """
+        return self.__bonus_color
+
+    @property
+    def intersection_list(self) -> Tuple[Color, ...]:
+        """Getter.
+
+        Returns:
+            Tuple[Color, ...]: 交点の色
+        """
+        return self.__intersection_colors
+
+    @property
+    def occupancy(self) -> int:
+        """Getter.
+
+        Returns:
+            int: ブロックがあるノードのビットボード
+        """
+        return self.__occupancy
+
+    @property
+    def node_list(self) -> List[Node]:
+        """Getter.
+
+        Returns:
+            List[Node]: ノードリスト(呼び出しごとに生成するため、変更してもゲーム状態には影響しない)
+        """
+        return [Node(block_id, Coordinate(node_id % 7, node_id // 7))
+                for node_id, block_id in enumerate(self.__block_ids)]
+
+    def get_block_id(self, coord: Coordinate) -> int:
+        """指定した座標にあるブロックのIDを取得する.
+
+        Args:
+            coord: 座標
+
+        Returns:
+            int: ブロックのID(ブロックがない場合は-1)
+        """
+        return self.__block_ids[coord.y * 7 + coord.x]
+
+    def get_candidate_node(self, color: Color) -> List[Node]:
+        """設置先ノードの候補を取得する.
+
+        Args:
+            color: 運搬するブロックの色
+
+        Returns:
+            List[Node]: 候補ノード
+        """
+        cand_coordinates = GameAreaInfo.get_candidate_coordinates(color, self.__base_colors)
+        # 候補ノードになりうるノードの中で設置済みのブロックが無いノードを返す
+        return [Node(-1, coord) for coord in cand_coordinates if self.get_block_id(coord) == -1]
+
+    def get_no_transported_block(self) -> List[Node]:
+        """運搬していないブロックがあるブロック置き場を取得する.
+
+        Returns:
+            List[Node]: 運搬していないブロックがあるブロック置き場のノード
+        """
+        return [node for node in self.node_list
+                if node.block_id != -1 and node.node_type == NodeType.BLOCK]
+
+    def move_block(self, target_block_id: int, target_node: Node) -> "GameState":
+        """指定したブロックを指定したノードに移動したゲーム状態を返す.
+
+        Args:
+            target_block_id: 移動するブロックのID
+            target_node: ブロックの移動先ノード
+
+        Returns:
+            GameState: ブロックを移動したゲーム状態(移動できない場合は自身)
+        """
+        target_node_id = target_node.coord.y * 7 + target_node.coord.x
+        # 移動先ノードに既にブロックがある場合
+        if self.__block_ids[target_node_id] != -1:
+            print("The block already exist on target node.")
+            return self
+        if target_block_id not in self.__block_ids:
+            print("The block does not exist on game area.")
+            return self
+        block_ids = list(self.__block_ids)
+        block_ids[block_ids.index(target_block_id)] = -1
+        block_ids[target_node_id] = target_block_id
+        return self.__replace_block_ids(block_ids)
+
+    def carry_bonus(self) -> "GameState":
+        """ボーナスブロックを運搬したゲーム状態を返す.
+
+        Returns:
+            GameState: ボーナスブロックを運搬したゲーム状態(運搬できない場合は自身)
+        """
+        cand_coordinates = GameAreaInfo.get_candidate_coordinates(self.__bonus_color,
+                                                                  self.__base_colors)
+        set_bonus_coord = [coord for coord in cand_coordinates
+                           if coord.x == 3 or coord.y == 3][0]
+        if self.get_block_id(set_bonus_coord) != -1:
+            print("The block already exist on target node.")
+            return self
+        block_ids = list(self.__block_ids)
+        block_ids[set_bonus_coord.y * 7 + set_bonus_coord.x] = 8
+        return self.__replace_block_ids(block_ids)
+
+    def __replace_block_ids(self, block_ids: List[int]) -> "GameState":
+        """ブロックの配置のみを置き換えたゲーム状態を生成する.
+
+        ブロックの配置以外のタプルは変更されないため、コピーせずに共有する.
+
+        Args:
+            block_ids: 各ノードにあるブロックのID
+
+        Returns:
+            GameState: ゲーム状態
+        """
+        return GameState(block_ids, self.__block_colors, self.__base_colors,
+                         self.__bonus_color, self.__intersection_colors)
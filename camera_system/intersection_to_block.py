@@ -5,12 +5,19 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 
 
 class IntersectionToBlock(GameMotion):
     """交点→ブロック置き場のゲーム動作クラス."""
 
+    __slots__ = ("__first_angle", "__second_angle", "__rotation_pwm", "__first_rotation_time",
+                 "__second_rotation_time", "__correction_pwm", "__direct_rotation",
+                 "__vertical_flag", "__diagonal_flag", "__can_first_correction",
+                 "__can_second_correction", "__correction_first_target_angle",
+                 "__correction_second_target_angle", "__motion_time", "__success_rate")
+
     def __init__(self, angle: int, vertical_flag: bool, diagonal_flag: bool,
                  with_block: bool, can_first_correction: bool, can_second_correction: bool) -> None:
         """IntersectionToBlockのコンストラクタ.
@@ -63,11 +70,15 @@ class IntersectionToBlock(GameMotion):
         self.__motion_time = 0.8615
         self.__success_rate = 0.9
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """交点→ブロック置き場のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -114,11 +125,12 @@ class IntersectionToBlock(GameMotion):
         command_list += "DS,20,70\n"    # 試走で足りなかった分
 
         # エッジ切り替えのコマンドは生成しないが，計算上はエッジをnoneにする
-        self.current_edge = "none"
+        current_edge = "none"
 
-        return command_list.replace("\n", ",交点→ブロック置き場\n", 1)  # 最初の行の末尾に",交点→ブロック置き場"を追加する
+        # 最初の行の末尾に",交点→ブロック置き場"を追加する
+        return command_list.replace("\n", ",交点→ブロック置き場\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """交点→ブロック置き場のゲーム動作のコストを計算するメソッド.
 
         Returns:
@@ -5,12 +5,17 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 
 
 class IntersectionToMiddle(GameMotion):
     """交点→中点のゲーム動作クラス."""
 
+    __slots__ = ("__angle", "__rotation_angle", "__rotation_pwm", "__rotation_time",
+                 "__correction_pwm", "__direct_rotation", "__need_adjustment", "__can_correction",
+                 "__correction_target_angle", "__motion_time", "__success_rate")
+
     def __init__(self, angle: int, need_adjustment: bool,
                  with_block: bool, can_correction: bool) -> None:
         """IntersectionToMiddleのコンストラクタ.
@@ -40,11 +45,15 @@ class IntersectionToMiddle(GameMotion):
         self.__motion_time = 0.553
         self.__success_rate = 0.94
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """交点→中点のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -61,9 +70,9 @@ class IntersectionToMiddle(GameMotion):
             command_list += "SL,%d\n" % (GameMotion.SLEEP_TIME * 1000)
 
         # 回頭後にエッジが切り替わる場合，エッジ切り替えをセットする
-        if (next_edge := self.get_next_edge(self.__angle)) != self.current_edge:
+        if (next_edge := self.get_next_edge(self.__angle, current_edge)) != current_edge:
             command_list += "EC,%s\n" % next_edge
-            self.current_edge = next_edge  # 現在のエッジを更新する
+            current_edge = next_edge  # 現在のエッジを更新する
 
         # 調整動作ありの場合，縦調整をセットする
         if self.__need_adjustment:
@@ -71,9 +80,10 @@ class IntersectionToMiddle(GameMotion):
 
         command_list += "DL,80,0,60,0.1,0.08,0.08\n"  # 中点までライントレース
 
-        return command_list.replace("\n", ",交点→中点\n", 1)  # 最初の行の末尾に",交点→中点"を追加する
+        # 最初の行の末尾に",交点→中点"を追加する
+        return command_list.replace("\n", ",交点→中点\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """交点→中点のゲーム動作のコストを計算するメソッド.
 
         Returns:
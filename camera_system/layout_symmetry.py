@@ -0,0 +1,235 @@
+"""配置の対称性モジュール.
+
+ゲームエリアの回転・鏡映と色の付け替えで移り合う配置を、1つの代表(正準形)にまとめる
+@author: miyashita64
+"""
+
+from typing import Iterable, Tuple
+from robot import Robot, Direction
+from coordinate import Coordinate
+from color_changer import Color
+from game_state import GameState
+
+
+class LayoutSymmetry:
+    """配置の対称性を扱うクラス.
+
+    ゲームエリア(7*7のノード、ブロック置き場、東西南北のベースエリア)は、中心周りの90度回転と
+    鏡映(左右反転)の8通りの変換で自身に移る. 変換は(時計回りの回転の回数, 鏡映するか)で表し、
+    鏡映してから回転する. 動作コマンドは走行体から見た相対的な動作のため、回転では変わらず、
+    鏡映では回頭の向きとエッジの左右が入れ替わる. 交点の色は動作コマンドに現れるため、変換後の位置に移す.
+
+    ブロックの色は、どのベースエリアに運搬するかのみが計画に影響する. そのため、変換後のベースエリアの
+    方位(東南西北)の順に色を付け替え、ベースブロックの色を常に(赤, 黄, 緑, 青)にする.
+    ブロックのIDは変換後のノードの番号順に付け直す.
+
+    Attributes:
+        TRANSFORMS (Tuple[Tuple[int, bool]]): 全ての変換
+        IDENTITY (Tuple[int, bool]): 恒等変換
+        MIRROR (Tuple[int, bool]): 鏡映(LコースとRコースの交点の色は鏡映で移り合う)
+        __COLORS (Tuple[Color]): 付け替え後のベースブロックの色
+        __BASE_COORDINATES (Tuple[Coordinate]): ベースエリアの中央の座標(東南西北の順)
+        __INTERSECTION_COORDINATES (Tuple[Coordinate]): 交点の色のリストの順の、各交点群の代表座標
+    """
+
+    TRANSFORMS = tuple((rotation, is_mirrored)
+                       for is_mirrored in (False, True) for rotation in range(4))
+    IDENTITY = (0, False)
+    MIRROR = (0, True)
+
+    __COLORS = (Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE)
+    __BASE_COORDINATES = (Coordinate(6, 3), Coordinate(3, 6), Coordinate(0, 3), Coordinate(3, 0))
+    __INTERSECTION_COORDINATES = (Coordinate(0, 0), Coordinate(6, 0),
+                                  Coordinate(0, 6), Coordinate(6, 6))
+
+    @staticmethod
+    def transform_coordinate(coord: Coordinate, transform: Tuple[int, bool]) -> Coordinate:
+        """座標を変換する.
+
+        Args:
+            coord: 座標
+            transform: 変換
+        Returns:
+            変換後の座標: Coordinate
+        """
+        rotation, is_mirrored = transform
+        x, y = (6 - coord.x if is_mirrored else coord.x), coord.y
+        for _ in range(rotation):
+            x, y = 6 - y, x
+        return Coordinate(x, y)
+
+    @classmethod
+    def transform_robot(cls, robot: Robot, transform: Tuple[int, bool]) -> Robot:
+        """走行体を変換する.
+
+        Args:
+            robot: 走行体
+            transform: 変換
+        Returns:
+            変換後の走行体: Robot
+        """
+        rotation, is_mirrored = transform
+        direct_value = (8 - robot.direct.value) % 8 if is_mirrored else robot.direct.value
+        edge = robot.edge
+        if is_mirrored and edge != "none":
+            edge = "right" if edge == "left" else "left"
+        return Robot(cls.transform_coordinate(robot.coord, transform),
+                     Direction((direct_value + rotation * 2) % 8), edge)
+
+    @classmethod
+    def transform_game_state(cls, game_state: GameState,
+                             transform: Tuple[int, bool]) -> GameState:
+        """ゲーム状態を変換し、ブロックの色とIDを付け替える.
+
+        Args:
+            game_state: ゲーム状態
+            transform: 変換
+        Returns:
+            変換後のゲーム状態: GameState
+        """
+        # 変換後の各ベースエリアの方位の番号
+        base_indexes = [cls.__get_base_index(cls.transform_coordinate(coord, transform))
+                        for coord in cls.__BASE_COORDINATES]
+        base_colors = list(game_state.base_color_list)
+        if sorted(base_colors, key=lambda color: color.value) == list(cls.__COLORS):
+            # 変換後のベースエリアの方位の順に色を付け替える
+            color_map = {base_colors[i]: cls.__COLORS[base_indexes[i]] for i in range(4)}
+            next_base_colors = list(cls.__COLORS)
+        else:
+            # 色を付け替えられない場合は、ベースブロックの色を変換後のベースエリアに移すのみとする
+            color_map = {}
+            next_base_colors = base_colors[:]
+            for i, base_index in enumerate(base_indexes[:len(base_colors)]):
+                next_base_colors[base_index] = base_colors[i]
+
+        # ブロックを変換後の座標に移し、カラーブロックのIDをノードの番号順に付け直す
+        moved_block_ids = [-1] * 49
+        for node_id, block_id in enumerate(game_state.block_ids):
+            if block_id != -1:
+                coord = cls.transform_coordinate(Coordinate(node_id % 7, node_id // 7), transform)
+                moved_block_ids[coord.y * 7 + coord.x] = block_id
+        block_colors = game_state.block_color_list
+        old_block_ids = [block_id for block_id in moved_block_ids
+                         if 0 <= block_id < len(block_colors)]
+        id_map = {old_block_id: new_block_id
+                  for new_block_id, old_block_id in enumerate(old_block_ids)}
+        next_block_ids = [id_map.get(block_id, block_id) for block_id in moved_block_ids]
+        next_block_colors = list(block_colors)
+        for old_block_id, new_block_id in id_map.items():
+            next_block_colors[new_block_id] = color_map.get(block_colors[old_block_id],
+                                                            block_colors[old_block_id])
+        bonus_color = color_map.get(game_state.bonus_color, game_state.bonus_color)
+
+        # 交点の色を変換後の交点群に移す
+        intersection_colors = list(game_state.intersection_list)
+        if len(intersection_colors) == len(cls.__INTERSECTION_COORDINATES):
+            for i, coord in enumerate(cls.__INTERSECTION_COORDINATES):
+                intersection_colors[cls.__get_intersection_index(
+                    cls.transform_coordinate(coord, transform))] = game_state.intersection_list[i]
+        return GameState(next_block_ids, next_block_colors, next_base_colors, bonus_color,
+                         intersection_colors)
+
+    @classmethod
+    def canonicalize(cls, robot: Robot, game_state: GameState,
+                     transforms: Iterable[Tuple[int, bool]] = TRANSFORMS
+                     ) -> Tuple[Robot, GameState, Tuple[int, bool]]:
+        """走行体とゲーム状態を正準形に変換する.
+
+        全ての変換のうち、変換後の(交点の色, 走行体, ブロックの配置, ブロックの色, ボーナスブロックの色)が
+        辞書順で最小となるものを正準形とする. 交点の色が4色とも異なる場合、交点の色の並びだけで変換が決まる.
+
+        NOTE: 動作の探索は、回頭禁止方向を方位の番号の大小で求めるなど回転と鏡映について対称でないため、
+              回転や鏡映を含む正準形で計画した動作は、元の配置で計画した場合と異なることがある.
+              元の配置と同じ計画が必要な場合は、transformsを(IDENTITY,)として色の付け替えのみ行う.
+
+        Args:
+            robot: 走行体
+            game_state: ゲーム状態
+            transforms: 正準形の候補とする変換
+        Returns:
+            正準形の走行体: Robot
+            正準形のゲーム状態: GameState
+            元の配置から正準形への変換: Tuple[int, bool]
+        """
+        # 交点の色が揃っていない場合は、回転・鏡映すると交点の色が変わるため色の付け替えのみ行う
+        if len(game_state.intersection_list) != len(cls.__INTERSECTION_COORDINATES):
+            transforms = (cls.IDENTITY,)
+        candidates = []
+        for transform in transforms:
+            next_robot = cls.transform_robot(robot, transform)
+            next_game_state = cls.transform_game_state(game_state, transform)
+            candidates.append((cls.__get_key(next_robot, next_game_state), transform,
+                               next_robot, next_game_state))
+        _, transform, next_robot, next_game_state = min(candidates, key=lambda item: item[0])
+        return next_robot, next_game_state, transform
+
+    @staticmethod
+    def restore_commands(motion_commands: str, transform: Tuple[int, bool]) -> str:
+        """正準形で計画した動作コマンドを、元の配置の動作コマンドに戻す.
+
+        Args:
+            motion_commands: 正準形で計画した動作コマンド
+            transform: 元の配置から正準形への変換
+        Returns:
+            元の配置の動作コマンド: str
+        """
+        _, is_mirrored = transform
+        if not is_mirrored:
+            return motion_commands
+        swap = {"clockwise": "anticlockwise", "anticlockwise": "clockwise",
+                "left": "right", "right": "left"}
+        lines = motion_commands.split("\n")
+        for i, line in enumerate(lines):
+            fields = line.split(",")
+            # 回頭の向きとエッジ切り替えの左右を入れ替える
+            if fields[0] == "RT" and len(fields) > 3:
+                fields[3] = swap.get(fields[3], fields[3])
+            elif fields[0] == "EC" and len(fields) > 1:
+                fields[1] = swap.get(fields[1], fields[1])
+            lines[i] = ",".join(fields)
+        return "\n".join(lines)
+
+    @staticmethod
+    def __get_key(robot: Robot, game_state: GameState) -> tuple:
+        """正準形を選ぶための比較キーを求める.
+
+        Args:
+            robot: 走行体
+            game_state: ゲーム状態
+        Returns:
+            比較キー: tuple
+        """
+        bonus_value = game_state.bonus_color.value if game_state.bonus_color is not None else -1
+        return (tuple(color.value for color in game_state.intersection_list),
+                (robot.coord.y * 7 + robot.coord.x, robot.direct.value, robot.edge),
+                game_state.block_ids,
+                tuple(color.value for color in game_state.block_color_list),
+                bonus_value)
+
+    @staticmethod
+    def __get_base_index(coord: Coordinate) -> int:
+        """ベースエリアの座標から方位の番号(東南西北の順)を求める.
+
+        Args:
+            coord: ベースエリアの座標
+        Returns:
+            方位の番号: int
+        """
+        if coord.x == 6:
+            return 0
+        elif coord.y == 6:
+            return 1
+        elif coord.x == 0:
+            return 2
+        return 3
+
+    @staticmethod
+    def __get_intersection_index(coord: Coordinate) -> int:
+        """交点の座標から交点の色のリストの番号を求める.
+
+        Args:
+            coord: 交点の座標
+        Returns:
+            交点の色のリストの番号: int
+        """
+        return (coord.x // 2) // 2 + (coord.y // 2) // 2 * 2
@@ -5,12 +5,17 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 
 
 class MiddleToBlock(GameMotion):
     """中点→ブロック置き場のゲーム動作クラス."""
 
+    __slots__ = ("__rotation_angle", "__rotation_pwm", "__rotation_time", "__correction_pwm",
+                 "__direct_rotation", "__need_adjustment", "__can_correction",
+                 "__correction_target_angle", "__motion_time", "__success_rate")
+
     def __init__(self, angle: int, need_adjustment: bool,
                  with_block: bool, can_correction: bool) -> None:
         """MiddleToBlockのコンストラクタ.
@@ -39,11 +44,15 @@ class MiddleToBlock(GameMotion):
         self.__motion_time = 0.697
         self.__success_rate = 0.78
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """中点→ブロック置き場のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -68,11 +77,12 @@ class MiddleToBlock(GameMotion):
         command_list += "DS,22,70\n"  # 試走で足りなかった分を直進
 
         # エッジ切り替えのコマンドは生成しないが，計算上はエッジをnoneにする
-        self.current_edge = "none"
+        current_edge = "none"
 
-        return command_list.replace("\n", ",中点→ブロック置き場\n", 1)  # 最初の行の末尾に",中点→ブロック置き場"を追加する
+        # 最初の行の末尾に",中点→ブロック置き場"を追加する
+        return command_list.replace("\n", ",中点→ブロック置き場\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """中点→ブロック置き場のゲーム動作のコストを計算するメソッド.
 
         Returns:
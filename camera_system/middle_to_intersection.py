@@ -5,6 +5,7 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 from color_changer import Color
 
@@ -12,6 +13,10 @@ from color_changer import Color
 class MiddleToIntersection(GameMotion):
     """中点→交点のゲーム動作クラス."""
 
+    __slots__ = ("__angle", "__rotation_angle", "__rotation_pwm", "__rotation_time",
+                 "__correction_pwm", "__direct_rotation", "__target_color", "__can_correction",
+                 "__correction_target_angle", "__motion_time", "__success_rate")
+
     def __init__(self, angle: int, target_color: Color,
                  with_block: bool, can_correction: bool) -> None:
         """MiddleToIntersectionのコンストラクタ.
@@ -46,11 +51,15 @@ class MiddleToIntersection(GameMotion):
         self.__motion_time = 0.645
         self.__success_rate = 0.96
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """中点→交点のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -68,16 +77,17 @@ class MiddleToIntersection(GameMotion):
             command_list += "SL,%d\n" % (GameMotion.SLEEP_TIME * 1000)
 
         # 回頭後にエッジが切り替わる場合，エッジ切り替えをセットする
-        if (next_edge := self.get_next_edge(self.__angle)) != self.current_edge:
+        if (next_edge := self.get_next_edge(self.__angle, current_edge)) != current_edge:
             command_list += "EC,%s\n" % next_edge
-            self.current_edge = next_edge  # 現在のエッジを更新する
+            current_edge = next_edge  # 現在のエッジを更新する
 
         command_list += "CL,%s,0,60,0.1,0.08,0.08\n" % self.__target_color.name  # 指定色のノードまでライントレース
         command_list += "DS,12,70,20mm直進(縦調整)\n"  # 交差点まで直進
 
-        return command_list.replace("\n", ",中点→交点\n", 1)  # 最初の行の末尾に",中点→交点"を追加する
+        # 最初の行の末尾に",中点→交点"を追加する
+        return command_list.replace("\n", ",中点→交点\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """中点→交点のゲーム動作のコストを計算するメソッド.
 
         Returns:
@@ -0,0 +1,305 @@
+"""動作計画の中間表現モジュール.
+
+動作コマンドを、コマンドごとの命令番号、引数、コメント、生成元のゲーム動作の配列として保持する
+@author: miyashita64
+"""
+
+import struct
+import zlib
+from typing import List, Tuple
+import numpy as np
+from color_changer import Color
+
+
+class MotionPlan:
+    """動作計画の中間表現クラス.
+
+    動作コマンドの1行を、NumPyの構造化配列の1レコード(命令番号, 引数, コメントの番号, ゲーム動作の番号)で表す.
+    引数は命令ごとの型(整数、小数、記号)に従って整数で保持する.
+        - 整数: そのままの値
+        - 小数: 1000倍した値(小数点以下3桁まで)
+        - 記号: 取りうる記号のタプルでの番号
+    コメントは計画ごとのコメントのタプルでの番号(コメントがない場合は-1)で保持する.
+    ゲーム動作の番号は、コマンドを生成したゲーム動作の計画内での番号とする.
+
+    CSV形式(現在の動作コマンドの文字列)と、レコードを詰めてzlibで圧縮したバイナリ形式に変換できる.
+    中間表現に変換した動作コマンドは、CSV形式に戻すと元の文字列と一致する.
+
+    Attributes:
+        OPCODES (Tuple[str]): 命令番号ごとのコマンド名
+        ARGUMENT_TYPES (Tuple[Tuple]): 命令番号ごとの引数の型("int", "float"または記号のタプル)
+        MAX_ARGUMENT_NUM (int): 引数の最大の数
+        DTYPE (np.dtype): レコードの型
+        __OPCODE_INDEXES (Dict[str, int]): コマンド名ごとの命令番号
+        __FLOAT_SCALE (int): 小数の引数を整数で保持する際の倍率
+        __MAGIC (bytes): バイナリ形式の先頭の識別子
+        __VERSION (int): バイナリ形式のバージョン
+        __HEADER (struct.Struct): バイナリ形式のヘッダ(識別子, バージョン, 引数のバイト数, レコード数,
+            ゲーム動作の数, コメントのバイト数)
+    """
+
+    __COLORS = tuple(color.name for color in Color)
+    __EDGES = ("left", "right", "none")
+    __ROTATIONS = ("clockwise", "anticlockwise")
+    OPCODES = ("SL", "DS", "RT", "XR", "EC", "CS", "DL", "CL", "AR", "AF")
+    ARGUMENT_TYPES = (("int",),
+                      ("int", "int"),
+                      ("int", "int", __ROTATIONS),
+                      ("int", "int"),
+                      (__EDGES,),
+                      (__COLORS, "int"),
+                      ("int", "int", "int", "float", "float", "float"),
+                      (__COLORS, "int", "int", "float", "float", "float"),
+                      ("int", "int"),
+                      ("int", "int"))
+    MAX_ARGUMENT_NUM = 6
+    DTYPE = np.dtype([("opcode", np.uint8), ("args", np.int32, (MAX_ARGUMENT_NUM,)),
+                      ("comment", np.int32), ("motion", np.int32)])
+
+    __OPCODE_INDEXES = {name: opcode for opcode, name in enumerate(OPCODES)}
+    __FLOAT_SCALE = 1000
+    __MAGIC = b"MPLN"
+    __VERSION = 1
+    __HEADER = struct.Struct("<4sBBIII")
+
+    def __init__(self, records: np.ndarray, comments: Tuple[str, ...], motion_num: int) -> None:
+        """MotionPlanのコンストラクタ.
+
+        Args:
+            records: レコードの配列(MotionPlan.DTYPE)
+            comments: コメントのタプル
+            motion_num: ゲーム動作の数
+        """
+        self.__records = records
+        self.__records.flags.writeable = False
+        self.__comments = tuple(comments)
+        self.__motion_num = motion_num
+
+    @classmethod
+    def from_csv(cls, motion_commands: str) -> "MotionPlan":
+        """1つのゲーム動作の動作コマンドの文字列を中間表現に変換する.
+
+        全てのコマンドのゲーム動作の番号は0とする.
+
+        Args:
+            motion_commands: 動作コマンド
+        Returns:
+            動作計画の中間表現: MotionPlan
+        Raises:
+            ValueError: 中間表現で表せないコマンドを含む場合
+        """
+        lines = [line for line in motion_commands.split("\n") if line != ""]
+        records = np.zeros(len(lines), cls.DTYPE)
+        comments = {}
+        for record, line in zip(records, lines):
+            fields = line.split(",")
+            opcode = cls.__OPCODE_INDEXES.get(fields[0])
+            if opcode is None:
+                raise ValueError("Unknown command '%s'" % line)
+            argument_types = cls.ARGUMENT_TYPES[opcode]
+            if len(fields) - 1 < len(argument_types):
+                raise ValueError("Too few arguments '%s'" % line)
+            record["opcode"] = opcode
+            for i, (argument_type, text) in enumerate(zip(argument_types, fields[1:])):
+                record["args"][i] = cls.__encode_argument(argument_type, text)
+            comment = ",".join(fields[1 + len(argument_types):]) \
+                if len(fields) > 1 + len(argument_types) else None
+            record["comment"] = comments.setdefault(comment, len(comments)) \
+                if comment is not None else -1
+            # 元の文字列に戻せない引数(小数点以下が4桁以上など)は表せない
+            if cls.__format_record(record, tuple(comments)) != line:
+                raise ValueError("Unrepresentable command '%s'" % line)
+        return cls(records, tuple(comments), 1)
+
+    @classmethod
+    def concatenate(cls, motion_plans: List["MotionPlan"]) -> "MotionPlan":
+        """動作計画を連結する.
+
+        ゲーム動作の番号は、前の動作計画のゲーム動作の数だけずらして計画全体の番号にする.
+
+        Args:
+            motion_plans: 動作計画のリスト
+        Returns:
+            連結した動作計画: MotionPlan
+        """
+        records = np.concatenate([motion_plan.records for motion_plan in motion_plans]) \
+            if motion_plans != [] else np.zeros(0, cls.DTYPE)
+        comments = {}
+        start = motion_offset = 0
+        for motion_plan in motion_plans:
+            end = start + len(motion_plan)
+            # 動作計画ごとのコメントの番号を、連結後のコメントの番号に付け替える
+            comment_indexes = np.array([comments.setdefault(comment, len(comments))
+                                        for comment in motion_plan.comments] + [-1], np.int32)
+            records["comment"][start:end] = comment_indexes[records["comment"][start:end]]
+            records["motion"][start:end] += motion_offset
+            motion_offset += motion_plan.motion_num
+            start = end
+        return cls(records, tuple(comments), motion_offset)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MotionPlan":
+        """バイナリ形式を中間表現に変換する.
+
+        Args:
+            data: バイナリ形式の動作計画
+        Returns:
+            動作計画の中間表現: MotionPlan
+        Raises:
+            ValueError: バイナリ形式でない場合
+        """
+        if len(data) < cls.__HEADER.size:
+            raise ValueError("Too short data")
+        magic, version, width, record_num, motion_num, comment_size = \
+            cls.__HEADER.unpack_from(data)
+        if magic != cls.__MAGIC or version != cls.__VERSION or width not in (2, 4):
+            raise ValueError("Not a motion plan (magic %r, version %d)" % (magic, version))
+        try:
+            payload = zlib.decompress(data[cls.__HEADER.size:])
+        except zlib.error as e:
+            raise ValueError("Broken motion plan (%s)" % e)
+        packed_dtype = cls.__get_packed_dtype(width)
+        if len(payload) != record_num * (packed_dtype.itemsize + 4) + comment_size:
+            raise ValueError("Broken motion plan (unexpected size %d)" % len(payload))
+        packed_records = np.frombuffer(payload, packed_dtype, record_num)
+        motion_steps = np.frombuffer(payload, "<i4", record_num, packed_records.nbytes)
+        records = np.zeros(record_num, cls.DTYPE)
+        for name in packed_dtype.names:
+            records[name] = packed_records[name]
+        records["motion"] = np.cumsum(motion_steps)
+        comment_bytes = payload[packed_records.nbytes + motion_steps.nbytes:]
+        comments = tuple(comment_bytes.decode("utf-8").split("\n")[:-1])
+        return cls(records, comments, motion_num)
+
+    def to_csv(self) -> str:
+        """中間表現を動作コマンドの文字列に変換する.
+
+        Returns:
+            動作コマンド: str
+        """
+        return "".join(self.__format_record(record, self.__comments) + "\n"
+                       for record in self.__records)
+
+    def to_bytes(self) -> bytes:
+        """中間表現をバイナリ形式に変換する.
+
+        引数とコメントの番号が16bitに収まる場合は16bitに詰めたレコードを並べ、ゲーム動作の番号は前のコマンドとの差、
+        コメントは改行で終端した文字列にして、まとめてzlibで圧縮する.
+        同じ動作のコマンドは同じバイト列になるため、圧縮したCSV形式よりも小さくなる.
+
+        Returns:
+            バイナリ形式の動作計画: bytes
+        """
+        values = np.concatenate([self.__records["args"].ravel(), self.__records["comment"]])
+        width = 2 if len(values) == 0 or (values.min() >= np.iinfo(np.int16).min
+                                          and values.max() <= np.iinfo(np.int16).max) else 4
+        packed_dtype = self.__get_packed_dtype(width)
+        packed_records = np.zeros(len(self.__records), packed_dtype)
+        for name in packed_dtype.names:
+            packed_records[name] = self.__records[name]
+        motion_steps = np.diff(self.__records["motion"], prepend=0).astype("<i4")
+        comment_bytes = "".join(comment + "\n" for comment in self.__comments).encode("utf-8")
+        payload = packed_records.tobytes() + motion_steps.tobytes() + comment_bytes
+        return self.__HEADER.pack(self.__MAGIC, self.__VERSION, width, len(self.__records),
+                                  self.__motion_num, len(comment_bytes)) + zlib.compress(payload, 9)
+
+    @classmethod
+    def __get_packed_dtype(cls, width: int) -> np.dtype:
+        """バイナリ形式のレコード(ゲーム動作の番号を除く)の型を取得する.
+
+        Args:
+            width: 引数とコメントの番号のバイト数(2 or 4)
+        Returns:
+            バイナリ形式のレコードの型: np.dtype
+        """
+        return np.dtype([("opcode", np.uint8), ("args", "<i%d" % width, (cls.MAX_ARGUMENT_NUM,)),
+                         ("comment", "<i%d" % width)])
+
+    @classmethod
+    def __encode_argument(cls, argument_type, text: str) -> int:
+        """引数の文字列を整数に変換する.
+
+        Args:
+            argument_type: 引数の型("int", "float"または記号のタプル)
+            text: 引数の文字列
+        Returns:
+            引数を表す整数: int
+        Raises:
+            ValueError: 引数の型で表せない場合
+        """
+        if argument_type == "int":
+            return int(text)
+        if argument_type == "float":
+            return int(round(float(text) * cls.__FLOAT_SCALE))
+        if text not in argument_type:
+            raise ValueError("Unknown symbol '%s'" % text)
+        return argument_type.index(text)
+
+    @classmethod
+    def __format_record(cls, record: np.void, comments: Tuple[str, ...]) -> str:
+        """レコードを1行のコマンドの文字列に変換する.
+
+        Args:
+            record: レコード
+            comments: コメントのタプル
+        Returns:
+            1行のコマンド: str
+        """
+        opcode = int(record["opcode"])
+        fields = [cls.OPCODES[opcode]]
+        for argument_type, value in zip(cls.ARGUMENT_TYPES[opcode], record["args"].tolist()):
+            if argument_type == "int":
+                fields.append(str(value))
+            elif argument_type == "float":
+                fields.append(repr(value / cls.__FLOAT_SCALE))
+            else:
+                fields.append(argument_type[value])
+        if record["comment"] >= 0:
+            fields.append(comments[record["comment"]])
+        return ",".join(fields)
+
+    def __len__(self) -> int:
+        """コマンドの数を取得する.
+
+        Returns:
+            int: コマンドの数
+        """
+        return len(self.__records)
+
+    def __eq__(self, other) -> bool:
+        """オブジェクトの等価比較をする(動作コマンドの文字列とゲーム動作が同じ場合に等しい).
+
+        Returns:
+            bool: 等価比較の結果
+        """
+        if not isinstance(other, MotionPlan):
+            return NotImplemented
+        return self.to_csv() == other.to_csv() and self.__motion_num == other.motion_num \
+            and np.array_equal(self.__records["motion"], other.records["motion"])
+
+    @property
+    def records(self) -> np.ndarray:
+        """Getter.
+
+        Returns:
+            レコードの配列(書き込み不可): np.ndarray
+        """
+        return self.__records
+
+    @property
+    def comments(self) -> Tuple[str, ...]:
+        """Getter.
+
+        Returns:
+            コメントのタプル: Tuple[str, ...]
+        """
+        return self.__comments
+
+    @property
+    def motion_num(self) -> int:
+        """Getter.
+
+        Returns:
+            ゲーム動作の数: int
+        """
+        return self.__motion_num
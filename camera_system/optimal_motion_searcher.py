@@ -4,16 +4,22 @@
 @author: KakinokiKanta miyashita64
 """
 
-import numpy as np
 import copy
+import heapq
+import itertools
+import threading
 
-from typing import List, Dict
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 from game_area_info import GameAreaInfo
+from game_state import GameState
 from node import Node, NodeType
 from robot import Robot, Direction
 from coordinate import Coordinate
+from game_motion import GameMotion
 from composite_game_motion import CompositeGameMotion
 from game_motion_converter import GameMotionConverter
+from transition_table import TransitionTable
 
 
 class OptimalMotionSearcher:
@@ -23,131 +29,349 @@ class OptimalMotionSearcher:
     __VERTICAL_COST = 0.5480
     # 斜め移動にかかる最低限のコストの目安
     __DIAGONAL_COST = 0.7840
+    # ビットボードにおける1行(y=0)と1列(x=0)のビットマスク
+    __ROW_MASK = 0b1111111
+    __COLUMN_MASK = sum(1 << (y * 7) for y in range(7))
+    # 探索結果のLRUキャッシュ(キー: 開始時の状態ID, 目標ノード, ブロックの配置, 交点の色)
+    __cache = OrderedDict()
+    __cache_size = 1024
+    __cache_hits = 0
+    __cache_misses = 0
+    # 複数のスレッドから探索した場合にキャッシュの整合性を保つためのロック
+    __cache_lock = threading.Lock()
+    # 目標ノードの組をキーにした、状態IDごとの予測コストのLRUキャッシュ
+    __predicted_costs = OrderedDict()
+    __PREDICTED_COSTS_SIZE = 256
 
     @classmethod
-    def search(cls, start_robot: Robot, goal_node: Node) -> CompositeGameMotion:
+    def search(cls, start_robot: Robot, goal_node: Node, game_state: GameState = None,
+               verbose: bool = True) -> CompositeGameMotion:
         """開始時の走行体から目標ノードに遷移するための最適動作を探索する.
 
         Args:
             start_robot: 開始時の走行体
             goal_node:   目標ノード
+            game_state:  ゲーム状態(省略時はゲームエリア情報から生成する)
+            verbose:     動作が探索できない場合にメッセージを表示する場合 True
+                         (遷移できない組み合わせも試す計画では False とする)
         Returns:
             目標ノードに遷移するためのゲーム動作群: CompositeGameMotion
         """
-        # 探索する走行体のハッシュ値を保持
-        open_hashs = [cls.__robot_hash(start_robot)]
-        # 走行体のハッシュ値をキーに探索情報を保持
-        transition_table = {
-            open_hashs[0]: {"robot": copy.deepcopy(start_robot),                       # 走行体
-                            "game_motions": CompositeGameMotion(),                     # 開始時からの動作群
-                            "cost": cls.__predict_cost(start_robot, goal_node.coord),  # 推定コスト
-                            "logs": [copy.deepcopy(start_robot)]}                      # 走行体の推移
-        }
-
+        if game_state is None:
+            game_state = GameState.from_game_area_info()
         # 探索対象がブロック設置動作か、ブロック取得動作か(True:設置, False:取得)
         is_set_motion = goal_node.node_type != NodeType.BLOCK
         # 設置動作探索時、ゴールノードにブロックがある場合
-        if is_set_motion and goal_node.block_id != -1:
-            print("A block %d already exists at the goal node(%d,%d)." %
-                  (goal_node.block_id, goal_node.coord.x, goal_node.coord.y))
+        goal_block_id = game_state.get_block_id(goal_node.coord)
+        if is_set_motion and goal_block_id != -1:
+            if verbose:
+                print("A block %d already exists at the goal node(%d,%d)." %
+                      (goal_block_id, goal_node.coord.x, goal_node.coord.y))
             # 空のCompositeGameMotionを返す
             return CompositeGameMotion()
 
+        _, game_motions, _ = cls.__search_with_cache(
+            start_robot, [goal_node], is_set_motion, game_state, verbose)
+        return game_motions
+
+    @classmethod
+    def search_multi(cls, start_robot: Robot, goal_nodes: List[Node],
+                     game_state: GameState = None) -> Tuple[int, CompositeGameMotion, List[float]]:
+        """開始時の走行体から複数の目標ノードのうち最小コストで遷移できるノードへの最適動作を探索する.
+
+        1回の探索で全ての目標ノードを扱い、設置動作の場合は復帰動作込みのコストが最小となる動作を返す.
+
+        Args:
+            start_robot: 開始時の走行体
+            goal_nodes:  目標ノードのリスト(全て同じ外辺の設置先、または全てブロック置き場)
+            game_state:  ゲーム状態(省略時はゲームエリア情報から生成する)
+        Returns:
+            採用した目標ノードのインデックス(探索失敗時は-1): int
+            目標ノードに遷移するためのゲーム動作群: CompositeGameMotion
+            各目標ノードへの(設置動作の場合は復帰動作込みの)コスト: List[float]
+        Note:
+            採用しなかった目標ノードのコストは探索終了時点での上限値とする(未到達の場合は無限大).
+        """
+        if goal_nodes == []:
+            return -1, CompositeGameMotion(), []
+        if game_state is None:
+            game_state = GameState.from_game_area_info()
+        # 探索対象がブロック設置動作か、ブロック取得動作か(True:設置, False:取得)
+        is_set_motion = goal_nodes[0].node_type != NodeType.BLOCK
+        return cls.__search_with_cache(start_robot, goal_nodes, is_set_motion, game_state)
+
+    @classmethod
+    def __search_with_cache(cls, start_robot: Robot, goal_nodes: List[Node], is_set_motion: bool,
+                            game_state: GameState,
+                            verbose: bool = True) -> Tuple[int, CompositeGameMotion, List[float]]:
+        """キャッシュを利用して最適動作を探索し、走行体を動作完了時の状態に更新する.
+
+        Args:
+            start_robot: 開始時の走行体
+            goal_nodes:  目標ノードのリスト
+            is_set_motion: 設置動作か取得動作か(True:設置, False:取得)
+            game_state:  ゲーム状態
+            verbose:     動作が探索できない場合にメッセージを表示する場合 True
+        Returns:
+            採用した目標ノードのインデックス, ゲーム動作群, 各目標ノードへのコスト
+        """
+        # 開始時の状態、目標ノード、ブロックの配置、交点の色が同じ探索結果があれば再利用する
+        cache_key = (TransitionTable.encode(start_robot, is_set_motion),
+                     tuple(node.coord.y * 7 + node.coord.x for node in goal_nodes),
+                     game_state.occupancy, game_state.intersection_list)
+        with cls.__cache_lock:
+            search_result = cls.__cache.get(cache_key)
+            if search_result is not None:
+                cls.__cache.move_to_end(cache_key)
+                cls.__cache_hits += 1
+            else:
+                cls.__cache_misses += 1
+        if search_result is None:
+            search_result = cls.__search(start_robot, goal_nodes, is_set_motion, game_state)
+            with cls.__cache_lock:
+                if cls.__cache_size > 0:
+                    cls.__cache[cache_key] = search_result
+                    # 上限を超えた場合、最も長く使われていない探索結果を破棄する
+                    if len(cls.__cache) > cls.__cache_size:
+                        cls.__cache.popitem(last=False)
+        goal_index, game_motion_tuple, last_robot_state, goal_costs = search_result
+
+        # 遷移できる走行体がない場合
+        if last_robot_state is None:
+            if verbose:
+                print("Impossible move (%d,%d,%s) to %s." %
+                      (start_robot.coord.x, start_robot.coord.y, start_robot.direct.name,
+                       ", ".join("(%d,%d)" % (node.coord.x, node.coord.y) for node in goal_nodes)))
+            # 空のCompositeGameMotionを返す
+            return -1, CompositeGameMotion(), list(goal_costs)
+
+        game_motions = CompositeGameMotion()
+        for game_motion in game_motion_tuple:
+            game_motions.append_game_motion(game_motion)
+        # 動作を実行したとして、走行体を更新する
+        x, y, direct, edge = last_robot_state
+        start_robot.coord = Coordinate(x, y)
+        start_robot.direct = direct
+        start_robot.edge = edge
+        # 探索した最適動作を返す
+        return goal_index, game_motions, list(goal_costs)
+
+    @classmethod
+    def set_cache_size(cls, cache_size: int) -> None:
+        """探索結果のキャッシュの上限数を設定する(0の場合はキャッシュしない).
+
+        Args:
+            cache_size: キャッシュする探索結果の上限数
+        """
+        with cls.__cache_lock:
+            cls.__cache_size = cache_size
+            while len(cls.__cache) > cls.__cache_size:
+                cls.__cache.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """探索結果と予測コストのキャッシュ、ヒット数、ミス数を破棄する."""
+        with cls.__cache_lock:
+            cls.__cache.clear()
+            cls.__predicted_costs.clear()
+            cls.__cache_hits = 0
+            cls.__cache_misses = 0
+
+    @classmethod
+    def get_cache_info(cls) -> Dict[str, int]:
+        """探索結果のキャッシュの状況を取得する.
+
+        Returns:
+            キャッシュのヒット数、ミス数、現在の数、上限数、予測コストのキャッシュの数: Dict[str, int]
+        """
+        return {"hits": cls.__cache_hits, "misses": cls.__cache_misses,
+                "size": len(cls.__cache), "max_size": cls.__cache_size,
+                "predicted_costs": len(cls.__predicted_costs)}
+
+    @classmethod
+    def __search(cls, start_robot: Robot, goal_nodes: List[Node], is_set_motion: bool,
+                 game_state: GameState) -> tuple:
+        """開始時の走行体から目標ノードのいずれかに遷移するための最適動作を探索する.
+
+        設置動作の場合、目標ノードに到達した状態から復帰動作までを1つの遷移とみなし、
+        復帰動作込みのコストが最小となる目標ノードが確定した時点で探索を終了する.
+
+        Args:
+            start_robot: 開始時の走行体
+            goal_nodes:  目標ノードのリスト
+            is_set_motion: 設置動作か取得動作か(True:設置, False:取得)
+            game_state:  ゲーム状態
+        Returns:
+            採用した目標ノードのインデックス(探索失敗時は-1), ゲーム動作のタプル,
+            動作完了時の走行体の(x座標, y座標, 方位, エッジ)(探索失敗時はNone), 各目標ノードへのコストのタプル
+        """
+        # 探索中はブロックが移動しないため、ブロックの配置を一度だけ求める
+        occupancy = game_state.occupancy
+        table = TransitionTable.get(occupancy)
+        goal_coords = [node.coord for node in goal_nodes]
+        # 目標ノードの番号から目標ノードのインデックスを引く辞書
+        goal_indexes = {coord.y * 7 + coord.x: i for i, coord in enumerate(goal_coords)}
+        # ゴールに依存する走行禁止座標のビットマスクを求める
+        forbidden_mask = cls.__goal_forbidden_mask(goal_coords, is_set_motion, occupancy)
+        # 仮にブロックを設置したとしたブロックの配置(復帰動作の探索に用いる)
+        start_bit = 1 << (start_robot.coord.y * 7 + start_robot.coord.x)
+        set_occupancy = occupancy
+        if occupancy & start_bit:
+            set_occupancy = occupancy & ~start_bit
+
+        start_state = TransitionTable.encode(start_robot, is_set_motion)
+        # 状態IDを添字として、開始時からの実コスト、1ゲーム動作前の状態ID、展開済みかどうかを保持する
+        costs = [float("inf")] * TransitionTable.STATE_NUM
+        parents = [-1] * TransitionTable.STATE_NUM
+        closed = bytearray(TransitionTable.STATE_NUM)
+        costs[start_state] = 0
+        # 各目標ノードへの(設置動作の場合は復帰動作込みの)最小コスト
+        goal_costs = [float("inf")] * len(goal_nodes)
+        # 目標ノードに到達した状態IDをキーに、復帰動作と復帰動作後の走行体を保持する
+        return_motions = {}
+        # 探索する状態を(推定コスト, 登録順, 状態ID, 復帰動作込みの終端かどうか)の二分ヒープで保持
+        # NOTE: 登録順は推定コストが等しい場合に先に登録した状態を優先するために用いる
+        counter = itertools.count()
+        predicted_costs = cls.__get_predicted_costs(goal_coords)
+        open_heap = [(predicted_costs[start_state], next(counter),
+                      start_state, False)]
+        # 目標ノードに到達した状態ID
+        goal_state = None
+
         # 最適動作を探索する
-        while transition_table[open_hashs[0]]["robot"].coord != goal_node.coord:
-            # 推定コストが最小な走行体のハッシュ値(推定コスト = 初期状態からの実コスト + ゴールまでの予測コスト)
-            min_cost_hash = open_hashs.pop(0)
-            # 推定コストが最小な走行体についての探索情報
-            min_cost_transition = transition_table[min_cost_hash]
-
-            # 現状の走行体
-            current_robot = min_cost_transition["robot"]
-            # 遷移可能な走行体を取得する
-            next_robots = cls.__next_robots(
-                current_robot, goal_node.coord, is_set_motion)
-
-            # 遷移可能な走行体について探索する
-            for next_robot in next_robots:
-                game_motion_converter = GameMotionConverter()
-                # 開始時の走行体 -> 1ゲーム動作前の走行体 の動作群
-                game_motions = copy.deepcopy(min_cost_transition["game_motions"])
-                # 1ゲーム動作前の走行体 -> 探索対象の走行体 の動作
-                game_motion = game_motion_converter.convert_game_motion(
-                    current_robot, next_robot, is_set_motion)
-                # 開始時の走行体 -> 探索対象の走行体 の動作群
-                game_motions.append_game_motion(game_motion)
-                # 推定コスト = 開始状態からの実コスト + ゴールまでの予測コスト
-                cost = game_motions.get_cost() + cls.__predict_cost(next_robot, goal_node.coord)
-
-                # 運搬対象の走行体に関する探索情報を生成する
-                transition = {"robot": next_robot,
-                              "game_motions": game_motions,
-                              "cost": cost,
-                              "logs": min_cost_transition["logs"] + [next_robot]}
-
-                # 走行体のハッシュ値を求める
-                next_hash = cls.__robot_hash(next_robot)
-
-                # 探索情報がテーブルにない場合は探索情報を登録する
-                if next_hash not in transition_table.keys():
-                    transition_table[next_hash] = transition
-                # 探索情報がテーブルにあり、より低コストで遷移できる場合は探索情報を更新する
-                elif transition["cost"] < transition_table[next_hash]["cost"]:
-                    transition_table[next_hash] = transition
-                # それ以外の場合、探索情報を破棄する
-                else:
+        while open_heap:
+            # 推定コストが最小な状態ID(推定コスト = 初期状態からの実コスト + ゴールまでの予測コスト)
+            _, _, current_state, is_terminal = heapq.heappop(open_heap)
+            # 復帰動作込みのコストが最小な目標ノードが確定した場合、探索を終了する
+            if is_terminal:
+                goal_state = current_state
+                break
+            # 展開済みの状態は読み飛ばす(より低コストな遷移で更新済みの古い要素の遅延削除)
+            if closed[current_state]:
+                continue
+            closed[current_state] = 1
+
+            # 目標ノードに到達した場合
+            current_node_id = TransitionTable.node_id(current_state)
+            if current_node_id in goal_indexes:
+                goal_index = goal_indexes[current_node_id]
+                # 取得動作の場合、探索を終了する
+                if not is_set_motion:
+                    goal_costs[goal_index] = costs[current_state]
+                    goal_state = current_state
+                    break
+                # 設置動作の場合、復帰動作込みのコストを終端としてヒープに追加する
+                return_motion, returned_robot = cls.__search_return_motion(
+                    TransitionTable.to_robot(current_state), set_occupancy, game_state)
+                return_motions[current_state] = (return_motion, returned_robot)
+                total_cost = costs[current_state]
+                if return_motion is not None:
+                    total_cost += return_motion.get_cost()
+                goal_costs[goal_index] = min(goal_costs[goal_index], total_cost)
+                heapq.heappush(open_heap, (total_cost, next(counter), current_state, True))
+                # 目標ノードからは遷移しない
+                continue
+
+            # 遷移表から1つのゲーム動作で遷移可能な状態とそのコストを取得する
+            next_states, move_costs = table.transitions(current_state, game_state)
+            for next_state, move_cost in zip(next_states.tolist(), move_costs.tolist()):
+                # 遷移できない状態、ゴールに依存する走行禁止座標への遷移を除外する
+                if next_state < 0 or forbidden_mask >> TransitionTable.node_id(next_state) & 1:
+                    continue
+                # 開始状態からの実コスト
+                cost = costs[current_state] + move_cost
+                # より低コストで遷移できない場合は破棄する
+                if costs[next_state] <= cost:
                     continue
+                # 探索情報を更新する(展開済みの状態であっても、より低コストであれば再度展開する)
+                costs[next_state] = cost
+                parents[next_state] = current_state
+                closed[next_state] = 0
+                # 推定コスト = 開始状態からの実コスト + ゴールまでの予測コスト
+                estimated_cost = cost + predicted_costs[next_state]
                 # 遷移できる状態として追加する
-                open_hashs.append(next_hash)
-
-            # 遷移できる走行体がない場合
-            if open_hashs == []:
-                print("Impossible move (%d,%d,%s) to (%d,%d)." %
-                      (start_robot.coord.x, start_robot.coord.y, start_robot.direct.name,
-                       goal_node.coord.x, goal_node.coord.y))
-                # 空のCompositeGameMotionを返す
-                return CompositeGameMotion()
-
-            # 最小コストのハッシュ値をリストの先頭に持ってくる
-            list(set(open_hashs))
-            min_hash = open_hashs[0]
-            for op in open_hashs:
-                if transition_table[op]["cost"] < transition_table[min_hash]["cost"]:
-                    min_hash = op
-            open_hashs.remove(min_hash)
-            open_hashs.insert(0, min_hash)
-
-        min_cost_transition = transition_table[open_hashs[0]]
-
-        # 設置動作の場合、復帰動作を探索する
+                heapq.heappush(open_heap, (estimated_cost, next(counter), next_state, False))
+
+        # 遷移できる走行体がない場合
+        if goal_state is None:
+            return -1, (), None, tuple(goal_costs)
+
+        # 1ゲーム動作前の状態IDを辿って、開始時からの状態の推移を復元する
+        path_states = []
+        trace_state = goal_state
+        while trace_state != -1:
+            path_states.insert(0, trace_state)
+            trace_state = parents[trace_state]
+        # 最適な経路についてのみ、走行体の推移とゲーム動作群を生成する
+        game_motion_converter = GameMotionConverter()
+        game_motion_list = []
+        last_robot = copy.deepcopy(start_robot)
+        for next_state in path_states[1:]:
+            next_robot = TransitionTable.to_robot(next_state)
+            game_motion_list.append(game_motion_converter.convert_game_motion(
+                last_robot, next_robot, is_set_motion, occupancy, game_state))
+            last_robot = next_robot
+
+        # 設置動作の場合、復帰動作を追加する
         if is_set_motion:
-            on_block_node = GameAreaInfo.node_list[start_robot.coord.y * 7 + start_robot.coord.x]
-            # 仮にブロックを設置したとしてゲームエリア情報を更新する
-            GameAreaInfo.move_block(on_block_node.block_id, goal_node)
-            # 復帰動作を探索する
-            cls.__add_return_motion(min_cost_transition)
-            # 仮にブロックを設置したとしたゲームエリア情報を元に戻す
-            GameAreaInfo.move_block(goal_node.block_id, on_block_node)
+            return_motion, returned_robot = return_motions[goal_state]
+            if return_motion is not None:
+                game_motion_list.append(return_motion)
+                last_robot = returned_robot
 
-        # 動作を実行したとして、走行体を更新する
-        start_robot.coord = min_cost_transition["logs"][-1].coord
-        start_robot.direct = min_cost_transition["logs"][-1].direct
-        start_robot.edge = min_cost_transition["logs"][-1].edge
         # 探索した最適動作と動作完了時の走行体を返す
-        return min_cost_transition["game_motions"]
+        goal_index = goal_indexes[TransitionTable.node_id(goal_state)]
+        return (goal_index, tuple(game_motion_list),
+                (last_robot.coord.x, last_robot.coord.y, last_robot.direct, last_robot.edge),
+                tuple(goal_costs))
+
+    @classmethod
+    def __get_predicted_costs(cls, goal_coords: List[Coordinate]) -> List[float]:
+        """全ての状態について、最も近い目標ノードまでの予測コストを求める.
+
+        予測コストは目標ノードの組ごとに求め、最近用いた一定数の組のみキャッシュする.
+
+        Args:
+            goal_coords: 目標座標のリスト
+        Returns:
+            状態IDを添字とした予測コストのリスト: List[float]
+        """
+        goal_key = tuple(coord.y * 7 + coord.x for coord in goal_coords)
+        with cls.__cache_lock:
+            predicted_costs = cls.__predicted_costs.get(goal_key)
+            if predicted_costs is not None:
+                cls.__predicted_costs.move_to_end(goal_key)
+        if predicted_costs is None:
+            if len(goal_coords) == 1:
+                # 予測コストはエッジとブロック保持の有無に依存しないため、座標と方位ごとに求めて展開する
+                node_costs = [cls.__predict_cost(state, goal_coords[0])
+                              for state in range(0, 49 * 8 * 3, 3)]
+                predicted_costs = [node_costs[state // 3 % (49 * 8)]
+                                   for state in range(TransitionTable.STATE_NUM)]
+            else:
+                predicted_costs = list(map(min, *(cls.__get_predicted_costs([goal_coord])
+                                                  for goal_coord in goal_coords)))
+            with cls.__cache_lock:
+                cls.__predicted_costs[goal_key] = predicted_costs
+                # 上限を超えた場合、最も長く使われていない予測コストを破棄する
+                if len(cls.__predicted_costs) > cls.__PREDICTED_COSTS_SIZE:
+                    cls.__predicted_costs.popitem(last=False)
+        return predicted_costs
 
     @classmethod
-    def __predict_cost(cls, start_robot: Robot, goal_coord: Coordinate) -> int:
+    def __predict_cost(cls, state: int, goal_coord: Coordinate) -> int:
         """予測コストを算出する.
 
         Args:
-            start_robot: 走行体
+            state: 走行体の状態ID
             goal_coord:  ゴール座標
         Returns:
             予測コスト: int
         """
-        dy = abs(start_robot.coord.y - goal_coord.y)
-        dx = abs(start_robot.coord.x - goal_coord.x)
+        x, y, direct_value, _, _ = TransitionTable.decode(state)
+        start_direction = Direction(direct_value)
+        dy = abs(y - goal_coord.y)
+        dx = abs(x - goal_coord.x)
         # できるだけ斜めに移動すると想定する
         diagonal_distance = dy if dy < dx else dx
         # 斜めに行けない分だけ縦横に移動すると想定する
@@ -155,30 +379,30 @@ class OptimalMotionSearcher:
         # 設定した回頭角度ごとのコスト
         rotate_costs = {0: 0, 45: 0.342, 90: 0.575, 135: 0.778, 180: 1.049}
         # ゴールノード到達時の走行体の方位を推定する
-        goal_direction = start_robot.direct
+        goal_direction = start_direction
         if dy > dx:
-            if start_robot.coord.y > goal_coord.y:
+            if y > goal_coord.y:
                 goal_direction = Direction.N
             else:
                 goal_direction = Direction.S
         elif dy < dx:
-            if start_robot.coord.x > goal_coord.x:
+            if x > goal_coord.x:
                 goal_direction = Direction.W
             else:
                 goal_direction = Direction.E
         else:
-            if start_robot.coord.y > goal_coord.y:
-                if start_robot.coord.x > goal_coord.x:
+            if y > goal_coord.y:
+                if x > goal_coord.x:
                     goal_direction = Direction.NW
                 else:
                     goal_direction = Direction.NE
-            elif start_robot.coord.y < goal_coord.y:
-                if start_robot.coord.x > goal_coord.x:
+            elif y < goal_coord.y:
+                if x > goal_coord.x:
                     goal_direction = Direction.SW
                 else:
                     goal_direction = Direction.SE
         # 方位の差を算出する
-        dd = abs(start_robot.direct.value - goal_direction.value)
+        dd = abs(start_direction.value - goal_direction.value)
         # 逆回転を考慮する
         if dd > 4:
             dd = 8 - dd
@@ -192,71 +416,46 @@ class OptimalMotionSearcher:
         return move_cost + rotate_cost
 
     @classmethod
-    def __next_robots(cls, current_robot: Robot, goal_coord: Coordinate, is_set_motion: bool) -> List[Robot]:  # noqa
-        """1つのゲーム動作で遷移可能な走行体を返す.
+    def __goal_forbidden_mask(cls, goal_coords: List[Coordinate], is_set_motion: bool,
+                              occupancy: int) -> int:
+        """ゴールに依存する走行禁止座標のビットマスクを求める.
 
         Args:
-            current_robot: 現在の走行体
-            goal_coord: 目標座標
+            goal_coords: 目標座標のリスト
             is_set_motion: 設置動作か取得動作か(True:設置, False:取得)
+            occupancy: ブロックがあるノードのビットボード
         Returns:
-            遷移可能な走行体: List[Robot]
+            走行禁止座標のビットマスク: int
         """
-        # 8方位の角度を求める
-        angs = np.array([direction.value * 45 + 90 for direction in Direction])
-        # 各方位に進んだ際の移動ベクトルを求める
-        dxs = np.round(-np.cos(np.radians(angs)))
-        dys = np.round(-np.sin(np.radians(angs)))
-        # 各方位に進んだ際に到達可能なxとyのリストを取得する
-        xys = np.array([current_robot.coord.x, current_robot.coord.y]) \
-            + np.stack([dxs, dys], 1).astype(int)
-        # 1つのゲーム動作で遷移可能な走行体を生成する
-        robots = [Robot(Coordinate(*xys[direction.value]), direction, "none")
-                  for direction in Direction]
-
-        # 回頭禁止方向を取得する
-        no_rotate_directions = GameAreaInfo.get_no_rotate_direction(current_robot)
-        # 走行禁止座標を取得する
-        no_entry_coordinates = GameAreaInfo.get_no_entry_coordinate(current_robot)
-        # ブロックがあるノードを取得する
-        on_block_coordinates = GameAreaInfo.get_on_block_coordinate()
-        # 設置動作の探索の場合
-        goal_line_coordinates = []
-        if is_set_motion:
+        goal_mask = sum({1 << (coord.y * 7 + coord.x) for coord in goal_coords})
+        # 取得動作の探索の場合、ゴール座標以外でブロックがある座標を走行禁止座標とする
+        if not is_set_motion:
+            return occupancy & ~goal_mask
+        # 設置動作の探索の場合、ブロックがある座標と、設置先ノードがある外辺のゴール座標以外を走行禁止座標とする
+        goal_line_mask = 0
+        for goal_coord in goal_coords:
             # 設置先ノードがブロックエリア外周の上下(y座標が0か6)/左右どちらにあるか(True:上下, False:左右)
             is_border_y = goal_coord.y % 6 == 0
-            # 設置先ノードがある外辺の座標を走行禁止座標とする
             if is_border_y:
-                goal_line_coordinates += [Coordinate(x, goal_coord.y) for x in range(7)
-                                          if x != goal_coord.x]
+                goal_line_mask |= cls.__ROW_MASK << (goal_coord.y * 7)
             else:
-                goal_line_coordinates += [Coordinate(goal_coord.x, y) for y in range(7)
-                                          if y != goal_coord.y]
-
-        # 行動制限を考慮する
-        robots = [robot for robot in robots if 0 <= robot.coord.y <= 6 and 0 <= robot.coord.x <= 6
-                  # 回頭禁止方向を持つ走行体を除外する
-                  and robot.direct not in no_rotate_directions
-                  # 走行禁止座標を持つ走行体を除外する
-                  and robot.coord not in no_entry_coordinates
-                  # 設置時、ゴール座標以外でゴール座標がある外周上の座標を持つ走行体を除外する
-                  and ((is_set_motion and robot.coord == goal_coord)
-                       or (robot.coord not in goal_line_coordinates))
-                  # 取得時、ゴール座標以外でブロックがある座標を持つ走行体を除外する
-                  and (((not is_set_motion) and robot.coord == goal_coord)
-                       or (robot.coord not in on_block_coordinates))]
-
-        return robots
+                goal_line_mask |= cls.__COLUMN_MASK << goal_coord.x
+        return (goal_line_mask & ~goal_mask) | occupancy
 
     @classmethod
-    def __add_return_motion(cls, transition) -> None:
-        """復帰動作を探索する.
+    def __search_return_motion(cls, setted_robot: Robot, occupancy: int,
+                               game_state: GameState) -> Tuple[GameMotion, Robot]:
+        """ブロック設置後の走行体から復帰動作を探索する.
 
         Args:
-            transition: 探索情報(走行体,ゲーム動作群,推定コスト,走行体の推移リスト)
+            setted_robot: ブロック設置後の走行体
+            occupancy: 運搬中のブロックを除いたブロックがあるノードのビットボード
+            game_state: ゲーム状態
+        Returns:
+            復帰動作(設置先が外周でない場合はNone), 復帰動作後の走行体: Tuple[GameMotion, Robot]
         """
-        # ブロック設置後の走行体
-        setted_robot = copy.deepcopy(transition["logs"][-1])
+        # 仮にブロックを設置したとしたブロックの配置
+        occupancy |= 1 << (setted_robot.coord.y * 7 + setted_robot.coord.x)
         # 復帰動作後の走行体
         returned_robot = copy.deepcopy(setted_robot)
 
@@ -286,7 +485,7 @@ class OptimalMotionSearcher:
         # ゴール座標の値が外周でない場合
         else:
             print("Goal Node does not have coordinate for set block.")
-            return
+            return None, setted_robot
 
         # 回頭可能な方位が見つかるまで後退する
         while rotatable_directions == []:
@@ -294,23 +493,11 @@ class OptimalMotionSearcher:
             returned_robot.coord.x += dx
             returned_robot.coord.y += dy
             # 回頭可能な方位を求める
-            no_rotate_directions = GameAreaInfo.get_no_rotate_direction(returned_robot)
+            no_rotate_mask = GameAreaInfo.get_no_rotate_mask(returned_robot, occupancy)
             rotatable_directions = [direction for direction in target_direction
-                                    if direction not in no_rotate_directions]
+                                    if not no_rotate_mask >> direction.value & 1]
         # 復帰動作を取得する
         game_motion_converter = GameMotionConverter()
-        return_motion = game_motion_converter.convert_return_motion(setted_robot, returned_robot)
-        # 探索情報に復帰動作を追加する
-        transition["logs"] += [returned_robot]
-        transition["game_motions"].append_game_motion(return_motion)
-
-    @classmethod
-    def __robot_hash(cls, robot: Robot) -> int:
-        """走行体の状態ごとのハッシュ値を計算する.
-
-        Args:
-            robot: 走行体
-        Returns:
-            ハッシュ値: int
-        """
-        return int(100 * robot.coord.x + 10 * robot.coord.y + robot.direct.value)
+        return_motion = game_motion_converter.convert_return_motion(
+            setted_robot, returned_robot, occupancy, game_state)
+        return return_motion, returned_robot
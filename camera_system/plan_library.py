@@ -0,0 +1,460 @@
+"""計画ライブラリモジュール.
+
+全てのゲームエリアの配置について事前に計画した動作コマンドを保持し、配置から引けるようにする
+@author: miyashita64
+"""
+
+import argparse
+import io
+import itertools
+import multiprocessing
+import os
+import zlib
+from contextlib import redirect_stdout
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from color_changer import Color
+from coordinate import Coordinate
+from game_state import GameState
+from game_planner import GamePlanner
+from layout_symmetry import LayoutSymmetry
+from transition_table import TransitionTable
+
+
+class PlanLibrary:
+    """配置ごとに事前に計画した動作コマンドを保持するクラス.
+
+    配置(コース, カラーブロックの色の並び, ベースブロックの色の並び, ボーナスブロックの色)を
+    指紋 = ((コース*2520 + カラーブロックの色の順位)*24 + ベースブロックの色の順位)*4 + ボーナスブロックの色
+    の整数で表す. コースは0:L, 1:R, 色の順位は取りうる並びを辞書順に並べた時の番号とする.
+
+    ブロックの色の付け替えで移り合う配置は、元の配置で計画した場合と同じ動作コマンドになる.
+    そのため、ライブラリにはLayoutSymmetryで色を付け替えた正準形(ベースブロックの色が(赤, 黄, 緑, 青)の配置)
+    のみを保持する. 正準形の配置は
+    正準形の番号 = (コース*2520 + カラーブロックの色の順位)*4 + ボーナスブロックの色
+    で表し、ライブラリの大きさは全ての配置を保持する場合の1/24になる.
+    NOTE: 動作の探索は鏡映について対称でないため、LコースとRコースを移す鏡映は用いない.
+
+    ファイルは、正準形の番号ごとのデータの開始位置の配列(NumPy配列)、zlibの事前辞書(NumPy配列)、
+    計画に用いた戦略(NumPy配列)、zlibで圧縮した動作コマンドを正準形の番号順に連結したバイト列からなる.
+    開始位置の配列から正準形の番号に対応する範囲を引くため、O(1)で検索できる. 計画していない配置のデータは空とする.
+    計画の戦略によって動作コマンドが異なるため、ライブラリを計画した戦略と異なる戦略では検索しない.
+
+    Attributes:
+        DEFAULT_PATH (str): カメラシステムが読み込む計画ライブラリのパス
+        LAYOUT_NUM (int): 配置の数
+        CANONICAL_LAYOUT_NUM (int): 正準形の配置の数
+        __COLORS (Tuple[Color]): カラーブロックの色
+        __block_color_lists (Tuple[Tuple[Color]]): 取りうるカラーブロックの色の並び(辞書順)
+        __base_color_lists (Tuple[Tuple[Color]]): 取りうるベースブロックの色の並び(辞書順)
+        __block_color_ranks (Dict[Tuple[Color], int]): カラーブロックの色の並びの順位
+        __base_color_ranks (Dict[Tuple[Color], int]): ベースブロックの色の並びの順位
+        __BLOCK_COORDINATES (Tuple[Coordinate]): ブロックIDごとのブロック置き場の座標
+        __INTERSECTION_COLORS (Dict[bool, List[Color]]): コースごとの交点の色のリスト
+        __offsets (np.ndarray): 正準形の番号ごとのデータの開始位置の配列(読み込んでいない場合はNone)
+        __dictionary (bytes): 圧縮に用いたzlibの事前辞書
+        __data (np.ndarray): 圧縮した動作コマンドのバイト列
+        __strategy (str): 計画ライブラリを計画した戦略
+    """
+
+    DEFAULT_PATH = "camera_system/plan_library.bin"
+
+    __COLORS = (Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE)
+    # 取りうる色の並びを辞書順に並べたタプルと、その逆引き
+    __block_color_lists = tuple(sorted(set(itertools.permutations(__COLORS * 2)),
+                                       key=lambda colors: [color.value for color in colors]))
+    __base_color_lists = tuple(itertools.permutations(__COLORS))
+    __block_color_ranks = {colors: rank for rank, colors in enumerate(__block_color_lists)}
+    __base_color_ranks = {colors: rank for rank, colors in enumerate(__base_color_lists)}
+    LAYOUT_NUM = 2 * len(__block_color_lists) * len(__base_color_lists) * len(__COLORS)
+    CANONICAL_LAYOUT_NUM = 2 * len(__block_color_lists) * len(__COLORS)
+
+    __BLOCK_COORDINATES = (Coordinate(1, 1), Coordinate(3, 1), Coordinate(5, 1), Coordinate(1, 3),
+                           Coordinate(5, 3), Coordinate(1, 5), Coordinate(3, 5), Coordinate(5, 5))
+    # NOTE: CameraCalibrator.make_game_area_info()でコースに応じて設定する交点の色と同じ
+    __INTERSECTION_COLORS = {True: [Color.RED, Color.BLUE, Color.YELLOW, Color.GREEN],
+                             False: [Color.BLUE, Color.RED, Color.GREEN, Color.YELLOW]}
+
+    # 事前辞書に用いる動作コマンドの数と事前辞書の最大サイズ(zlibの窓サイズ)
+    __DICTIONARY_SAMPLE_NUM = 16
+    __DICTIONARY_SIZE = 32768
+
+    __offsets = None
+    __dictionary = None
+    __data = None
+    __strategy = None
+
+    @classmethod
+    def fingerprint(cls, is_left_course: bool, game_state: GameState) -> int:
+        """計画開始時のゲーム状態から配置の指紋を求める.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            配置の指紋(ライブラリが扱えない配置の場合は-1): int
+        """
+        # 全てのブロックがブロック置き場にあるゲーム状態のみ扱う
+        if any(game_state.get_block_id(coord) != block_id
+               for block_id, coord in enumerate(cls.__BLOCK_COORDINATES)):
+            return -1
+        if list(game_state.intersection_list) != cls.__INTERSECTION_COLORS[is_left_course]:
+            return -1
+        block_rank = cls.__block_color_ranks.get(tuple(game_state.block_color_list), -1)
+        base_rank = cls.__base_color_ranks.get(tuple(game_state.base_color_list), -1)
+        if block_rank == -1 or base_rank == -1 or game_state.bonus_color not in cls.__COLORS:
+            return -1
+        course_index = 0 if is_left_course else 1
+        return ((course_index * len(cls.__block_color_ranks) + block_rank)
+                * len(cls.__base_color_ranks) + base_rank) * len(cls.__COLORS) \
+            + cls.__COLORS.index(game_state.bonus_color)
+
+    @classmethod
+    def get_layout(cls, fingerprint: int) -> Tuple[bool, GameState]:
+        """配置の指紋から計画開始時のゲーム状態を求める.
+
+        Args:
+            fingerprint: 配置の指紋
+        Returns:
+            Lコースかどうか: bool
+            計画開始時のゲーム状態: GameState
+        """
+        rest, bonus_index = divmod(fingerprint, len(cls.__COLORS))
+        rest, base_rank = divmod(rest, len(cls.__base_color_ranks))
+        course_index, block_rank = divmod(rest, len(cls.__block_color_ranks))
+        is_left_course = course_index == 0
+        block_ids = [-1] * 49
+        for block_id, coord in enumerate(cls.__BLOCK_COORDINATES):
+            block_ids[coord.y * 7 + coord.x] = block_id
+        block_colors = cls.__block_color_lists[block_rank]
+        base_colors = cls.__base_color_lists[base_rank]
+        game_state = GameState(block_ids, block_colors, base_colors, cls.__COLORS[bonus_index],
+                               cls.__INTERSECTION_COLORS[is_left_course])
+        return is_left_course, game_state
+
+    @classmethod
+    def canonicalize(cls, is_left_course: bool, game_state: GameState) -> int:
+        """計画開始時のゲーム状態から正準形の配置の番号を求める.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            正準形の番号(ライブラリが扱えない配置の場合は-1): int
+        """
+        if cls.fingerprint(is_left_course, game_state) == -1:
+            return -1
+        robot = GamePlanner.get_start_robot(is_left_course, game_state)
+        # 色の付け替えのみ行う(回転や鏡映では計画が変わる)
+        _, canonical_game_state, _ = LayoutSymmetry.canonicalize(robot, game_state,
+                                                                 (LayoutSymmetry.IDENTITY,))
+        course_index = 0 if is_left_course else 1
+        block_rank = cls.__block_color_ranks[tuple(canonical_game_state.block_color_list)]
+        return (course_index * len(cls.__block_color_ranks) + block_rank) * len(cls.__COLORS) \
+            + cls.__COLORS.index(canonical_game_state.bonus_color)
+
+    @classmethod
+    def get_canonical_layout(cls, canonical_index: int) -> Tuple[bool, GameState]:
+        """正準形の番号から計画開始時のゲーム状態を求める.
+
+        Args:
+            canonical_index: 正準形の番号
+        Returns:
+            Lコースかどうか: bool
+            正準形の計画開始時のゲーム状態: GameState
+        """
+        # 正準形のベースブロックの色の順位は0
+        rest, bonus_index = divmod(canonical_index, len(cls.__COLORS))
+        return cls.get_layout(rest * len(cls.__base_color_ranks) * len(cls.__COLORS) + bonus_index)
+
+    @classmethod
+    def load(cls, path: str) -> bool:
+        """ファイルから計画ライブラリを読み込む.
+
+        圧縮した動作コマンドのバイト列はメモリマップで開き、検索時に必要な範囲のみ読み込む.
+
+        Args:
+            path: 計画ライブラリのファイルのパス
+        Returns:
+            読み込めた場合はTrue: bool
+        """
+        if not os.path.isfile(path):
+            return False
+        try:
+            offsets, dictionary, strategy, data_start = cls.__read_header(path)
+            data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_start) \
+                if offsets[-1] > 0 else np.zeros(0, dtype=np.uint8)
+        except (OSError, ValueError) as e:
+            print("Failed to load plan library %s (%s)." % (path, e))
+            return False
+        cls.__offsets = offsets
+        cls.__dictionary = dictionary
+        cls.__data = data
+        cls.__strategy = strategy
+        return True
+
+    @classmethod
+    def lookup(cls, is_left_course: bool, game_state: GameState, strategy: str = "greedy") -> str:
+        """計画ライブラリから配置に対応する動作コマンドを検索する.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態
+            strategy: 計画の戦略
+        Returns:
+            動作コマンド(ライブラリにない場合や、ライブラリを計画した戦略と異なる場合はNone): str
+        """
+        if cls.__offsets is None or strategy != cls.__strategy:
+            return None
+        canonical_index = cls.canonicalize(is_left_course, game_state)
+        if canonical_index == -1:
+            return None
+        start, end = int(cls.__offsets[canonical_index]), int(cls.__offsets[canonical_index + 1])
+        if start == end:
+            return None
+        return cls.__decompress(cls.__data[start:end].tobytes(), cls.__dictionary)
+
+    @classmethod
+    def get_layout_num(cls) -> int:
+        """読み込んだ計画ライブラリが保持する正準形の配置の数を取得する.
+
+        Returns:
+            配置の数(読み込んでいない場合は0): int
+        """
+        if cls.__offsets is None:
+            return 0
+        return int(np.count_nonzero(np.diff(cls.__offsets)))
+
+    @classmethod
+    def get_strategy(cls) -> str:
+        """読み込んだ計画ライブラリを計画した戦略を取得する.
+
+        Returns:
+            計画の戦略(読み込んでいない場合はNone): str
+        """
+        return cls.__strategy
+
+    @classmethod
+    def unload(cls) -> None:
+        """読み込んだ計画ライブラリを破棄する."""
+        cls.__offsets = None
+        cls.__dictionary = None
+        cls.__data = None
+        cls.__strategy = None
+
+    @classmethod
+    def save(cls, path: str, plans: Dict[int, str], strategy: str = "greedy") -> None:
+        """動作コマンドを計画ライブラリのファイルに保存する.
+
+        動作コマンドは似た行の繰り返しが多いため、一部の動作コマンドを連結したものを
+        zlibの事前辞書とし、1つずつ圧縮しても圧縮率が下がらないようにする.
+
+        Args:
+            path: 保存先のファイルのパス
+            plans: 正準形の番号をキーにした動作コマンド
+            strategy: 動作コマンドを計画した戦略
+        """
+        canonical_indexes = sorted(plans)
+        sample_step = max(1, len(canonical_indexes) // cls.__DICTIONARY_SAMPLE_NUM)
+        sample_indexes = canonical_indexes[::sample_step]
+        dictionary = "".join(plans[canonical_index] for canonical_index in sample_indexes) \
+            .encode("utf-8")[-cls.__DICTIONARY_SIZE:]
+        chunks = [b""] * cls.CANONICAL_LAYOUT_NUM
+        for canonical_index in canonical_indexes:
+            compressor = zlib.compressobj(9, zdict=dictionary)
+            chunks[canonical_index] = compressor.compress(
+                plans[canonical_index].encode("utf-8")) + compressor.flush()
+        offsets = np.zeros(cls.CANONICAL_LAYOUT_NUM + 1, dtype=np.uint64)
+        np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        directory = os.path.dirname(path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        # NOTE: 読み込み中(メモリマップ中)のファイルを直接上書きしないように、
+        #       一時ファイルに書き込んでから置き換える
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, offsets)
+            np.save(f, np.frombuffer(dictionary, dtype=np.uint8))
+            np.save(f, np.array(strategy))
+            f.write(b"".join(chunks))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def read(cls, path: str) -> Dict[int, str]:
+        """計画ライブラリのファイルから全ての動作コマンドを読み込む.
+
+        Args:
+            path: 計画ライブラリのファイルのパス
+        Returns:
+            正準形の番号をキーにした動作コマンド: Dict[int, str]
+        """
+        offsets, dictionary, _, data_start = cls.__read_header(path)
+        with open(path, "rb") as f:
+            f.seek(data_start)
+            data = f.read()
+        return {canonical_index: cls.__decompress(data[start:end], dictionary)
+                for canonical_index, (start, end) in enumerate(zip(offsets[:-1].tolist(),
+                                                                   offsets[1:].tolist()))
+                if start != end}
+
+    @classmethod
+    def merge(cls, paths: List[str], output_path: str) -> int:
+        """分割して作成した計画ライブラリのファイルを1つにまとめる.
+
+        ファイルごとに事前辞書が異なるため、展開してから圧縮し直す.
+        同じ配置が複数のファイルにある場合は、後に指定したファイルの動作コマンドを用いる.
+
+        Args:
+            paths: 計画ライブラリのファイルのパスのリスト
+            output_path: 保存先のファイルのパス
+        Returns:
+            まとめた配置の数: int
+        Raises:
+            ValueError: 異なる戦略で計画したファイルをまとめる場合
+        """
+        strategies = {cls.__read_header(path)[2] for path in paths}
+        if len(strategies) != 1:
+            raise ValueError("cannot merge plan libraries of strategies %s" % sorted(strategies))
+        plans = {}
+        for path in paths:
+            plans.update(cls.read(path))
+        cls.save(output_path, plans, strategies.pop())
+        return len(plans)
+
+    @classmethod
+    def __read_header(cls, path: str) -> Tuple[np.ndarray, bytes, str, int]:
+        """計画ライブラリのファイルから、開始位置の配列と事前辞書、計画の戦略を読み込む.
+
+        Args:
+            path: 計画ライブラリのファイルのパス
+        Returns:
+            正準形の番号ごとのデータの開始位置の配列: np.ndarray
+            事前辞書: bytes
+            計画の戦略: str
+            圧縮した動作コマンドのバイト列の開始位置: int
+        """
+        with open(path, "rb") as f:
+            offsets = np.load(f)
+            dictionary = np.load(f).tobytes()
+            strategy = str(np.load(f))
+            data_start = f.tell()
+        if offsets.shape != (cls.CANONICAL_LAYOUT_NUM + 1,):
+            raise ValueError("unexpected shape %s" % (offsets.shape,))
+        if strategy not in GamePlanner.STRATEGIES:
+            raise ValueError("unknown strategy '%s'" % strategy)
+        return offsets, dictionary, strategy, data_start
+
+    @staticmethod
+    def __decompress(chunk: bytes, dictionary: bytes) -> str:
+        """圧縮した動作コマンドを展開する.
+
+        Args:
+            chunk: 圧縮した動作コマンド
+            dictionary: 事前辞書
+        Returns:
+            動作コマンド: str
+        """
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return (decompressor.decompress(chunk) + decompressor.flush()).decode("utf-8")
+
+    @staticmethod
+    def get_shard(shard_index: int, shard_num: int) -> List[int]:
+        """分割して計画する場合に、担当する正準形の配置の番号を求める.
+
+        Args:
+            shard_index: 担当する分割の番号(0 ~ shard_num-1)
+            shard_num: 分割数
+        Returns:
+            正準形の番号のリスト: List[int]
+        """
+        return list(range(shard_index, PlanLibrary.CANONICAL_LAYOUT_NUM, shard_num))
+
+    @staticmethod
+    def plan_layout(canonical_index: int, strategy: str = "greedy",
+                    time_limit: float = 1.0) -> Tuple[int, str]:
+        """正準形の配置を計画する.
+
+        Args:
+            canonical_index: 正準形の番号
+            strategy: 計画の戦略
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
+        Returns:
+            正準形の番号: int
+            動作コマンド: str
+        """
+        is_left_course, game_state = PlanLibrary.get_canonical_layout(canonical_index)
+        # 探索失敗のメッセージを出力しないように標準出力を破棄する
+        with redirect_stdout(io.StringIO()):
+            motion_commands = GamePlanner.plan(is_left_course, game_state, strategy, time_limit)
+        return canonical_index, motion_commands
+
+    @classmethod
+    def build(cls, canonical_indexes: Iterable[int], process_num: int = 1,
+              strategy: str = "greedy", time_limit: float = 1.0,
+              transition_table_directory: str = None) -> Dict[int, str]:
+        """正準形の配置を並列に計画する.
+
+        Args:
+            canonical_indexes: 計画する正準形の番号
+            process_num: 計画に用いるプロセス数
+            strategy: 計画の戦略
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
+            transition_table_directory: 各プロセスで読み込む遷移表のディレクトリのパス
+        Returns:
+            正準形の番号をキーにした動作コマンド: Dict[int, str]
+        """
+        arguments = [(canonical_index, strategy, time_limit)
+                     for canonical_index in canonical_indexes]
+        if process_num <= 1:
+            if transition_table_directory is not None:
+                TransitionTable.load(transition_table_directory)
+            return dict(itertools.starmap(cls.plan_layout, arguments))
+        initializer = TransitionTable.load if transition_table_directory is not None else None
+        initargs = (transition_table_directory,) if transition_table_directory is not None else ()
+        with multiprocessing.Pool(process_num, initializer, initargs) as pool:
+            chunk_size = max(1, len(arguments) // (process_num * 16))
+            return dict(pool.starmap(cls.plan_layout, arguments, chunk_size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="使用例\n"
+                                                 " 正準形の配置を4分割したうちの0番目を8プロセスで計画する\n"
+                                                 " $ python camera_system/plan_library.py build "
+                                                 "--shard-index 0 --shard-num 4 "
+                                                 "--process-num 8 --output shard0.bin\n"
+                                                 " 分割して計画したファイルをカメラシステムが読み込むパス"
+                                                 "(%s)にまとめる\n"
+                                                 " $ python camera_system/plan_library.py merge "
+                                                 "shard0.bin shard1.bin shard2.bin shard3.bin"
+                                                 % PlanLibrary.DEFAULT_PATH,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="配置を計画して計画ライブラリを作成する")
+    build_parser.add_argument("--shard-index", type=int, default=0, help="担当する分割の番号")
+    build_parser.add_argument("--shard-num", type=int, default=1, help="分割数")
+    build_parser.add_argument("--process-num", type=int, default=os.cpu_count(),
+                              help="計画に用いるプロセス数")
+    build_parser.add_argument("--strategy", choices=GamePlanner.STRATEGIES, default="greedy",
+                              help="計画の戦略")
+    build_parser.add_argument("--time-limit", type=float, default=1.0,
+                              help="anytime戦略の場合の計画の制限時間[s]")
+    build_parser.add_argument("--transition-table", type=str,
+                              default="camera_system/transition_tables/",
+                              help="各プロセスで読み込む遷移表のディレクトリ")
+    build_parser.add_argument("--output", type=str, default=PlanLibrary.DEFAULT_PATH,
+                              help="保存先のファイル")
+    merge_parser = subparsers.add_parser("merge", help="分割して作成した計画ライブラリをまとめる")
+    merge_parser.add_argument("paths", nargs="+", help="分割して作成した計画ライブラリのファイル")
+    merge_parser.add_argument("--output", type=str, default=PlanLibrary.DEFAULT_PATH,
+                              help="保存先のファイル")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        canonical_indexes = PlanLibrary.get_shard(args.shard_index, args.shard_num)
+        print("Plan %d layouts with %d processes." % (len(canonical_indexes), args.process_num))
+        plans = PlanLibrary.build(canonical_indexes, args.process_num, args.strategy,
+                                  args.time_limit, args.transition_table)
+        PlanLibrary.save(args.output, plans, args.strategy)
+        print("Save %d plans to %s" % (len(plans), args.output))
+    else:
+        layout_num = PlanLibrary.merge(args.paths, args.output)
+        print("Merge %d plans to %s" % (layout_num, args.output))
@@ -0,0 +1,166 @@
+"""計画サーバのクライアントモジュール.
+
+常駐した計画サーバに配置の計画や統計情報を要求する
+起動を速くするため、標準ライブラリ以外のモジュール(OpenCVやNumPyなど)を読み込まない
+@author: miyashita64
+"""
+
+import argparse
+import json
+import os
+import socket
+from typing import Dict, List
+
+from str_to_bool import StrToBool
+
+
+class PlanningClient:
+    """計画サーバ(PlanningServer)に要求を送るクラス.
+
+    Attributes:
+        DEFAULT_PORT (int): 計画サーバの既定のポート番号
+    """
+
+    DEFAULT_PORT = 50050
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 timeout: float = 60.0) -> None:
+        """PlanningClientのコンストラクタ.
+
+        Args:
+            host: サーバのアドレス
+            port: サーバのポート番号
+            timeout: 応答を待つ最大時間[s]
+        """
+        self.__address = (host, port)
+        self.__timeout = timeout
+
+    def request(self, request: dict) -> dict:
+        """サーバに要求を送り、応答を受け取る.
+
+        Args:
+            request: 要求
+        Returns:
+            応答: dict
+        Raises:
+            RuntimeError: サーバがエラーを返した場合
+            OSError: サーバに接続できない場合
+        """
+        with socket.create_connection(self.__address, self.__timeout) as sock:
+            sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline().decode("utf-8"))
+        if response["status"] != "ok":
+            raise RuntimeError(response["message"])
+        return response
+
+    def plan(self, is_left_course: bool, layout: Dict[str, object] = None,
+             strategy: str = None, time_limit: float = None) -> str:
+        """配置の計画を要求する.
+
+        Args:
+            is_left_course: Lコースかどうか
+            layout: 配置({"block_colors": [色名*8], "base_colors": [色名*4], "bonus_color": 色名}、
+                Noneの場合はサーバのカメラの画像から求める)
+            strategy: ゲーム攻略の計画の戦略(Noneの場合はサーバの既定値)
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s](Noneの場合はサーバの既定値)
+        Returns:
+            最適化した動作コマンド: str
+        """
+        request = {"command": "plan", "is_left_course": is_left_course}
+        if layout is not None:
+            request["layout"] = layout
+        if strategy is not None:
+            request["strategy"] = strategy
+        if time_limit is not None:
+            request["time_limit"] = time_limit
+        return self.request(request)["commands"]
+
+    def get_stats(self) -> dict:
+        """サーバの統計情報を要求する.
+
+        Returns:
+            稼働時間、要求数、計画の所要時間、各キャッシュの大きさ: dict
+        """
+        return self.request({"command": "stats"})
+
+    def shutdown(self) -> None:
+        """サーバの停止を要求する."""
+        self.request({"command": "shutdown"})
+
+
+def parse_colors(text: str) -> List[str]:
+    """カンマ区切りの色名をリストにする.
+
+    Args:
+        text: カンマ区切りの色名
+    Returns:
+        色名(大文字)のリスト: List[str]
+    """
+    return [name.strip().upper() for name in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="使用例\n"
+                                                 " 配置を指定して計画する\n"
+                                                 " $ python camera_system/planning_client.py plan "
+                                                 "--is-left True --block-colors "
+                                                 "RED,RED,YELLOW,YELLOW,GREEN,GREEN,BLUE,BLUE "
+                                                 "--base-colors RED,YELLOW,GREEN,BLUE "
+                                                 "--bonus-color RED\n"
+                                                 " サーバのカメラの画像から計画し、ファイルに保存する\n"
+                                                 " $ python camera_system/planning_client.py plan "
+                                                 "--is-left True --output "
+                                                 "camera_system/datafiles/GameAreaLeft.csv\n"
+                                                 " 統計情報を表示する\n"
+                                                 " $ python camera_system/planning_client.py stats",
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="サーバのアドレス")
+    parser.add_argument("--port", type=int, default=PlanningClient.DEFAULT_PORT,
+                        help="サーバのポート番号")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    plan_parser = subparsers.add_parser("plan", help="配置の計画を要求する")
+    plan_parser.add_argument("--is-left", type=str, required=True,
+                             choices=(StrToBool.true_str_list() + StrToBool.false_str_list()),
+                             help="Lコースの場合Trueに、Rコースの場合Falseを設定する")
+    plan_parser.add_argument("--block-colors", type=parse_colors, default=None,
+                             help="ブロックIDの順のカラーブロックの色(省略時はカメラの画像から求める)")
+    plan_parser.add_argument("--base-colors", type=parse_colors, default=None,
+                             help="東南西北の順のベースブロックの色")
+    plan_parser.add_argument("--bonus-color", type=str.upper, default=None,
+                             help="ボーナスブロックの色")
+    plan_parser.add_argument("--strategy", choices=("greedy", "exact", "anytime"), default=None,
+                             help="計画の戦略(省略時はサーバの既定値)")
+    plan_parser.add_argument("--time-limit", type=float, default=None,
+                             help="anytime戦略の場合の計画の制限時間[s](省略時はサーバの既定値)")
+    plan_parser.add_argument("--output", type=str, default=None,
+                             help="動作コマンドの保存先のファイル(省略時は標準出力に表示する)")
+    subparsers.add_parser("stats", help="サーバの統計情報を表示する")
+    subparsers.add_parser("shutdown", help="サーバを停止する")
+    args = parser.parse_args()
+
+    client = PlanningClient(args.host, args.port)
+    if args.command == "plan":
+        layout = None
+        if args.block_colors is not None:
+            if args.base_colors is None or args.bonus_color is None:
+                parser.error("--block-colors requires --base-colors and --bonus-color")
+            layout = {"block_colors": args.block_colors, "base_colors": args.base_colors,
+                      "bonus_color": args.bonus_color}
+        try:
+            motion_commands = client.plan(StrToBool.convert(args.is_left), layout,
+                                          args.strategy, args.time_limit)
+        except RuntimeError as e:
+            parser.exit(1, "Planning failed (%s)\n" % e)
+        if args.output is None:
+            print(motion_commands, end="")
+        else:
+            directory = os.path.dirname(args.output)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(motion_commands)
+    elif args.command == "stats":
+        print(json.dumps(client.get_stats(), indent=2, ensure_ascii=False))
+    else:
+        client.shutdown()
@@ -0,0 +1,314 @@
+"""計画サーバモジュール.
+
+遷移表や計画ライブラリ、カメラを開いたまま常駐し、ローカルのソケットで受け取った配置の計画を返す
+@author: miyashita64
+"""
+
+import argparse
+import collections
+import json
+import socketserver
+import time
+from typing import Dict, Tuple
+
+from camera_calibrator import CameraCalibrator
+from color_changer import Color
+from command_optimizer import CommandOptimizer
+from game_motion import GameMotionMeta
+from game_planner import GamePlanner
+from game_state import GameState
+from plan_library import PlanLibrary
+from planning_client import PlanningClient
+from transition_table import TransitionTable
+
+
+class PlanningServer:
+    """配置の計画の要求に応える常駐サーバクラス.
+
+    起動時に遷移表と計画ライブラリを読み込んで各コースの配置を1つずつ計画しておき、
+    カメラを用いる場合はキャリブレーションを済ませて画像の連続取得を続ける.
+    要求は1行のJSONで受け取り、応答も1行のJSONで返す. 要求は1つずつ順に処理する.
+        - {"command": "plan", "is_left_course": bool, "layout": 配置, "strategy": str,
+           "time_limit": float}: 配置を計画し、最適化した動作コマンドを返す. 配置は
+            {"block_colors": [色名*8], "base_colors": [色名*4], "bonus_color": 色名}とし、
+            省略した場合はカメラの画像から求める. 戦略と制限時間は省略した場合は起動時の値とする.
+        - {"command": "stats"}: 稼働時間、要求数、計画の所要時間、各キャッシュの大きさを返す
+        - {"command": "shutdown"}: 遷移表を保存してサーバを停止する
+    応答は成功した場合は"status"が"ok"、失敗した場合は"status"が"error"で"message"に理由を持つ.
+    戦略が"anytime"以外の計画は配置ごとに同じ結果になるため、応答した動作コマンドをキャッシュする.
+
+    Attributes:
+        __TRANSITION_TABLE_DIRECTORY_PATH (str): 遷移表のディレクトリのパス
+        __PLAN_CACHE_SIZE (int): キャッシュする動作コマンドの最大数
+        __LATENCY_SAMPLE_NUM (int): 所要時間の統計に用いる直近の計画の数
+    """
+
+    __TRANSITION_TABLE_DIRECTORY_PATH = "camera_system/transition_tables/"
+    __PLAN_CACHE_SIZE = 4096
+    __LATENCY_SAMPLE_NUM = 1000
+
+    def __init__(self, camera_id: int = None, strategy: str = "greedy", time_limit: float = 1.0,
+                 frame_num: int = 1, recalibrate: bool = False) -> None:
+        """PlanningServerのコンストラクタ.
+
+        Args:
+            camera_id: カメラID(Noneの場合はカメラを用いない)
+            strategy: 既定のゲーム攻略の計画の戦略("greedy", "exact" or "anytime")
+            time_limit: 戦略が"anytime"の場合の既定の計画の制限時間[s]
+            frame_num: ゲームエリア情報の作成に用いる画像の最大数
+            recalibrate: 保存したキャリブレーションプロファイルを用いずにGUIから座標を取得する場合 True
+        """
+        self.__strategy = strategy
+        self.__time_limit = time_limit
+        self.__frame_num = frame_num
+        self.__start_time = time.time()
+        self.__request_num = 0
+        self.__error_num = 0
+        self.__cache_hit_num = 0
+        self.__latencies = collections.deque(maxlen=PlanningServer.__LATENCY_SAMPLE_NUM)
+        self.__plan_cache = {}
+        self.__is_running = False
+
+        # 前回までに作成した遷移表と、事前に計画した計画ライブラリを読み込む
+        TransitionTable.load(PlanningServer.__TRANSITION_TABLE_DIRECTORY_PATH)
+        PlanLibrary.load(PlanLibrary.DEFAULT_PATH)
+        # 初回の要求を速くするため、各コースの配置を1つずつ計画して遷移やゲーム動作を作成しておく
+        # NOTE: 遷移やゲーム動作は戦略によらず共通のため、起動を待たせないように最も速い戦略で計画する
+        for fingerprint in (0, PlanLibrary.LAYOUT_NUM // 2):
+            PlanningServer.plan_commands(*PlanLibrary.get_layout(fingerprint), "greedy")
+        # カメラを開いたままにし、キャリブレーションを済ませておく
+        self.__camera_calibrator = None
+        if camera_id is not None:
+            self.__camera_calibrator = CameraCalibrator(camera_id)
+            self.__camera_calibrator.start_camera_calibration(recalibrate)
+
+    def serve(self, host: str = "127.0.0.1", port: int = PlanningClient.DEFAULT_PORT) -> None:
+        """停止の要求を受け取るまで要求に応える.
+
+        Args:
+            host: 待ち受けるアドレス
+            port: 待ち受けるポート番号
+        """
+        planning_server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            """1行ごとの要求に応えるハンドラ."""
+
+            def handle(self) -> None:
+                """接続が切れるまで要求に応える."""
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line.decode("utf-8"))
+                    except ValueError as e:
+                        request = {"command": None, "error": "Invalid JSON (%s)" % e}
+                    response = planning_server.handle_request(request)
+                    self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+                    if not planning_server.is_running:
+                        break
+
+        socketserver.TCPServer.allow_reuse_address = True
+        with socketserver.TCPServer((host, port), RequestHandler) as server:
+            print("Planning server is listening on %s:%d" % (host, port))
+            self.__is_running = True
+            while self.__is_running:
+                server.handle_request()
+        # 要求ごとに続けていた画像の連続取得を終了する
+        if self.__camera_calibrator is not None:
+            self.__camera_calibrator.stop_capture()
+        # 次回の計画のために、作成した遷移表を保存する
+        TransitionTable.save(PlanningServer.__TRANSITION_TABLE_DIRECTORY_PATH)
+
+    def handle_request(self, request: dict) -> dict:
+        """要求に応える.
+
+        Args:
+            request: 要求
+        Returns:
+            応答: dict
+        """
+        self.__request_num += 1
+        command = request.get("command") if isinstance(request, dict) else None
+        try:
+            if command == "plan":
+                return self.__plan(request)
+            if command == "stats":
+                return self.__get_stats()
+            if command == "shutdown":
+                self.__is_running = False
+                return {"status": "ok"}
+            raise ValueError(request.get("error", "Unknown command '%s'" % command)
+                             if isinstance(request, dict) else "Request must be an object")
+        except (ValueError, TypeError, KeyError) as e:
+            self.__error_num += 1
+            return {"status": "error", "message": "%s: %s" % (type(e).__name__, e)}
+
+    def __plan(self, request: dict) -> dict:
+        """配置を計画する.
+
+        Args:
+            request: 計画の要求
+        Returns:
+            動作コマンド、計画の取得元("library", "planner" or "cache")、所要時間[ms]、
+            CommandOptimizer.optimizeの統計情報を含む応答: dict
+        """
+        start_time = time.perf_counter()
+        is_left_course = request["is_left_course"]
+        if not isinstance(is_left_course, bool):
+            raise TypeError("is_left_course must be bool")
+        strategy = request.get("strategy", self.__strategy)
+        if strategy not in GamePlanner.STRATEGIES:
+            raise ValueError("Unknown strategy '%s'" % strategy)
+        time_limit = float(request.get("time_limit", self.__time_limit))
+        if request.get("layout") is not None:
+            game_state = self.to_game_state(is_left_course, request["layout"])
+        elif self.__camera_calibrator is not None:
+            # カメラの画像からゲームエリア情報を作成し、次の要求のために画像の連続取得を続ける
+            self.__camera_calibrator.make_game_area_info(is_left_course,
+                                                         frame_num=self.__frame_num,
+                                                         keep_capturing=True)
+            game_state = GameState.from_game_area_info()
+        else:
+            raise ValueError("layout is required without a camera")
+
+        key = (is_left_course, game_state, strategy)
+        response = self.__plan_cache.get(key) if strategy != "anytime" else None
+        if response is not None:
+            self.__cache_hit_num += 1
+            response = dict(response, source="cache")
+        else:
+            motion_commands, stats = PlanningServer.plan_commands(is_left_course, game_state,
+                                                                  strategy, time_limit)
+            response = {"status": "ok", "commands": motion_commands, "source": stats.pop("source"),
+                        "optimizer": stats}
+            if strategy != "anytime":
+                # キャッシュが最大数に達した場合は、最も古い動作コマンドを破棄する
+                if len(self.__plan_cache) >= PlanningServer.__PLAN_CACHE_SIZE:
+                    del self.__plan_cache[next(iter(self.__plan_cache))]
+                self.__plan_cache[key] = response
+        latency = (time.perf_counter() - start_time) * 1000
+        self.__latencies.append(latency)
+        return dict(response, time=latency)
+
+    def __get_stats(self) -> dict:
+        """サーバの統計情報を求める.
+
+        Returns:
+            稼働時間[s]、要求数、エラー数、直近の計画の所要時間[ms]、各キャッシュの大きさを含む応答: dict
+        """
+        latencies = sorted(self.__latencies)
+        latency_stats = {"count": len(latencies)}
+        if latencies != []:
+            latency_stats.update({
+                "last": self.__latencies[-1], "mean": sum(latencies) / len(latencies),
+                "p50": latencies[(len(latencies) - 1) // 2],
+                "p95": latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)],
+                "max": latencies[-1]})
+        return {"status": "ok", "uptime": time.time() - self.__start_time,
+                "requests": self.__request_num, "errors": self.__error_num,
+                "latency": latency_stats, "camera": self.__camera_calibrator is not None,
+                "caches": {"plans": len(self.__plan_cache), "plan_hits": self.__cache_hit_num,
+                           "plan_library_layouts": PlanLibrary.get_layout_num(),
+                           "plan_library_strategy": PlanLibrary.get_strategy(),
+                           "game_motions": GameMotionMeta.get_instance_num(),
+                           **{"transition_" + name: num
+                              for name, num in TransitionTable.get_cache_info().items()}}}
+
+    @staticmethod
+    def plan_commands(is_left_course: bool, game_state: GameState, strategy: str = "greedy",
+                      time_limit: float = 1.0) -> Tuple[str, Dict[str, object]]:
+        """計画ライブラリから配置に対応する計画を引き、ない場合はゲームエリア攻略を計画して最適化する.
+
+        計画ライブラリと遷移表は読み込み済みのものを用いる.
+        計画ライブラリは、同じ戦略で計画したものである場合のみ用いる.
+
+        Args:
+            is_left_course: Lコースかどうか
+            game_state: 計画開始時のゲーム状態
+            strategy: ゲーム攻略の計画の戦略("greedy", "exact" or "anytime")
+            time_limit: 戦略が"anytime"の場合の計画の制限時間[s]
+        Returns:
+            最適化した動作コマンド: str
+            計画の取得元("library" or "planner")とCommandOptimizer.optimizeの統計情報: Dict[str, object]
+        """
+        motion_commands = PlanLibrary.lookup(is_left_course, game_state, strategy)
+        source = "library"
+        if motion_commands is None:
+            motion_commands = GamePlanner.plan(is_left_course, game_state, strategy, time_limit)
+            source = "planner"
+        # 冗長なコマンドの並びを最適化する
+        motion_commands, stats = CommandOptimizer.optimize(motion_commands)
+        stats["source"] = source
+        return motion_commands, stats
+
+    @staticmethod
+    def to_game_state(is_left_course: bool, layout: Dict[str, object]) -> GameState:
+        """要求の配置から計画開始時のゲーム状態を求める.
+
+        Args:
+            is_left_course: Lコースかどうか
+            layout: 配置({"block_colors": [色名*8], "base_colors": [色名*4], "bonus_color": 色名})
+        Returns:
+            計画開始時のゲーム状態: GameState
+        Raises:
+            ValueError: 配置の色の数が異なる場合
+            KeyError: 未知の色名を含む場合
+        """
+        block_colors = [Color[name] for name in layout["block_colors"]]
+        base_colors = [Color[name] for name in layout["base_colors"]]
+        if len(block_colors) != 8 or len(base_colors) != 4:
+            raise ValueError("layout needs 8 block colors and 4 base colors")
+        # 計画ライブラリと同じく、全てのブロックがブロック置き場にあり、交点の色がコースに応じた配置とする
+        # NOTE: 指紋の0とLAYOUT_NUM//2は、それぞれLコースとRコースの最初の配置
+        _, game_state = PlanLibrary.get_layout(0 if is_left_course else PlanLibrary.LAYOUT_NUM // 2)
+        return GameState(game_state.block_ids, block_colors, base_colors,
+                         Color[layout["bonus_color"]], game_state.intersection_list)
+
+    @staticmethod
+    def to_layout(game_state: GameState) -> Dict[str, object]:
+        """計画開始時のゲーム状態から要求の配置(PlanningClient.planの引数)を求める.
+
+        Args:
+            game_state: 計画開始時のゲーム状態
+        Returns:
+            配置: Dict[str, object]
+        """
+        return {"block_colors": [color.name for color in game_state.block_color_list],
+                "base_colors": [color.name for color in game_state.base_color_list],
+                "bonus_color": game_state.bonus_color.name}
+
+    @property
+    def is_running(self) -> bool:
+        """Getter.
+
+        Returns:
+            要求に応えている場合True: bool
+        """
+        return self.__is_running
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="使用例\n"
+                                                 " カメラID 0を開いたままにしてサーバを起動する\n"
+                                                 " $ python camera_system/planning_server.py "
+                                                 "--camera-id 0\n"
+                                                 "要求はcamera_system/planning_client.pyから送る",
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, default=PlanningClient.DEFAULT_PORT,
+                        help="待ち受けるポート番号")
+    parser.add_argument("--camera-id", type=int, default=None,
+                        help="開いておくカメラのID(省略時はカメラを用いない)")
+    parser.add_argument("--strategy", choices=GamePlanner.STRATEGIES, default="greedy",
+                        help="既定の計画の戦略(exactは計画に10秒以上かかることがあるため、"
+                             "競技で用いる場合はanytimeとする)")
+    parser.add_argument("--time-limit", type=float, default=1.0,
+                        help="anytime戦略の場合の既定の計画の制限時間[s]")
+    parser.add_argument("--frame-num", type=int, default=1,
+                        help="ブロックの色を求めるために用いる画像の最大数")
+    parser.add_argument("--recalibrate", action="store_true",
+                        help="保存したキャリブレーションプロファイルを用いずにGUIから座標を取得する")
+    args = parser.parse_args()
+
+    server = PlanningServer(args.camera_id, args.strategy, args.time_limit, args.frame_num,
+                            args.recalibrate)
+    server.serve(args.host, args.port)
@@ -0,0 +1,148 @@
+"""カメラ画像の座標を検出するモジュール.
+
+6色変換した画像の色の領域から、ブロック置き場、ベースサークル、端点サークルの座標を検出する
+@author: miyashita64
+"""
+
+import cv2
+import numpy as np
+from typing import List, Tuple
+from color_changer import Color, ColorChanger
+from frame_rectifier import FrameRectifier
+
+
+class PointDetector:
+    """カメラ画像からブロック置き場、ベースサークル、端点サークルの座標を検出するクラス.
+
+    座標はGUIでクリックする位置と同じく、各座標に置かれたブロックの中心とする.
+    前回のキャリブレーションの座標(参照座標)から、7*7のノードの座標系からカメラ画像への射影変換を求めて
+    各座標のノードの座標系での位置を保持しておき、カメラの位置が多少ずれていても、
+    画像中のブロック(6色変換した画像の、塗りつぶされた十分な大きさの色の領域)に対応付けて座標を検出する.
+    対応付けたブロックから射影変換を求め直し、射影変換で予測した位置とブロックの中心の距離から信頼度を求める.
+
+    Attributes:
+        CONFIDENCE_THRESHOLD (float): 検出した座標を用いる最小の信頼度
+        __BLOB_COLORS (Tuple[Color]): ブロックの色
+        __MIN_BLOB_AREA_RATIO (float): ブロックとみなす色の領域の、画像に対する面積の最小の割合
+        __MIN_BLOB_FILL_RATIO (float): ブロックとみなす色の領域の、外接矩形に対する面積の最小の割合
+        __SEARCH_RADIUS_RATIO (float): 予測した位置からブロックを探す半径の、画像の横幅に対する割合
+        __REFINEMENT_NUM (int): 対応付けたブロックから射影変換を求め直す回数
+    """
+
+    CONFIDENCE_THRESHOLD = 0.5
+
+    __BLOB_COLORS = (Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE)
+    __MIN_BLOB_AREA_RATIO = 0.001
+    __MIN_BLOB_FILL_RATIO = 0.6
+    __SEARCH_RADIUS_RATIO = 0.05
+    __REFINEMENT_NUM = 2
+
+    def __init__(self, reference_points: List[Tuple[int, int]]) -> None:
+        """PointDetectorのコンストラクタ.
+
+        Args:
+            reference_points: 参照座標(ブロック置き場8個、ベースサークル4個、端点サークル1個の順)
+        """
+        self.__reference_points = np.array(reference_points, np.float32).reshape(-1, 2)
+        self.__node_points = None
+        # ブロック置き場の座標から、ノードの座標系からカメラ画像への射影変換を求める
+        homography = FrameRectifier.find_node_homography(self.__reference_points)
+        # ブロック置き場が一直線上に並ぶなど、射影変換を求められない場合は検出しない
+        if homography is None:
+            print("[Warning] 参照座標から射影変換を求められません")
+            return
+        # 全ての座標のノードの座標系での位置を求めておく
+        self.__node_points = cv2.perspectiveTransform(
+            self.__reference_points.reshape(-1, 1, 2), np.linalg.inv(homography)).reshape(-1, 2)
+
+    def detect(self, img: np.ndarray) -> Tuple[List[Tuple[int, int]], List[float]]:
+        """画像から各座標を検出する.
+
+        Args:
+            img: BGR画像
+        Returns:
+            検出した座標(ブロックが見つからない座標は予測した位置)のリスト: List[Tuple[int, int]]
+            各座標の信頼度(0から1)のリスト: List[float]
+        """
+        if self.__node_points is None:
+            points = self.__reference_points.round().astype(int).tolist()
+            return [tuple(point) for point in points], [0.0] * len(points)
+
+        centers = self.find_blobs(img)
+        search_radius = img.shape[1] * PointDetector.__SEARCH_RADIUS_RATIO
+        # 最初はカメラのずれを考慮して広い範囲から探し、射影変換を求め直すごとに範囲を狭める
+        predicted_points = self.__reference_points
+        for i in range(PointDetector.__REFINEMENT_NUM):
+            blob_indexes, _ = self.__match(predicted_points, centers,
+                                           search_radius * (PointDetector.__REFINEMENT_NUM - i))
+            matched = blob_indexes >= 0
+            if np.count_nonzero(matched) < 4:
+                break
+            homography, _ = cv2.findHomography(self.__node_points[matched],
+                                               centers[blob_indexes[matched]],
+                                               cv2.RANSAC, search_radius / 2)
+            if homography is None:
+                break
+            predicted_points = cv2.perspectiveTransform(
+                self.__node_points.reshape(-1, 1, 2), homography).reshape(-1, 2)
+
+        blob_indexes, distances = self.__match(predicted_points, centers, search_radius)
+        matched = blob_indexes >= 0
+        points = predicted_points.copy()
+        points[matched] = centers[blob_indexes[matched]]
+        confidences = np.where(matched, 1 - distances / search_radius, 0)
+        return [tuple(point) for point in points.round().astype(int).tolist()], \
+            confidences.tolist()
+
+    @classmethod
+    def find_blobs(cls, img: np.ndarray) -> np.ndarray:
+        """画像からブロックとみなす色の領域を探す.
+
+        Args:
+            img: BGR画像
+        Returns:
+            各領域の中心座標(x, y)の配列: ndarray
+        """
+        color_ids = ColorChanger.classify(cv2.cvtColor(img, cv2.COLOR_BGR2HSV))
+        min_area = img.shape[0] * img.shape[1] * cls.__MIN_BLOB_AREA_RATIO
+        kernel = np.ones((3, 3), np.uint8)
+        centers = []
+        for color in cls.__BLOB_COLORS:
+            # 細かいノイズを除いてから、色ごとに連結した領域を求める
+            mask = cv2.morphologyEx((color_ids == color.value).view(np.uint8),
+                                    cv2.MORPH_OPEN, kernel)
+            _, _, stats, centroids = cv2.connectedComponentsWithStats(mask)
+            # 背景(ラベル0)を除き、十分に大きく塗りつぶされた領域(交点の円や輪は除く)をブロックとみなす
+            areas = stats[1:, cv2.CC_STAT_AREA]
+            fill_ratios = areas / (stats[1:, cv2.CC_STAT_WIDTH] * stats[1:, cv2.CC_STAT_HEIGHT])
+            is_blob = (areas >= min_area) & (fill_ratios >= cls.__MIN_BLOB_FILL_RATIO)
+            centers.append(centroids[1:][is_blob])
+        return np.concatenate(centers).astype(np.float32).reshape(-1, 2)
+
+    @staticmethod
+    def __match(points: np.ndarray, centers: np.ndarray,
+                search_radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """各座標に、探す範囲内で最も近いブロックを対応付ける(1つのブロックは1つの座標のみに対応付ける).
+
+        Args:
+            points: 座標の配列
+            centers: ブロックの中心座標の配列
+            search_radius: ブロックを探す半径[px]
+        Returns:
+            各座標に対応付けたブロックの番号(見つからない場合は-1)の配列: ndarray
+            各座標と対応付けたブロックの距離の配列: ndarray
+        """
+        blob_indexes = np.full(len(points), -1)
+        distances = np.full(len(points), np.inf)
+        if len(centers) == 0:
+            return blob_indexes, distances
+        distance_table = np.linalg.norm(points[:, np.newaxis] - centers[np.newaxis], axis=2)
+        # 距離が近い組から順に対応付ける
+        for flat_index in np.argsort(distance_table, axis=None):
+            point_index, blob_index = np.unravel_index(flat_index, distance_table.shape)
+            if distance_table[point_index, blob_index] > search_radius:
+                break
+            if blob_indexes[point_index] == -1 and blob_index not in blob_indexes:
+                blob_indexes[point_index] = blob_index
+                distances[point_index] = distance_table[point_index, blob_index]
+        return blob_indexes, distances
@@ -5,12 +5,16 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 
 
 class ReturnToBlock(GameMotion):
     """設置後復帰(→ブロック置き場)のゲーム動作クラス."""
 
+    __slots__ = ("__rotation_angle", "__rotation_pwm", "__rotation_time", "__correction_pwm",
+                 "__direct_rotation", "__need_adjustment", "__correction_target_angle")
+
     def __init__(self, angle: int, need_adjustment: bool) -> None:
         """ReturnToBlockのコンストラクタ.
 
@@ -26,11 +30,15 @@ class ReturnToBlock(GameMotion):
         self.__need_adjustment = need_adjustment
         self.__correction_target_angle = 0
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """設置後復帰(→ブロック置き場)のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -53,12 +61,12 @@ class ReturnToBlock(GameMotion):
 
         command_list += "DS,100,-40\n"  # ブロック置き場まで後退
         command_list += "AF,50,40,アームを下げる処理\n"
-        self.current_edge = "none"  # 計算上のエッジをnoneにする
+        current_edge = "none"  # 計算上のエッジをnoneにする
 
         # 最初の行の末尾に",設置後復帰(→ブロック置き場)"を追加する
-        return command_list.replace("\n", ",設置後復帰(→ブロック置き場)\n", 1)
+        return command_list.replace("\n", ",設置後復帰(→ブロック置き場)\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """設置後復帰(→ブロック置き場)のゲーム動作のコストを計算するメソッド.
 
         Returns:
@@ -5,6 +5,7 @@
 @author mutotaka0426
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 from color_changer import Color
 
@@ -12,6 +13,10 @@ from color_changer import Color
 class ReturnToIntersection(GameMotion):
     """設置後復帰(→交点)のゲーム動作クラス."""
 
+    __slots__ = ("__angle", "__rotation_angle", "__rotation_pwm", "__rotation_time",
+                 "__correction_pwm", "__direct_rotation", "__target_color",
+                 "__correction_target_angle")
+
     def __init__(self, angle: int,  target_color: Color) -> None:
         """ReturnToIntersectionのコンストラクタ.
 
@@ -33,11 +38,15 @@ class ReturnToIntersection(GameMotion):
         if self.__target_color not in expected_color:
             raise ValueError('"%s" is an Unexpected Color' % self.__target_color.name)
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """設置後復帰(→交点)のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -55,18 +64,19 @@ class ReturnToIntersection(GameMotion):
         command_list += "AR,50,40,アームを上げる処理(設置処理)\n"
 
         # 回頭後にエッジが切り替わる場合，エッジ切り替えをセットする
-        if (next_edge := self.get_next_edge(self.__angle)) != self.current_edge:
+        if (next_edge := self.get_next_edge(self.__angle, current_edge)) != current_edge:
             command_list += "EC,%s\n" % next_edge
-            self.current_edge = next_edge  # 現在のエッジを更新する
+            current_edge = next_edge  # 現在のエッジを更新する
 
         command_list += "DS,70,-40\n"  # 黒を認識するための後退
         command_list += "AF,50,40,アームを下げる処理\n"
         command_list += "CL,%s,0,-40,0.1,0.08,0.08\n" % self.__target_color.name  # 交点までライントレース
         command_list += "DS,15,60\n"  # 走行体が交差点に乗るように調整
 
-        return command_list.replace("\n", ",設置後復帰(→交点)\n", 1)  # 最初の行の末尾に",設置後復帰(→交点)"を追加する
+        # 最初の行の末尾に",設置後復帰(→交点)"を追加する
+        return command_list.replace("\n", ",設置後復帰(→交点)\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """設置後復帰(→交点)のゲーム動作のコストを計算するメソッド.
 
         Returns:
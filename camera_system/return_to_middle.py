@@ -5,12 +5,16 @@
 @author mutotaka0426 miyashita64
 """
 
+from typing import Tuple
 from game_motion import GameMotion
 
 
 class ReturnToMiddle(GameMotion):
     """設置後復帰(→中点)のゲーム動作クラス."""
 
+    __slots__ = ("__angle", "__rotation_angle", "__rotation_pwm", "__rotation_time",
+                 "__correction_pwm", "__direct_rotation", "__correction_target_angle")
+
     def __init__(self, angle: int) -> None:
         """ReturnToMiddleのコンストラクタ.
 
@@ -27,11 +31,15 @@ class ReturnToMiddle(GameMotion):
         self.__direct_rotation = "clockwise" if angle > 0 else "anticlockwise"
         self.__correction_target_angle = 0
 
-    def generate_command(self) -> str:
+    def build_command(self, current_edge: str) -> Tuple[str, str]:
         """設置後復帰(→中点)のゲーム動作に必要なコマンドを生成するメソッド.
 
+        Args:
+            current_edge: 動作開始時のエッジ("left" or "right" or "none")
+
         Returns:
             str: コマンド
+            str: 動作終了時のエッジ
         """
         command_list = ""  # コマンドのリストを格納する文字列
 
@@ -49,17 +57,17 @@ class ReturnToMiddle(GameMotion):
         command_list += "AR,50,40,アームを上げる処理(設置処理)\n"
 
         # 回頭後にエッジが切り替わる場合，エッジ切り替えをセットする
-        if (next_edge := self.get_next_edge(self.__angle)) != self.current_edge:
+        if (next_edge := self.get_next_edge(self.__angle, current_edge)) != current_edge:
             command_list += "EC,%s\n" % next_edge
-            self.current_edge = next_edge  # 現在のエッジを更新する
+            current_edge = next_edge  # 現在のエッジを更新する
         command_list += "DS,50,-40\n"  # 黒を認識するための後退
         command_list += "AF,50,40,アームを下げる処理\n"
         command_list += "DL,50,0,-40,0.1,0.08,0.08\n"  # 中点までライントレース
 
         # 最初の行の末尾に",設置後復帰(→中点)"を追加する
-        return command_list.replace("\n", ",設置後復帰(→中点)\n", 1)
+        return command_list.replace("\n", ",設置後復帰(→中点)\n", 1), current_edge
 
-    def get_cost(self) -> float:
+    def calculate_cost(self) -> float:
         """設置後復帰(→中点)のゲーム動作のコストを計算するメソッド.
 
         Returns:
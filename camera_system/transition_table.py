@@ -0,0 +1,293 @@
+"""状態遷移表モジュール.
+
+走行体の状態から1つのゲーム動作で遷移できる状態とそのコストを保持する
+@author: miyashita64
+"""
+
+import os
+import threading
+import numpy as np
+from typing import Dict, Tuple
+from robot import Robot, Direction
+from coordinate import Coordinate
+from game_area_info import GameAreaInfo
+from game_state import GameState
+from game_motion_converter import GameMotionConverter
+
+
+class TransitionTable:
+    """ブロックの配置ごとの状態遷移表クラス.
+
+    走行体の状態を 状態ID = ((ブロック保持の有無*49 + y*7 + x)*8 + 方位)*3 + エッジ の整数で表し、
+    状態IDと方位(0~7)から遷移先の状態ID(遷移できない場合は-1)とコストを引けるようにする.
+    ブロック保持の有無は0:未保持, 1:保持とする.
+
+    ある状態からの遷移は、走行体がいるノードの東西南北にブロックがあるか(4ビットのパターン)のみで決まる.
+    そのため、遷移は(状態ID, パターン)ごとに全てのブロックの配置で共有し、初回参照時に作成する.
+    インスタンスはブロックの配置ごとに各ノードのパターンを保持し、共有の遷移を引くためのビューとなる.
+    複数のスレッドから参照できるように、遷移の作成と配列の確保・置き換えはロックで排他する.
+    作成済みの遷移はロックを取らずに参照するため、作成済みかどうかは遷移を書き込んだ後に設定する.
+    NOTE: 遷移の読み込み(load)や破棄(clear_cache)は、他のスレッドが計画していない時に行う.
+
+    Attributes:
+        EDGES (Tuple[str]): エッジの値(状態IDにおけるエッジの番号順)
+        STATE_NUM (int): 状態の数
+        PATTERN_NUM (int): 周囲のブロックのパターンの数
+        DIRECTION_VECTORS (Tuple[Tuple[int, int]]): 各方位に進んだ際の移動ベクトル
+        __next_states (np.ndarray): 遷移先の状態IDの配列(状態ID, パターン, 方位)
+        __costs (np.ndarray): 遷移のコストの配列(状態ID, パターン, 方位)
+        __compiled (np.ndarray): 遷移を作成済みかどうかの配列(状態ID, パターン)
+        __tables (Dict[int, TransitionTable]): ブロックの配置をキーにした遷移表のキャッシュ
+        __lock (threading.RLock): 遷移の作成と配列、キャッシュの変更を排他するロック
+    """
+
+    EDGES = ("left", "right", "none")
+    STATE_NUM = 2 * 49 * 8 * 3
+    PATTERN_NUM = 16
+    DIRECTION_VECTORS = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+    __FILE_PREFIX = "transition"
+    __next_states = None
+    __costs = None
+    __compiled = None
+    __tables = {}
+    __lock = threading.RLock()
+
+    def __init__(self, occupancy: int) -> None:
+        """TransitionTableのコンストラクタ.
+
+        Args:
+            occupancy: ブロックがあるノードのビットボード
+        """
+        self.__occupancy = occupancy
+        # 各ノードの東西南北のブロックのパターン
+        self.__patterns = tuple(
+            GameAreaInfo.get_neighbor_pattern(Coordinate(node_id % 7, node_id // 7), occupancy)
+            for node_id in range(49))
+
+    @classmethod
+    def get(cls, occupancy: int) -> "TransitionTable":
+        """ブロックの配置に対応する遷移表を取得する(キャッシュになければ作成する).
+
+        Args:
+            occupancy: ブロックがあるノードのビットボード
+
+        Returns:
+            TransitionTable: 遷移表
+        """
+        with cls.__lock:
+            if cls.__next_states is None:
+                cls.__allocate()
+            if occupancy not in cls.__tables:
+                cls.__tables[occupancy] = TransitionTable(occupancy)
+            return cls.__tables[occupancy]
+
+    @classmethod
+    def get_cache_info(cls) -> Dict[str, int]:
+        """作成済みの遷移と遷移表のキャッシュの大きさを取得する.
+
+        Returns:
+            作成済みの(状態ID, パターン)の数、キャッシュした遷移表の数: Dict[str, int]
+        """
+        compiled_num = int(np.count_nonzero(cls.__compiled)) if cls.__compiled is not None else 0
+        return {"compiled": compiled_num, "tables": len(cls.__tables)}
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """作成済みの遷移と遷移表のキャッシュを破棄する."""
+        with cls.__lock:
+            cls.__next_states = None
+            cls.__costs = None
+            cls.__compiled = None
+            cls.__tables = {}
+
+    @classmethod
+    def save(cls, directory: str) -> None:
+        """作成済みの遷移をNumPy配列としてディレクトリに保存する.
+
+        Args:
+            directory: 保存先ディレクトリのパス
+        """
+        with cls.__lock:
+            if cls.__next_states is None:
+                return
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, cls.__FILE_PREFIX)
+            for suffix, array in (("_next.npy", cls.__next_states),
+                                  ("_cost.npy", cls.__costs),
+                                  ("_compiled.npy", cls.__compiled)):
+                # NOTE: 読み込み中(メモリマップ中)のファイルを直接上書きしないように、
+                #       一時ファイルに書き込んでから置き換える
+                with open(path + suffix + ".tmp", "wb") as f:
+                    np.save(f, array)
+                os.replace(path + suffix + ".tmp", path + suffix)
+
+    @classmethod
+    def load(cls, directory: str) -> None:
+        """ディレクトリに保存された遷移をメモリマップで読み込む.
+
+        読み込んだ配列はコピーオンライトで開くため、未作成の遷移を追加してもファイルは変更されない.
+
+        Args:
+            directory: 遷移を保存したディレクトリのパス
+        """
+        path = os.path.join(directory, cls.__FILE_PREFIX)
+        if not os.path.isfile(path + "_next.npy"):
+            return
+        try:
+            next_states = np.load(path + "_next.npy", mmap_mode="c")
+            costs = np.load(path + "_cost.npy", mmap_mode="c")
+            compiled = np.load(path + "_compiled.npy", mmap_mode="c")
+        except (OSError, ValueError) as e:
+            print("Failed to load transition table %s (%s)." % (path, e))
+            return
+        # 状態IDの形式が異なる古い遷移は読み込まない
+        if next_states.shape != (TransitionTable.STATE_NUM, TransitionTable.PATTERN_NUM, 8):
+            print("Skip transition table %s with unexpected shape %s." %
+                  (path, next_states.shape))
+            return
+        with cls.__lock:
+            cls.__next_states = next_states
+            cls.__costs = costs
+            cls.__compiled = compiled
+            cls.__tables = {}
+
+    @classmethod
+    def __allocate(cls) -> None:
+        """遷移を保持する配列を確保する."""
+        shape = (TransitionTable.STATE_NUM, TransitionTable.PATTERN_NUM)
+        cls.__next_states = np.full(shape + (8,), -1, dtype=np.int16)
+        cls.__costs = np.zeros(shape + (8,), dtype=np.float64)
+        cls.__compiled = np.zeros(shape, dtype=np.bool_)
+
+    @staticmethod
+    def encode(robot: Robot, with_block: bool) -> int:
+        """走行体の状態IDを求める.
+
+        Args:
+            robot: 走行体
+            with_block: ブロックを保持しているか
+
+        Returns:
+            int: 状態ID
+        """
+        node_id = int(with_block) * 49 + robot.coord.y * 7 + robot.coord.x
+        return (node_id * 8 + robot.direct.value) * 3 + TransitionTable.EDGES.index(robot.edge)
+
+    @staticmethod
+    def decode(state: int) -> Tuple[int, int, int, int, bool]:
+        """状態IDから走行体の状態を求める.
+
+        Args:
+            state: 状態ID
+
+        Returns:
+            Tuple[int, int, int, int, bool]: x座標, y座標, 方位の値, エッジの番号, ブロックを保持しているか
+        """
+        node_direct, edge_index = divmod(state, 3)
+        node_id, direct_value = divmod(node_direct, 8)
+        carry, node_id = divmod(node_id, 49)
+        return node_id % 7, node_id // 7, direct_value, edge_index, carry == 1
+
+    @staticmethod
+    def node_id(state: int) -> int:
+        """状態IDから走行体がいるノードの番号(y*7 + x)を求める.
+
+        Args:
+            state: 状態ID
+
+        Returns:
+            int: ノードの番号
+        """
+        return state // 24 % 49
+
+    @staticmethod
+    def to_robot(state: int) -> Robot:
+        """状態IDから走行体を生成する.
+
+        Args:
+            state: 状態ID
+
+        Returns:
+            Robot: 走行体
+        """
+        x, y, direct_value, edge_index, _ = TransitionTable.decode(state)
+        return Robot(Coordinate(x, y), Direction(direct_value), TransitionTable.EDGES[edge_index])
+
+    @property
+    def occupancy(self) -> int:
+        """Getter.
+
+        Returns:
+            int: ブロックがあるノードのビットボード
+        """
+        return self.__occupancy
+
+    def transitions(self, state: int,
+                    game_state: GameState = None) -> Tuple[np.ndarray, np.ndarray]:
+        """指定した状態から1つのゲーム動作で遷移できる状態とそのコストを取得する.
+
+        Args:
+            state: 状態ID
+            game_state: 遷移の作成に用いるゲーム状態(省略時はゲームエリア情報を用いる)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 方位ごとの遷移先の状態ID(遷移できない場合は-1), 方位ごとのコスト
+        """
+        pattern = self.__patterns[state // 24 % 49]
+        if not TransitionTable.__compiled[state, pattern]:
+            with TransitionTable.__lock:
+                # 待機中に他のスレッドが作成した場合は作成しない
+                if not TransitionTable.__compiled[state, pattern]:
+                    self.__compile(state, pattern, game_state)
+        return (TransitionTable.__next_states[state, pattern],
+                TransitionTable.__costs[state, pattern])
+
+    def compile_all(self, game_state: GameState = None) -> None:
+        """このブロックの配置における全ての状態について遷移を作成する.
+
+        Args:
+            game_state: 遷移の作成に用いるゲーム状態(省略時はゲームエリア情報を用いる)
+        """
+        with TransitionTable.__lock:
+            for state in range(TransitionTable.STATE_NUM):
+                pattern = self.__patterns[state // 24 % 49]
+                if not TransitionTable.__compiled[state, pattern]:
+                    self.__compile(state, pattern, game_state)
+
+    def __compile(self, state: int, pattern: int, game_state: GameState = None) -> None:
+        """指定した状態からの遷移を作成する(ロックを取得して呼び出す).
+
+        ゴールに依存しない行動制限(コース外、回頭禁止方向、走行禁止座標)のみを考慮する.
+        遷移のコストはブロックの配置のみから決まり、ゲーム状態は動作の生成にのみ用いる.
+
+        Args:
+            state: 状態ID
+            pattern: 走行体がいるノードの東西南北のブロックのパターン
+            game_state: 遷移の作成に用いるゲーム状態(省略時はゲームエリア情報を用いる)
+        """
+        with_block = TransitionTable.decode(state)[4]
+        current_robot = TransitionTable.to_robot(state)
+        no_rotate_mask = GameAreaInfo.get_no_rotate_mask(current_robot, self.__occupancy)
+        no_entry_mask = GameAreaInfo.get_no_entry_mask(current_robot, self.__occupancy)
+        game_motion_converter = GameMotionConverter()
+
+        for direct_value, (dx, dy) in enumerate(TransitionTable.DIRECTION_VECTORS):
+            x = current_robot.coord.x + dx
+            y = current_robot.coord.y + dy
+            # コース外、回頭禁止方向、走行禁止座標への遷移は作成しない
+            if not (0 <= x <= 6 and 0 <= y <= 6) or no_rotate_mask >> direct_value & 1 \
+                    or no_entry_mask >> (y * 7 + x) & 1:
+                continue
+            next_robot = Robot(Coordinate(x, y), Direction(direct_value), "none")
+            try:
+                game_motion = game_motion_converter.convert_game_motion(
+                    current_robot, next_robot, with_block, self.__occupancy, game_state)
+            except ValueError:
+                # 目的の方位まで回頭できない場合は遷移できない
+                continue
+            TransitionTable.__next_states[state, pattern, direct_value] = \
+                TransitionTable.encode(next_robot, with_block)
+            TransitionTable.__costs[state, pattern, direct_value] = game_motion.get_cost()
+        # 遷移を全て書き込んでから作成済みにする(ロックを取らずに参照するスレッドが書き込み途中の遷移を読まない)
+        TransitionTable.__compiled[state, pattern] = True
@@ -0,0 +1,48 @@
+"""テストで用いるゲームエリア情報を作成するモジュール.
+
+@author: miyashita64
+"""
+
+from typing import List, Sequence
+
+from game_area_info import GameAreaInfo
+from node import Node
+from coordinate import Coordinate
+from color_changer import Color
+
+# ブロックIDの順のブロック置き場の座標
+BLOCK_COORDINATES = (Coordinate(1, 1), Coordinate(3, 1), Coordinate(5, 1), Coordinate(1, 3),
+                     Coordinate(5, 3), Coordinate(1, 5), Coordinate(3, 5), Coordinate(5, 5))
+
+
+def make_node_list(block_coordinates: Sequence[Coordinate] = BLOCK_COORDINATES) -> List[Node]:
+    """ブロックを配置したノードのリストを作成する.
+
+    Args:
+        block_coordinates: ブロックIDの順のブロックの座標
+    Returns:
+        ノードの番号順のノードのリスト: List[Node]
+    """
+    node_list = [Node(-1, Coordinate(i % 7, i // 7)) for i in range(49)]
+    for block_id, coord in enumerate(block_coordinates):
+        node_list[coord.y * 7 + coord.x].block_id = block_id
+    return node_list
+
+
+def init_game_area_info(block_colors: List[Color] = None, base_colors: List[Color] = None,
+                        bonus_color: Color = None) -> None:
+    """ブロック置き場に全てのブロックを配置したLコースのゲームエリア情報を作成する.
+
+    Args:
+        block_colors: カラーブロックの色のリスト(Noneの場合は変更しない)
+        base_colors: ベースブロックの色のリスト(Noneの場合は変更しない)
+        bonus_color: ボーナスブロックの色(Noneの場合は変更しない)
+    """
+    GameAreaInfo.node_list = make_node_list()
+    GameAreaInfo.intersection_list = [Color.RED, Color.BLUE, Color.YELLOW, Color.GREEN]
+    if block_colors is not None:
+        GameAreaInfo.block_color_list = block_colors
+    if base_colors is not None:
+        GameAreaInfo.base_color_list = base_colors
+    if bonus_color is not None:
+        GameAreaInfo.bonus_color = bonus_color
@@ -0,0 +1,65 @@
+"""時間制限付きのゲーム攻略計画のテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+from contextlib import redirect_stdout
+
+from anytime_game_planner import AnytimeGamePlanner
+from game_planner import GamePlanner
+from game_state import GameState
+from robot import Robot, Direction
+from coordinate import Coordinate
+from color_changer import Color
+from tests.game_area_fixture import init_game_area_info
+
+
+class TestAnytimeGamePlanner(unittest.TestCase):
+    """AnytimeGamePlannerのテスト."""
+
+    def setUp(self):
+        """未運搬のブロックが4つのゲーム状態を作成する."""
+        init_game_area_info([Color.YELLOW, Color.BLUE, Color.RED, Color.GREEN,
+                             Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE],
+                            [Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE], Color.GREEN)
+        self.game_state = GameState.from_game_area_info().carry_bonus()
+        # ブロック4から7は運搬済みとする
+        for block_id in range(4, 8):
+            block_color = self.game_state.block_color_list[block_id]
+            target_node = self.game_state.get_candidate_node(block_color)[0]
+            self.game_state = self.game_state.move_block(block_id, target_node)
+
+    def test_anytime_game_planner_plan(self):
+        """制限時間内に貪欲法以下のコストの計画を求めるテスト."""
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            GamePlanner.plan(True, self.game_state)
+            greedy_cost = GamePlanner.get_last_stats()["cost"]
+            # Lコースで緑のボーナスブロックを運搬・復帰した後の走行体
+            robot = Robot(Coordinate(2, 4), Direction.W, "right")
+            game_motions_list, stats = AnytimeGamePlanner.plan(robot, self.game_state, 0.5)
+            redirect.close()
+
+        actual_cost = sum(game_motions.get_cost() for game_motions in game_motions_list)
+        self.assertEqual(8, len(game_motions_list))
+        self.assertAlmostEqual(stats["cost"], actual_cost)
+        self.assertLessEqual(actual_cost, greedy_cost + 1e-9)
+        # 制限時間を大きく超えない
+        self.assertLess(stats["time"], 0.5 + 0.2)
+        # 改善の推移は貪欲法の計画から始まり、コストは単調に減少する
+        trajectory_costs = [cost for _, cost in stats["trajectory"]]
+        self.assertAlmostEqual(greedy_cost, trajectory_costs[0])
+        self.assertEqual(sorted(trajectory_costs, reverse=True), trajectory_costs)
+        self.assertAlmostEqual(actual_cost, trajectory_costs[-1])
+
+    def test_anytime_game_planner_no_time(self):
+        """制限時間がない場合は貪欲法の計画を返すテスト."""
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            expected_motion_commands = GamePlanner.plan(True, self.game_state)
+            actual_motion_commands = GamePlanner.plan(True, self.game_state, strategy="anytime",
+                                                      time_limit=0)
+            redirect.close()
+
+        self.assertEqual(expected_motion_commands, actual_motion_commands)
+        self.assertEqual(0, GamePlanner.get_last_stats()["evaluations"])
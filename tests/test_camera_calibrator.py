@@ -5,11 +5,190 @@
 
 import unittest
 from unittest import mock
+import os
+import json
+import tempfile
+from contextlib import redirect_stdout
+import numpy as np
+import cv2
 
 from camera_system.camera_calibrator import CameraCalibrator
+from frame_rectifier import FrameRectifier
+from game_area_info import GameAreaInfo
+from color_changer import Color, ColorChanger
 
 
 class TestCameraCalibrator(unittest.TestCase):
     @mock.patch('camera_interface.CameraInterface.capture_frame')
     def test_constructor(self, capture_frame_mock):
         cc = CameraCalibrator(0)
+
+    @mock.patch('camera_interface.CameraInterface.stop_capture')
+    @mock.patch('camera_interface.CameraInterface.capture_frames')
+    @mock.patch('camera_interface.CameraInterface.capture_frame')
+    def test_make_game_area_info(self, capture_frame_mock, capture_frames_mock,
+                                 stop_capture_mock):
+        block_points = [(20 + 40 * i, 20) for i in range(8)]
+        base_circles = [(20 + 40 * i, 60) for i in range(4)]
+        end_point = [(180, 60)]
+        block_colors = [Color.RED, Color.RED, Color.YELLOW, Color.YELLOW,
+                        Color.GREEN, Color.GREEN, Color.BLUE, Color.BLUE]
+        base_colors = [Color.BLUE, Color.GREEN, Color.YELLOW, Color.RED]
+        bgr_colors = {Color.RED: (0, 0, 255), Color.YELLOW: (0, 255, 255),
+                      Color.GREEN: (0, 255, 0), Color.BLUE: (255, 0, 0)}
+
+        def make_frame(colors):
+            frame = np.zeros((100, 340, 3), np.uint8)
+            for (x, y), color in zip(block_points + base_circles + end_point, colors):
+                frame[y-10:y+11, x-10:x+11] = bgr_colors[color]
+            return frame
+        frame = make_frame(block_colors + base_colors + [Color.GREEN])
+        # ブロック0と1の色を誤認識した画像
+        noisy_frame = make_frame([Color.YELLOW, Color.YELLOW] + block_colors[2:] + base_colors
+                                 + [Color.GREEN])
+
+        cc = CameraCalibrator(0)
+        with mock.patch('camera_coordinate_calibrator.CameraCoordinateCalibrator.block_point',
+                        new_callable=mock.PropertyMock, return_value=block_points), \
+                mock.patch('camera_coordinate_calibrator.CameraCoordinateCalibrator.base_circle',
+                           new_callable=mock.PropertyMock, return_value=base_circles), \
+                mock.patch('camera_coordinate_calibrator.CameraCoordinateCalibrator.end_point',
+                           new_callable=mock.PropertyMock, return_value=end_point), \
+                redirect_stdout(open(os.devnull, 'w')) as redirect:
+            # 誤認識した画像があっても、複数の画像の多数決で正しい色を求める
+            capture_frames_mock.side_effect = [[noisy_frame, frame, frame], [frame], [frame]]
+            cc.make_game_area_info(True, frame_num=5)
+            self.assertEqual(block_colors, GameAreaInfo.block_color_list)
+            self.assertEqual(base_colors, GameAreaInfo.base_color_list)
+            self.assertEqual(Color.GREEN, GameAreaInfo.bonus_color)
+            # 求めた色が3回連続で変わらなくなった時点(4枚目の画像)で打ち切る
+            self.assertEqual(2, capture_frames_mock.call_count)
+
+            # 打ち切らない場合は最大数の画像を用いる
+            capture_frames_mock.reset_mock()
+            capture_frames_mock.side_effect = [[frame, frame, frame], [frame], [frame]]
+            cc.make_game_area_info(True, frame_num=5, stop_when_stable=False)
+            self.assertEqual(3, capture_frames_mock.call_count)
+            self.assertEqual(block_colors, GameAreaInfo.block_color_list)
+            self.assertEqual(2, stop_capture_mock.call_count)
+
+            # 連続取得を続ける場合は終了しない
+            capture_frames_mock.side_effect = [[frame, frame, frame]]
+            cc.make_game_area_info(True, frame_num=3, keep_capturing=True)
+            self.assertEqual(block_colors, GameAreaInfo.block_color_list)
+            self.assertEqual(2, stop_capture_mock.call_count)
+            redirect.close()
+
+    @mock.patch('camera_interface.CameraInterface.start_capture')
+    @mock.patch('camera_coordinate_calibrator.CameraCoordinateCalibrator.show_window')
+    @mock.patch('camera_interface.CameraInterface.capture_frame')
+    def test_start_camera_calibration(self, capture_frame_mock, show_window_mock,
+                                      start_capture_mock):
+        coords = [(20 + 40 * i, 20) for i in range(8)] + [(20 + 40 * i, 60) for i in range(4)] \
+            + [(180, 60)]
+        frame = np.zeros((100, 340, 3), np.uint8)
+        for x, y in coords:
+            frame[y-10:y+11, x-10:x+11] = (0, 0, 255)
+        capture_frame_mock.return_value = frame
+
+        with tempfile.TemporaryDirectory() as directory, \
+                redirect_stdout(open(os.devnull, 'w')) as redirect:
+            # カメラ番号と解像度ごとのプロファイル
+            with open(os.path.join(directory, "camera0_340x100.json"), "w") as f:
+                json.dump({"block_point": coords[:8], "base_circle": coords[8:12],
+                           "end_point": coords[12:]}, f)
+            # 各座標にブロックが写っている場合はGUIを開かない
+            CameraCalibrator(0, profile_directory_path=directory).start_camera_calibration()
+            self.assertEqual(0, show_window_mock.call_count)
+            # 再キャリブレーションする場合はGUIを開く
+            CameraCalibrator(0, profile_directory_path=directory).start_camera_calibration(True)
+            self.assertEqual(1, show_window_mock.call_count)
+            # ブロックが写っていない座標がある場合はGUIを開く
+            frame[0:30, 0:40] = 0
+            CameraCalibrator(0, profile_directory_path=directory).start_camera_calibration()
+            self.assertEqual(2, show_window_mock.call_count)
+            # 解像度が異なる場合はGUIを開く
+            capture_frame_mock.return_value = np.zeros((120, 340, 3), np.uint8)
+            CameraCalibrator(0, profile_directory_path=directory).start_camera_calibration()
+            self.assertEqual(3, show_window_mock.call_count)
+            # GUIで座標を取得しなかった場合はプロファイルを上書きしない
+            self.assertEqual(["camera0_340x100.json"], os.listdir(directory))
+            redirect.close()
+
+    @mock.patch('camera_interface.CameraInterface.start_capture')
+    @mock.patch('camera_coordinate_calibrator.CameraCoordinateCalibrator.show_window')
+    @mock.patch('camera_interface.CameraInterface.capture_frame')
+    def test_start_camera_calibration_detect(self, capture_frame_mock, show_window_mock,
+                                             start_capture_mock):
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        img = cv2.imread(read_path)
+        points = [(275, 96), (212, 118), (131, 148), (361, 112), (231, 175), (459, 130),
+                  (416, 164), (350, 209), (412, 89), (562, 199), (112, 235), (122, 98),
+                  (211, 417)]
+        # カメラの位置がずれた画像
+        moved_img = np.full_like(img, 255)
+        moved_img[15:, 25:] = img[:-15, :-25]
+        capture_frame_mock.return_value = moved_img
+
+        with tempfile.TemporaryDirectory() as directory, \
+                redirect_stdout(open(os.devnull, 'w')) as redirect:
+            path = os.path.join(directory, "camera0_640x480.json")
+            with open(path, "w") as f:
+                json.dump({"block_point": points[:8], "base_circle": points[8:12],
+                           "end_point": points[12:]}, f)
+            # 全ての座標を検出できた場合はGUIを開かず、検出した座標をプロファイルに保存する
+            CameraCalibrator(0, profile_directory_path=directory).start_camera_calibration()
+            self.assertEqual(0, show_window_mock.call_count)
+            with open(path) as f:
+                profile = json.load(f)
+            np.testing.assert_allclose([(x + 25, y + 15) for x, y in points[:8]],
+                                       profile["block_point"], atol=1)
+            redirect.close()
+
+    @mock.patch('camera_interface.CameraInterface.stop_capture')
+    @mock.patch('camera_interface.CameraInterface.capture_frames')
+    @mock.patch('camera_interface.CameraInterface.start_capture')
+    @mock.patch('camera_interface.CameraInterface.capture_frame')
+    def test_make_game_area_info_rectified(self, capture_frame_mock, start_capture_mock,
+                                           capture_frames_mock, stop_capture_mock):
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        img = cv2.imread(read_path)
+        points = [(275, 96), (212, 118), (131, 148), (361, 112), (231, 175), (459, 130),
+                  (416, 164), (350, 209), (412, 89), (562, 199), (112, 235), (122, 98),
+                  (211, 417)]
+        capture_frame_mock.return_value = img
+        capture_frames_mock.return_value = [img, img, img]
+
+        with tempfile.TemporaryDirectory() as directory, \
+                redirect_stdout(open(os.devnull, 'w')) as redirect:
+            with open(os.path.join(directory, "camera0_640x480.json"), "w") as f:
+                json.dump({"block_point": points[:8], "base_circle": points[8:12],
+                           "end_point": points[12:]}, f)
+            cc = CameraCalibrator(0, profile_directory_path=directory)
+            cc.start_camera_calibration()
+            # 正面画像での領域の色からブロックの色を求める
+            with mock.patch('color_changer.ColorChanger.count_window_colors') as count_mock:
+                cc.make_game_area_info(True, frame_num=3)
+                self.assertEqual(0, count_mock.call_count)
+            redirect.close()
+        self.assertEqual([Color.GREEN, Color.YELLOW, Color.BLUE, Color.BLUE,
+                          Color.GREEN, Color.RED, Color.RED, Color.YELLOW],
+                         GameAreaInfo.block_color_list)
+        self.assertEqual([Color.GREEN, Color.RED, Color.BLUE, Color.YELLOW],
+                         GameAreaInfo.base_color_list)
+        self.assertEqual(Color.GREEN, GameAreaInfo.bonus_color)
+
+    def test_search_area_node_ratio(self):
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        img = cv2.imread(read_path)
+        points = [(275, 96), (212, 118), (131, 148), (361, 112), (231, 175), (459, 130),
+                  (416, 164), (350, 209), (412, 89), (562, 199), (112, 235), (122, 98),
+                  (211, 417)]
+        rectifier = FrameRectifier(points, (640, 480))
+        search_area_size = FrameRectifier.node_length_to_window_size(
+            CameraCalibrator._CameraCalibrator__SEARCH_AREA_NODE_RATIO)
+        color_pixel_sums = ColorChanger.count_pixel_colors(
+            rectifier.sample_windows([img], search_area_size, search_area_size))[0]
+        # 奥のブロック置き場から手前の端点サークルまで、正面画像での領域にはブロックのみが写る
+        np.testing.assert_array_equal(search_area_size * search_area_size,
+                                      color_pixel_sums.max(axis=1))
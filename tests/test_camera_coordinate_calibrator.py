@@ -6,6 +6,9 @@
 import unittest
 import cv2
 import os
+import json
+import tempfile
+from contextlib import redirect_stdout
 from camera_system.camera_coordinate_calibrator import CameraCoordinateCalibrator
 
 
@@ -22,3 +25,60 @@ class TestCameraCoordinateCalibrator(unittest.TestCase):
         self.assertEqual(expected, actual_block_point)
         self.assertEqual(expected, actual_base_circle)
         self.assertEqual(expected, actual_end_point)
+
+    def test_profile(self):
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        img = cv2.imread(read_path)
+        block_point = [(10 * i, 20) for i in range(8)]
+        base_circle = [(10 * i, 40) for i in range(4)]
+        end_point = [(50, 60)]
+        with tempfile.TemporaryDirectory() as directory:
+            # 全ての座標を保存したプロファイルを読み込む
+            path = os.path.join(directory, "profile.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"block_point": block_point, "base_circle": base_circle,
+                           "end_point": end_point}, f)
+            ccc = CameraCoordinateCalibrator(img)
+            self.assertTrue(ccc.load_profile(path))
+            self.assertTrue(ccc.is_completed())
+            self.assertEqual(block_point, ccc.block_point)
+            self.assertEqual(base_circle, ccc.base_circle)
+            self.assertEqual(end_point, ccc.end_point)
+
+            # 保存したプロファイルを読み込むと同じ座標になる
+            saved_path = os.path.join(directory, "profiles", "saved.json")
+            ccc.save_profile(saved_path)
+            loaded_ccc = CameraCoordinateCalibrator(img)
+            self.assertTrue(loaded_ccc.load_profile(saved_path))
+            self.assertEqual(block_point, loaded_ccc.block_point)
+
+            # 座標が足りないプロファイルや存在しないプロファイルは読み込まない
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"block_point": block_point, "base_circle": base_circle,
+                           "end_point": []}, f)
+            ccc = CameraCoordinateCalibrator(img)
+            with redirect_stdout(open(os.devnull, 'w')) as redirect:
+                self.assertFalse(ccc.load_profile(path))
+                redirect.close()
+            self.assertFalse(ccc.is_completed())
+            self.assertEqual([], ccc.block_point)
+            self.assertFalse(ccc.load_profile(os.path.join(directory, "none.json")))
+
+    def test_set_points(self):
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        img = cv2.imread(read_path)
+        points = [(10 * i, 20) for i in range(13)]
+        ccc = CameraCoordinateCalibrator(img)
+        # 一部の座標が未取得の場合は、取得済みの座標のみを返す
+        ccc.set_points(points[:3] + [None] + points[4:12] + [None])
+        self.assertFalse(ccc.is_completed())
+        self.assertEqual(points[:3] + points[4:8], ccc.block_point)
+        self.assertEqual(points[8:12], ccc.base_circle)
+        self.assertEqual([], ccc.end_point)
+
+        ccc.set_points(points)
+        self.assertTrue(ccc.is_completed())
+        self.assertEqual(points[12:], ccc.end_point)
+        # 座標の数が異なる場合は例外を送出する
+        with self.assertRaises(ValueError):
+            ccc.set_points(points[:12])
@@ -0,0 +1,82 @@
+"""CameraInterfaceクラスのテストコードを記述するモジュール.
+
+@author: kawanoichi
+"""
+
+import unittest
+from unittest import mock
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+import numpy as np
+import cv2
+
+from camera_interface import CameraInterface
+
+
+class TestCameraInterface(unittest.TestCase):
+    @mock.patch('cv2.VideoCapture')
+    def test_capture_frame(self, video_capture_mock):
+        frame = np.zeros((48, 64, 3), np.uint8)
+        frame[10:20, 10:20] = (0, 0, 255)
+        video_capture_mock.return_value.read.return_value = (True, frame)
+        camera_interface = CameraInterface(0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            save_path = os.path.join(directory, "course.png")
+            with redirect_stdout(open(os.devnull, 'w')) as redirect:
+                # 取得した画像をそのまま返す
+                self.assertIs(frame, camera_interface.capture_frame(save_path))
+                # 保存待ちの画像を保存するまで待機すると、画像が保存されている
+                camera_interface.wait_for_saving()
+                redirect.close()
+            self.assertTrue(np.array_equal(frame, cv2.imread(save_path)))
+
+            # 保存先を指定しない場合は保存しない
+            self.assertIs(frame, camera_interface.capture_frame())
+            camera_interface.wait_for_saving()
+            self.assertEqual(["course.png"], os.listdir(directory))
+
+            # 画像を取得できなかった場合は、保存済みの画像を返す
+            video_capture_mock.return_value.read.return_value = (False, None)
+            with redirect_stdout(open(os.devnull, 'w')) as redirect:
+                self.assertTrue(np.array_equal(frame, camera_interface.capture_frame(save_path)))
+                self.assertIsNone(camera_interface.capture_frame())
+                redirect.close()
+
+    @mock.patch('cv2.VideoCapture')
+    def test_start_capture(self, video_capture_mock):
+        frames = []
+
+        def read():
+            # 約1msごとに新しい画像を取得する
+            time.sleep(0.001)
+            frames.append(np.full((4, 4, 3), len(frames) % 256, np.uint8))
+            return True, frames[-1]
+        video_capture_mock.return_value.read.side_effect = read
+        camera_interface = CameraInterface(0)
+
+        camera_interface.start_capture(buffer_size=4)
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            frame = camera_interface.capture_frame()
+            burst_frames = camera_interface.capture_frames(3)
+            redirect.close()
+        camera_interface.stop_capture()
+
+        # 連続取得した画像を返す
+        self.assertTrue(any(frame is captured_frame for captured_frame in frames))
+        # 複数の画像を取得する場合は、異なる画像を取得順に返す
+        self.assertEqual(3, len(burst_frames))
+        burst_indexes = [[i for i, captured_frame in enumerate(frames)
+                          if captured_frame is burst_frame][0] for burst_frame in burst_frames]
+        self.assertEqual(sorted(set(burst_indexes)), burst_indexes)
+        # 停止後はリングバッファ内の最新の画像の状況を返す
+        stats = camera_interface.get_capture_stats()
+        self.assertGreater(stats["fps"], 0)
+        self.assertGreaterEqual(stats["age"], 0)
+        # 停止後はカメラから直接取得する
+        frame_num = len(frames)
+        frame = camera_interface.capture_frame()
+        self.assertEqual(frame_num + 1, len(frames))
+        self.assertIs(frames[-1], frame)
@@ -35,3 +35,64 @@ class TestColorChanger(unittest.TestCase):
 
         self.assertEqual(all(expected_color_uniqs), all(actual_color_uniqs))
         self.assertEqual(all(expected_color_pixel_sum), all(actual_color_pixel_sum))
+
+    def test_classify(self):
+        # classify関数のテスト(HSV閾値の境界の色ID)
+        hsv_img = np.array([[[15, 90, 0], [16, 90, 0], [16, 130, 0], [179, 255, 255]],
+                            [[150, 100, 0], [151, 100, 0], [100, 70, 127], [100, 70, 128]]],
+                           np.uint8)
+        expected_color_id_img = np.array([[1, 0, 2, 1], [4, 1, 3, 5]])
+        actual_color_id_img = ColorChanger.classify(hsv_img)
+        self.assertEqual(np.uint8, actual_color_id_img.dtype)
+        self.assertTrue(np.array_equal(expected_color_id_img, actual_color_id_img))
+
+    def test_count_window_colors(self):
+        # count_window_colors関数のテスト(画像全体を変換した場合と同じピクセル数になるか)
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        save_path = os.path.dirname(os.path.realpath(__file__)) + "/test_color_image.png"
+        img = cv2.imread(read_path)
+        coords = [(520, 145), (422, 387), (100, 100), (5, 5)]
+        search_area_size = 21
+
+        cc = ColorChanger()
+        cc.change_color(img, save_path)
+        actual_color_pixel_sums = ColorChanger.count_window_colors(
+            [img, img], coords, search_area_size, search_area_size)
+        self.assertEqual((2, len(coords), 4), actual_color_pixel_sums.shape)
+        for i, (coord_x, coord_y) in enumerate(coords):
+            color_uniqs, color_pixel_sum = cc.search_color(
+                coord_x, coord_y, search_area_size, search_area_size)
+            expected_color_pixel_sum = np.zeros(4, np.int64)
+            expected_color_pixel_sum[color_uniqs-1] = color_pixel_sum
+            for frame_color_pixel_sums in actual_color_pixel_sums:
+                self.assertTrue(np.array_equal(expected_color_pixel_sum,
+                                               frame_color_pixel_sums[i]))
+
+    def test_count_colors(self):
+        # count_colors関数のテスト(複数の矩形領域のピクセル数をまとめて求められるか)
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        save_path = os.path.dirname(os.path.realpath(__file__)) + "/test_color_image.png"
+        img = cv2.imread(read_path)
+        cc = ColorChanger()
+        cc.change_color(img, save_path)
+
+        lefts, tops = np.array([[500, 0], [300, 630]]), np.array([[120, 0], [200, 470]])
+        rights = lefts + np.array([[41, 5], [101, 30]])
+        bottoms = tops + np.array([[51, 5], [3, 30]])
+        actual_color_pixel_sums = cc.count_colors(lefts, tops, rights, bottoms)
+        self.assertEqual((2, 2, 4), actual_color_pixel_sums.shape)
+        for index in np.ndindex(lefts.shape):
+            # 画像の範囲に切り詰めた矩形領域の各色のピクセル数
+            search_area = cc.color_id_img[tops[index]:bottoms[index], lefts[index]:rights[index]]
+            expected_color_pixel_sum = [np.count_nonzero(search_area == color_id)
+                                        for color_id in range(1, 5)]
+            self.assertEqual(expected_color_pixel_sum, actual_color_pixel_sums[index].tolist())
+
+    def test_count_pixel_colors(self):
+        # 同じ画素数の領域をまとめて数えると、count_window_colorsと同じピクセル数になる
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        img = cv2.imread(read_path)
+        coords = [(212, 118), (131, 148), (459, 130), (600, 400)]
+        windows = np.stack([img[y-10:y+11, x-10:x+11].reshape(-1, 3) for x, y in coords])
+        expected = ColorChanger.count_window_colors([img], coords, 21, 21)[0]
+        np.testing.assert_array_equal(expected, ColorChanger.count_pixel_colors(windows))
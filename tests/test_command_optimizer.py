@@ -0,0 +1,51 @@
+"""動作コマンドの最適化モジュールのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+
+from camera_system.command_optimizer import CommandOptimizer
+
+
+class TestCommandOptimizer(unittest.TestCase):
+    """CommandOptimizerのテスト."""
+
+    def test_merge_sleeps(self):
+        commands, stats = CommandOptimizer.optimize("SL,100,交点→中点\nSL,200\nDS,10,70\n")
+        self.assertEqual(commands, "SL,200,交点→中点\nDS,10,70\n")
+        self.assertEqual(stats["merged_sleeps"], 1)
+        self.assertEqual(stats["removed_commands"], 1)
+        self.assertAlmostEqual(stats["saved_time"], 0.1)
+
+    def test_merge_drives(self):
+        # 同じPWM値の直進のみまとめ、コメントは連結する
+        commands, stats = CommandOptimizer.optimize(
+            "DS,132,70,中点→中点\nDS,20,70,20mm直進(縦調整)\nDS,10,50\nSL,100\n")
+        self.assertEqual(commands,
+                         "DS,152,70,中点→中点・20mm直進(縦調整)\nDS,10,50\nSL,100\n")
+        self.assertEqual(stats["merged_drives"], 1)
+        self.assertEqual(stats["removed_commands"], 1)
+        self.assertEqual(stats["saved_time"], 0)
+
+    def test_remove_correction(self):
+        # 既定では角度補正を取り除かない
+        motion_commands = "XR,0,47,中点→交点\nSL,100\nRT,28,70,clockwise\nSL,100\nXR,45,47\nDS,10,70\n"
+        commands, stats = CommandOptimizer.optimize(motion_commands)
+        self.assertEqual(commands, motion_commands)
+        self.assertEqual(stats["removed_corrections"], 0)
+        # 回頭とスリープのみを挟んで次の角度補正が続く場合は、前の角度補正を取り除く
+        commands, stats = CommandOptimizer.optimize(motion_commands, remove_corrections=True)
+        self.assertEqual(commands, "SL,100,中点→交点\nRT,28,70,clockwise\nSL,100\n"
+                                   "XR,45,47\nDS,10,70\n")
+        self.assertEqual(stats["removed_corrections"], 1)
+        # 角度補正の後に回頭のみが続く場合や、直進を挟む場合は取り除かない
+        motion_commands = "XR,0,47\nRT,90,70,clockwise\nDS,10,70\nXR,90,47\n"
+        commands, stats = CommandOptimizer.optimize(motion_commands, remove_corrections=True)
+        self.assertEqual(commands, motion_commands)
+        self.assertEqual(stats["removed_commands"], 0)
+
+    def test_keep_unknown_commands(self):
+        # 未知のコマンドは変更せず、前後のコマンドをまとめない
+        commands, _ = CommandOptimizer.optimize("SL,100\nXX,1,2,3\nSL,100\n")
+        self.assertEqual(commands, "SL,100\nXX,1,2,3\nSL,100\n")
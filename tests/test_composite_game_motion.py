@@ -80,3 +80,44 @@ class TestCompositeGameMotion(unittest.TestCase):
 
         self.assertEqual(expected_cost, actual_cost)  # get_cost()のテスト
         self.assertEqual(expected_commands, actual_commands)  # generate_command()のテスト
+
+    def test_generate_command_with_edge(self):
+        game_motion_list = CompositeGameMotion()
+        game_motion_list.append_game_motion(MiddleToMiddle(180, False, False, False))
+        game_motion_list.append_game_motion(MiddleToMiddle(90, False, False, False))
+        m2m = MiddleToMiddle(180, False, False, False)
+        m2m.current_edge = "left"  # 現在のエッジを左にする
+
+        # エッジを受け渡して生成したコマンドは、現在のエッジに依存せず、現在のエッジも更新しない
+        commands, next_edge = game_motion_list.generate_command_with_edge("right")
+        self.assertEqual("left", m2m.current_edge)
+        self.assertEqual("right", next_edge)
+        self.assertEqual(["EC,left", "EC,right"],
+                         [line for line in commands.split("\n") if line.startswith("EC")])
+        self.assertEqual((commands, next_edge),
+                         game_motion_list.generate_command_with_edge("right"))
+        # 同じパラメータとエッジのゲーム動作のコマンドは再利用する
+        self.assertIs(m2m.generate_command_with_edge("right")[0],
+                      MiddleToMiddle(180, False, False, False).generate_command_with_edge(
+                          "right")[0])
+        # 現在のエッジから生成した場合と同じコマンドになる
+        m2m.current_edge = "right"
+        self.assertEqual(game_motion_list.game_motion_list[0].generate_command()
+                         + game_motion_list.game_motion_list[1].generate_command(), commands)
+
+    def test_generate_motion_plan_with_edge(self):
+        game_motion_list = CompositeGameMotion()
+        game_motion_list.append_game_motion(MiddleToMiddle(180, False, False, False))
+        game_motion_list.append_game_motion(MiddleToIntersection(-90, Color.BLUE, False, False))
+
+        # 中間表現はコマンドと同じ動作を表し、各コマンドに生成元のゲーム動作の番号を持つ
+        commands, next_edge = game_motion_list.generate_command_with_edge("right")
+        motion_plan, plan_next_edge = game_motion_list.generate_motion_plan_with_edge("right")
+        self.assertEqual(commands, motion_plan.to_csv())
+        self.assertEqual(next_edge, plan_next_edge)
+        self.assertEqual(2, motion_plan.motion_num)
+        first_command_num = len(MiddleToMiddle(180, False, False, False)
+                                .generate_motion_plan_with_edge("right")[0])
+        self.assertEqual([0] * first_command_num
+                         + [1] * (len(motion_plan) - first_command_num),
+                         motion_plan.records["motion"].tolist())
@@ -0,0 +1,76 @@
+"""厳密なゲーム攻略計画のテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+from contextlib import redirect_stdout
+
+from exact_game_planner import ExactGamePlanner
+from game_planner import GamePlanner
+from game_state import GameState
+from block_selector import BlockSelector
+from game_motion_decider import GameMotionDecider
+from robot import Robot, Direction
+from coordinate import Coordinate
+from color_changer import Color
+from tests.game_area_fixture import init_game_area_info
+
+
+class TestExactGamePlanner(unittest.TestCase):
+    """ExactGamePlannerのテスト."""
+
+    def setUp(self):
+        """未運搬のブロックが2つのゲーム状態を作成する."""
+        init_game_area_info([Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE,
+                             Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE],
+                            [Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE], Color.RED)
+        self.game_state = GameState.from_game_area_info().carry_bonus()
+        # ブロック2から7は運搬済みとする
+        for block_id in range(2, 8):
+            block_color = self.game_state.block_color_list[block_id]
+            target_node = self.game_state.get_candidate_node(block_color)[0]
+            self.game_state = self.game_state.move_block(block_id, target_node)
+
+    def test_exact_game_planner_plan(self):
+        """厳密な計画の合計コストが貪欲法以下になるテスト."""
+        robot = Robot(Coordinate(4, 4), Direction.E, "left")
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            game_motions_list, stats = ExactGamePlanner.plan(robot, self.game_state)
+            # 貪欲法で計画する
+            greedy_robot = Robot(Coordinate(4, 4), Direction.E, "left")
+            greedy_game_state = self.game_state
+            greedy_cost = 0
+            block_selector = BlockSelector()
+            while greedy_game_state.get_no_transported_block() != []:
+                on_block_node = block_selector.select_block(greedy_robot, greedy_game_state)
+                game_motions, greedy_game_state = GameMotionDecider.decide_with_state(
+                    greedy_robot, on_block_node.block_id, greedy_game_state)
+                greedy_cost += sum(game_motion.get_cost() for game_motion in game_motions)
+            redirect.close()
+
+        # 2つのブロックの取得動作と設置動作
+        self.assertEqual(4, len(game_motions_list))
+        actual_cost = sum(game_motions.get_cost() for game_motions in game_motions_list)
+        self.assertAlmostEqual(stats["cost"], actual_cost)
+        self.assertLessEqual(actual_cost, greedy_cost + 1e-9)
+        self.assertGreater(stats["explored"], 0)
+        self.assertGreaterEqual(stats["generated"], stats["explored"])
+        self.assertGreaterEqual(stats["time"], 0)
+        # 遷移できない運搬の数は最適動作の探索回数に含まれる
+        self.assertLessEqual(stats["infeasible"], stats["searches"])
+        # 走行体は最後の設置動作後の状態に更新される
+        self.assertNotEqual((4, 4), (robot.coord.x, robot.coord.y))
+
+    def test_game_planner_strategy(self):
+        """GamePlannerの戦略を切り替えるテスト."""
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            motion_commands = GamePlanner.plan(True, self.game_state, strategy="exact")
+            redirect.close()
+
+        self.assertNotEqual("", motion_commands)
+        self.assertIn("explored", GamePlanner.get_last_stats())
+        # 未定義の戦略は例外を送出する
+        with self.assertRaises(ValueError):
+            GamePlanner.plan(True, self.game_state, strategy="unknown")
@@ -0,0 +1,55 @@
+"""FrameRectifierクラスのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+import cv2
+import numpy as np
+
+from frame_rectifier import FrameRectifier
+
+
+class TestFrameRectifier(unittest.TestCase):
+    """FrameRectifierのテスト."""
+
+    def setUp(self):
+        """テスト画像と、テスト画像のブロックの中心座標を用意する."""
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        self.img = cv2.imread(read_path)
+        # ブロック置き場8個、ベースサークル4個、端点サークル1個の順
+        self.points = [(275, 96), (212, 118), (131, 148), (361, 112), (231, 175), (459, 130),
+                       (416, 164), (350, 209), (412, 89), (562, 199), (112, 235), (122, 98),
+                       (211, 417)]
+
+    def test_rectify(self):
+        rectifier = FrameRectifier(self.points, (640, 480))
+        rectified_img = rectifier.rectify(self.img)
+        self.assertEqual(rectifier.size, (rectified_img.shape[1], rectified_img.shape[0]))
+        # 正面画像ではブロック置き場がノードの格子上に並ぶ
+        expected = [rectifier.node_to_pixel(x, y) for x, y in FrameRectifier.BLOCK_SPOT_COORDINATES]
+        np.testing.assert_allclose(expected, rectifier.points[:8], atol=2)
+        # 正面画像の各座標には、カメラ画像の同じ座標の色が写る
+        for (x, y), (rectified_x, rectified_y) in zip(self.points, rectifier.points):
+            np.testing.assert_allclose(self.img[y, x], rectified_img[rectified_y, rectified_x],
+                                       atol=40)
+
+    def test_sample_windows(self):
+        rectifier = FrameRectifier(self.points, (640, 480))
+        windows = rectifier.sample_windows([self.img, self.img], 5, 3)
+        self.assertEqual((2, 13, 15, 3), windows.shape)
+        # 領域の中心の画素は、カメラ画像の座標の付近の画素
+        for i, (x, y) in enumerate(self.points):
+            np.testing.assert_allclose(self.img[y, x], windows[0, i, 7], atol=40)
+
+    def test_node_length_to_window_size(self):
+        # ノードの座標系での長さに収まる奇数の画素数にする(ノードの間隔は48px)
+        self.assertEqual(9, FrameRectifier.node_length_to_window_size(0.2))
+        self.assertEqual(49, FrameRectifier.node_length_to_window_size(1))
+        self.assertEqual(1, FrameRectifier.node_length_to_window_size(0))
+
+    def test_invalid_points(self):
+        # ブロック置き場が一直線上に並ぶ場合は変換を求められない
+        with self.assertRaises(ValueError):
+            FrameRectifier([(20 + 40 * i, 20) for i in range(13)], (640, 480))
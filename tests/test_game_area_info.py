@@ -58,3 +58,32 @@ class TestGameAreaInfo(unittest.TestCase):
         expected = [0, 4, 5, 6, 7]
         actual = [direction.value for direction in GameAreaInfo.get_no_rotate_direction(robo)]
         self.assertCountEqual(expected, actual)
+
+    def test_get_occupancy(self):
+        """ブロックがあるノードのビットボードを取得するテスト."""
+        expected = sum(1 << (coord.y*7 + coord.x) for coord in [
+            Coordinate(1, 1), Coordinate(3, 1), Coordinate(5, 1), Coordinate(1, 3),
+            Coordinate(5, 3), Coordinate(1, 5), Coordinate(3, 5), Coordinate(5, 5)])
+        actual = GameAreaInfo.get_occupancy()
+        self.assertEqual(expected, actual)
+
+    def test_get_no_entry_mask(self):
+        """走行禁止座標のビットマスクを取得するテスト."""
+        robo = Robot(Coordinate(1, 2), Direction.NE, "left")
+        expected = sum(1 << (coord.y*7 + coord.x)
+                       for coord in GameAreaInfo.get_no_entry_coordinate(robo))
+        actual = GameAreaInfo.get_no_entry_mask(robo)
+        self.assertEqual(expected, actual)
+
+    def test_get_no_rotate_mask(self):
+        """回頭禁止方向のビットマスクを取得するテスト."""
+        robo = Robot(Coordinate(1, 4), Direction.E, "left")
+        expected = 0b11110001  # 北(0), 南(4), 南西(5), 西(6), 北西(7)
+        actual = GameAreaInfo.get_no_rotate_mask(robo)
+        self.assertEqual(expected, actual)
+
+        # ブロックの配置を指定した場合は、指定した配置から求める
+        occupancy = 1 << (4*7 + 2)  # 東(2, 4)のみにブロックがある
+        expected = 1 << Direction.W.value
+        actual = GameAreaInfo.get_no_rotate_mask(robo, occupancy)
+        self.assertEqual(expected, actual)
@@ -0,0 +1,55 @@
+"""ゲーム動作の親クラスのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import copy
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from camera_system.middle_to_middle import MiddleToMiddle
+from camera_system.intersection_to_block import IntersectionToBlock
+
+
+class TestGameMotion(unittest.TestCase):
+    """GameMotionのテスト."""
+
+    def test_intern(self):
+        # 同じパラメータのゲーム動作は同じインスタンスになる
+        m2m = MiddleToMiddle(90, True, False, False)
+        self.assertIs(m2m, MiddleToMiddle(90, True, False, False))
+        self.assertIs(m2m, MiddleToMiddle(90, need_adjustment=True, with_block=False,
+                                          can_correction=False))
+        self.assertEqual(m2m, MiddleToMiddle(90, True, False, False))
+        self.assertEqual(hash(m2m), hash(MiddleToMiddle(90, True, False, False)))
+        # パラメータやクラスが異なる場合は異なるインスタンスになる
+        self.assertIsNot(m2m, MiddleToMiddle(-90, True, False, False))
+        self.assertNotEqual(m2m, MiddleToMiddle(-90, True, False, False))
+        self.assertNotEqual(m2m, IntersectionToBlock(90, True, False, False, False, False))
+        # 複製や直列化をしても同じインスタンスになる
+        self.assertIs(m2m, copy.deepcopy(m2m))
+        self.assertIs(m2m, pickle.loads(pickle.dumps(m2m)))
+
+    def test_concurrent_intern(self):
+        # 複数のスレッドから同時に生成しても、同じパラメータのゲーム動作は同じインスタンスになる
+        params_list = [(angle, need_adjustment, with_block, False)
+                       for angle in range(-180, 181, 45)
+                       for need_adjustment in (True, False)
+                       for with_block in (True, False)] * 8
+        with ThreadPoolExecutor(8) as executor:
+            game_motions = list(executor.map(lambda params: MiddleToMiddle(*params), params_list))
+        for params, game_motion in zip(params_list, game_motions):
+            self.assertIs(MiddleToMiddle(*params), game_motion)
+
+    def test_immutable(self):
+        m2m = MiddleToMiddle(45, False, True, True)
+        # インスタンス変数は__slots__で宣言し、生成後は変更できない
+        self.assertFalse(hasattr(m2m, "__dict__"))
+        with self.assertRaises(AttributeError):
+            m2m._MiddleToMiddle__angle = 90
+        # コストは生成時に求めた値を返す
+        self.assertEqual(m2m.calculate_cost(), m2m.get_cost())
+        # 現在のエッジ(プロパティ)は変更できる
+        m2m.current_edge = "right"
+        self.assertEqual("right", m2m.current_edge)
@@ -13,6 +13,7 @@ from robot import Robot, Direction
 from node import Node
 from coordinate import Coordinate
 from color_changer import Color
+from game_motion import Edge
 
 
 class TestGamePlanner(unittest.TestCase):
@@ -70,6 +71,13 @@ class TestGamePlanner(unittest.TestCase):
         # 探索失敗のメッセージを無視するため標準出力を非表示にする
         with redirect_stdout(open(os.devnull, 'w')) as redirect:
             actual_motion_commands = GamePlanner.plan(is_left_course=True)
+            # 直前に生成したコマンドのエッジに依存せず、同じ計画からは同じコマンドを生成する
+            Edge.set_current_edge("none")
+            repeated_motion_commands = GamePlanner.plan(is_left_course=True)
+            # 中間表現からも同じコマンドを生成する
+            motion_plan = GamePlanner.plan_motion_plan(is_left_course=True)
             redirect.close()
 
         self.assertNotEqual(unexpected_motion_commands, actual_motion_commands)
+        self.assertEqual(actual_motion_commands, repeated_motion_commands)
+        self.assertEqual(actual_motion_commands, motion_plan.to_csv())
@@ -0,0 +1,82 @@
+"""ゲーム状態のテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+from contextlib import redirect_stdout
+
+from game_state import GameState
+from game_area_info import GameAreaInfo
+from game_planner import GamePlanner
+from node import Node
+from coordinate import Coordinate
+from color_changer import Color
+from tests.game_area_fixture import init_game_area_info
+
+
+class TestGameState(unittest.TestCase):
+    """GameStateのテスト."""
+
+    def setUp(self):
+        """ゲームエリア情報を初期化する."""
+        init_game_area_info([Color.RED, Color.RED, Color.YELLOW, Color.YELLOW,
+                             Color.GREEN, Color.GREEN, Color.BLUE, Color.BLUE],
+                            [Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE], Color.RED)
+
+    def test_from_game_area_info(self):
+        """ゲームエリア情報からゲーム状態を生成するテスト."""
+        game_state = GameState.from_game_area_info()
+
+        self.assertEqual(1, game_state.get_block_id(Coordinate(3, 1)))
+        self.assertEqual(-1, game_state.get_block_id(Coordinate(3, 3)))
+        self.assertEqual(GameAreaInfo.get_occupancy(), game_state.occupancy)
+        self.assertEqual(Color.RED, game_state.bonus_color)
+        self.assertEqual([node.block_id for node in GameAreaInfo.get_no_transported_block()],
+                         [node.block_id for node in game_state.get_no_transported_block()])
+        self.assertEqual([node.coord for node in GameAreaInfo.get_candidate_node(Color.GREEN)],
+                         [node.coord for node in game_state.get_candidate_node(Color.GREEN)])
+        # 同じ状態は等価でハッシュ値も等しい
+        self.assertEqual(game_state, GameState.from_game_area_info())
+        self.assertEqual(hash(game_state), hash(GameState.from_game_area_info()))
+
+    def test_move_block(self):
+        """ブロックの移動が新しいゲーム状態を返すテスト."""
+        game_state = GameState.from_game_area_info()
+        target_node = game_state.get_candidate_node(Color.RED)[0]
+
+        moved_game_state = game_state.move_block(0, target_node)
+
+        # 元のゲーム状態とゲームエリア情報は変更されない
+        self.assertEqual(0, game_state.get_block_id(Coordinate(1, 1)))
+        self.assertEqual(-1, game_state.get_block_id(target_node.coord))
+        self.assertEqual(0, GameAreaInfo.node_list[1 * 7 + 1].block_id)
+        # 移動後のゲーム状態
+        self.assertEqual(-1, moved_game_state.get_block_id(Coordinate(1, 1)))
+        self.assertEqual(0, moved_game_state.get_block_id(target_node.coord))
+        self.assertNotEqual(game_state, moved_game_state)
+        self.assertIs(game_state.block_color_list, moved_game_state.block_color_list)
+
+        # ブロックがあるノードには移動できない
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            self.assertIs(moved_game_state,
+                          moved_game_state.move_block(1, Node(-1, target_node.coord)))
+            redirect.close()
+
+        # 移動後のゲーム状態をゲームエリア情報に反映する
+        moved_game_state.apply_to_game_area_info()
+        self.assertEqual(moved_game_state, GameState.from_game_area_info())
+
+    def test_plan_with_game_state(self):
+        """ゲーム状態を指定した計画がゲームエリア情報に依存しないテスト."""
+        game_state = GameState.from_game_area_info()
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            expected_motion_commands = GamePlanner.plan(True)
+            # ゲームエリア情報を変更しても、ゲーム状態を指定した計画は変わらない
+            GameAreaInfo.node_list = [Node(-1, Coordinate(i % 7, i // 7)) for i in range(49)]
+            GameAreaInfo.intersection_list = []
+            actual_motion_commands = GamePlanner.plan(True, game_state)
+            redirect.close()
+
+        self.assertEqual(expected_motion_commands, actual_motion_commands)
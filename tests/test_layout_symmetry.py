@@ -0,0 +1,91 @@
+"""配置の対称性のテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+
+from layout_symmetry import LayoutSymmetry
+from game_state import GameState
+from robot import Robot, Direction
+from coordinate import Coordinate
+from color_changer import Color
+from tests.game_area_fixture import BLOCK_COORDINATES, make_node_list
+
+
+class TestLayoutSymmetry(unittest.TestCase):
+    """LayoutSymmetryのテスト."""
+
+    def setUp(self):
+        """ブロックを配置したゲーム状態を作成する."""
+        # ブロック7のみブロック置き場の外の(2, 6)に置く
+        block_ids = [node.block_id
+                     for node in make_node_list(BLOCK_COORDINATES[:7] + (Coordinate(2, 6),))]
+        block_colors = [Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE,
+                        Color.BLUE, Color.GREEN, Color.YELLOW, Color.RED]
+        base_colors = [Color.BLUE, Color.RED, Color.YELLOW, Color.GREEN]
+        intersection_colors = [Color.RED, Color.BLUE, Color.YELLOW, Color.GREEN]
+        self.game_state = GameState(block_ids, block_colors, base_colors, Color.GREEN,
+                                    intersection_colors)
+        self.robot = Robot(Coordinate(2, 4), Direction.NE, "left")
+
+    def test_transform_robot(self):
+        """走行体を変換するテスト."""
+        # 鏡映すると方位とエッジの左右が反転する
+        robot = LayoutSymmetry.transform_robot(self.robot, LayoutSymmetry.MIRROR)
+        self.assertEqual((4, 4), (robot.coord.x, robot.coord.y))
+        self.assertEqual(Direction.NW, robot.direct)
+        self.assertEqual("right", robot.edge)
+        # 時計回りに90度回転すると方位も90度回転する
+        robot = LayoutSymmetry.transform_robot(self.robot, (1, False))
+        self.assertEqual((2, 2), (robot.coord.x, robot.coord.y))
+        self.assertEqual(Direction.SE, robot.direct)
+        self.assertEqual("left", robot.edge)
+
+    def test_transform_game_state(self):
+        """ゲーム状態を変換し、ブロックの色とIDを付け替えるテスト."""
+        game_state = LayoutSymmetry.transform_game_state(self.game_state, LayoutSymmetry.MIRROR)
+        # ベースブロックの色は(赤, 黄, 緑, 青)に付け替える(東西が入れ替わる)
+        self.assertEqual((Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE),
+                         game_state.base_color_list)
+        # 交点の色は左右が入れ替わる
+        self.assertEqual((Color.BLUE, Color.RED, Color.GREEN, Color.YELLOW),
+                         game_state.intersection_list)
+        # (2, 6)のブロックは(4, 6)に移り、ノードの番号順で最後のIDになる
+        self.assertEqual(7, game_state.get_block_id(Coordinate(4, 6)))
+        self.assertEqual(0, game_state.get_block_id(Coordinate(1, 1)))
+        # 同じベースエリアに運搬するブロックは、付け替え後の同じ色になる
+        for node in game_state.node_list:
+            if node.block_id != -1:
+                base_index = self.game_state.base_color_list.index(
+                    self.game_state.block_color_list[self.game_state.get_block_id(
+                        LayoutSymmetry.transform_coordinate(node.coord,
+                                                            LayoutSymmetry.MIRROR))])
+                expected_index = (2 - base_index) % 4 if base_index % 2 == 0 else base_index
+                self.assertEqual(game_state.base_color_list[expected_index],
+                                 game_state.block_color_list[node.block_id])
+
+    def test_canonicalize(self):
+        """変換で移り合う全ての配置が同じ正準形になるテスト."""
+        expected_robot, expected_game_state, transform = LayoutSymmetry.canonicalize(
+            self.robot, self.game_state)
+        self.assertIn(transform, LayoutSymmetry.TRANSFORMS)
+        for transform in LayoutSymmetry.TRANSFORMS:
+            robot = LayoutSymmetry.transform_robot(self.robot, transform)
+            game_state = LayoutSymmetry.transform_game_state(self.game_state, transform)
+            actual_robot, actual_game_state, _ = LayoutSymmetry.canonicalize(robot, game_state)
+            self.assertEqual(expected_game_state, actual_game_state)
+            self.assertEqual((expected_robot.coord.x, expected_robot.coord.y,
+                              expected_robot.direct, expected_robot.edge),
+                             (actual_robot.coord.x, actual_robot.coord.y,
+                              actual_robot.direct, actual_robot.edge))
+
+    def test_restore_commands(self):
+        """正準形で計画した動作コマンドを元の配置の動作コマンドに戻すテスト."""
+        motion_commands = "RT,90,70,clockwise\nEC,left\nCS,RED,70\n"
+        # 回転のみの場合は変わらない
+        self.assertEqual(motion_commands,
+                         LayoutSymmetry.restore_commands(motion_commands, (3, False)))
+        # 鏡映を含む場合は回頭の向きとエッジの左右が入れ替わる
+        self.assertEqual("RT,90,70,anticlockwise\nEC,right\nCS,RED,70\n",
+                         LayoutSymmetry.restore_commands(motion_commands, (2, True)))
@@ -0,0 +1,65 @@
+"""動作計画の中間表現モジュールのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+
+from camera_system.motion_plan import MotionPlan
+
+
+class TestMotionPlan(unittest.TestCase):
+    """MotionPlanのテスト."""
+
+    def test_from_csv(self):
+        motion_commands = "SL,100,中点→交点\nRT,76,70,anticlockwise\nEC,left\n" \
+                          "CL,GREEN,0,60,0.1,0.08,0.08\nDS,12,70,20mm直進(縦調整)\n"
+        motion_plan = MotionPlan.from_csv(motion_commands)
+        self.assertEqual(5, len(motion_plan))
+        self.assertEqual(1, motion_plan.motion_num)
+        self.assertEqual(("中点→交点", "20mm直進(縦調整)"), motion_plan.comments)
+        # 命令番号、引数(小数は1000倍、記号は番号)、コメントの番号を保持する
+        records = motion_plan.records
+        self.assertEqual(["SL", "RT", "EC", "CL", "DS"],
+                         [MotionPlan.OPCODES[opcode] for opcode in records["opcode"]])
+        self.assertEqual([76, 70, 1, 0, 0, 0], records["args"][1].tolist())
+        self.assertEqual([3, 0, 60, 100, 80, 80], records["args"][3].tolist())
+        self.assertEqual([0, -1, -1, -1, 1], records["comment"].tolist())
+        self.assertFalse(records.flags.writeable)
+        # CSV形式に戻すと元の文字列と一致する
+        self.assertEqual(motion_commands, motion_plan.to_csv())
+
+    def test_from_csv_error(self):
+        # 中間表現で表せないコマンドはエラーになる
+        for motion_commands in ["XX,1\n", "DS,10\n", "EC,up\n", "DL,80,0,60,0.1,0.08,0.0001\n"]:
+            with self.assertRaises(ValueError):
+                MotionPlan.from_csv(motion_commands)
+
+    def test_concatenate(self):
+        first_plan = MotionPlan.from_csv("SL,100,交点→中点\nDS,20,70\n")
+        second_plan = MotionPlan.from_csv("SL,100,中点→交点\nSL,100,交点→中点\n")
+        motion_plan = MotionPlan.concatenate([first_plan, second_plan, first_plan])
+        self.assertEqual(first_plan.to_csv() + second_plan.to_csv() + first_plan.to_csv(),
+                         motion_plan.to_csv())
+        # コメントはまとめて番号を付け替え、ゲーム動作の番号は計画全体の番号にする
+        self.assertEqual(("交点→中点", "中点→交点"), motion_plan.comments)
+        self.assertEqual([0, -1, 1, 0, 0, -1], motion_plan.records["comment"].tolist())
+        self.assertEqual([0, 0, 1, 1, 2, 2], motion_plan.records["motion"].tolist())
+        self.assertEqual(3, motion_plan.motion_num)
+        self.assertEqual(0, len(MotionPlan.concatenate([])))
+
+    def test_bytes(self):
+        first_plan = MotionPlan.from_csv("SL,100,交点→中点\nRT,172,70,clockwise\n"
+                                         "DL,80,0,60,0.1,0.08,0.08\n")
+        second_plan = MotionPlan.from_csv("DS,100000,70\nCS,BLACK,70,\n")
+        for motion_plan in [first_plan, MotionPlan.concatenate([first_plan, second_plan]),
+                            MotionPlan.concatenate([])]:
+            data = motion_plan.to_bytes()
+            restored_plan = MotionPlan.from_bytes(data)
+            self.assertEqual(motion_plan, restored_plan)
+            self.assertEqual(motion_plan.comments, restored_plan.comments)
+        # バイナリ形式でない場合はエラーになる
+        with self.assertRaises(ValueError):
+            MotionPlan.from_bytes(b"SL,100\n")
+        with self.assertRaises(ValueError):
+            MotionPlan.from_bytes(first_plan.to_bytes()[:-4])
@@ -5,6 +5,7 @@
 
 import unittest
 import os
+import io
 from contextlib import redirect_stdout
 
 from optimal_motion_searcher import OptimalMotionSearcher
@@ -15,6 +16,7 @@ from coordinate import Coordinate
 from color_changer import Color
 from composite_game_motion import CompositeGameMotion
 from color_changer import Color
+from tests.game_area_fixture import init_game_area_info
 
 
 class TestOptimalMotionSearcher(unittest.TestCase):
@@ -164,3 +166,104 @@ class TestOptimalMotionSearcher(unittest.TestCase):
                     redirect.close()
             # 少なくとも1つの経路はあるはずなので、探索成功数0回は異常
             self.assertNotEqual(unexpected_success_count, actual_success_count)
+
+    def test_optiaml_motion_search_update_robot(self):
+        """探索後の走行体が目標ノードに到達していることを確認する."""
+        # ゲームエリア情報の初期化
+        init_game_area_info()
+
+        start_robot = Robot(Coordinate(4, 4), Direction.E, "left")
+        goal_node = GameAreaInfo.node_list[5 * 7 + 5]
+        # 探索する
+        game_motions = OptimalMotionSearcher.search(start_robot, goal_node)
+
+        # 走行体が目標ノードに遷移していること
+        self.assertEqual(goal_node.coord, start_robot.coord)
+        # ブロック置き場に到達した走行体のエッジは"none"であること
+        self.assertEqual("none", start_robot.edge)
+        # 探索した動作のコストは正であること
+        self.assertGreater(game_motions.get_cost(), 0)
+
+    def test_optiaml_motion_search_cache(self):
+        """同じ条件の探索結果をキャッシュから再利用することを確認する."""
+        # ゲームエリア情報の初期化
+        init_game_area_info()
+        OptimalMotionSearcher.clear_cache()
+        goal_node = GameAreaInfo.node_list[1 * 7 + 3]
+
+        # 1回目の探索はキャッシュにない
+        first_robot = Robot(Coordinate(4, 4), Direction.E, "left")
+        first_game_motions = OptimalMotionSearcher.search(first_robot, goal_node)
+        self.assertEqual(0, OptimalMotionSearcher.get_cache_info()["hits"])
+        self.assertEqual(1, OptimalMotionSearcher.get_cache_info()["misses"])
+
+        # 2回目の探索はキャッシュから同じ結果を得る
+        second_robot = Robot(Coordinate(4, 4), Direction.E, "left")
+        second_game_motions = OptimalMotionSearcher.search(second_robot, goal_node)
+        self.assertEqual(1, OptimalMotionSearcher.get_cache_info()["hits"])
+        self.assertEqual(first_game_motions.get_cost(), second_game_motions.get_cost())
+        self.assertEqual(first_robot, second_robot)
+
+        # エッジが異なる場合は別の探索とする
+        third_robot = Robot(Coordinate(4, 4), Direction.E, "right")
+        OptimalMotionSearcher.search(third_robot, goal_node)
+        self.assertEqual(2, OptimalMotionSearcher.get_cache_info()["misses"])
+
+        # 上限数を超えたキャッシュは破棄される
+        OptimalMotionSearcher.set_cache_size(1)
+        self.assertEqual(1, OptimalMotionSearcher.get_cache_info()["size"])
+        OptimalMotionSearcher.set_cache_size(1024)
+
+        # 予測コストは目標ノードごとにキャッシュし、探索結果のキャッシュと共に破棄される
+        self.assertEqual(1, OptimalMotionSearcher.get_cache_info()["predicted_costs"])
+        OptimalMotionSearcher.clear_cache()
+        self.assertEqual(0, OptimalMotionSearcher.get_cache_info()["predicted_costs"])
+
+    def test_optiaml_motion_search_multi(self):
+        """複数の設置先ノードの候補から最小コストの設置動作を探索できることを確認する."""
+        # ゲームエリア情報の初期化
+        init_game_area_info()
+        OptimalMotionSearcher.clear_cache()
+        candidate_nodes = [GameAreaInfo.node_list[y * 7 + 6] for y in (1, 3, 5)]
+
+        # 候補ごとに探索した結果
+        costs = []
+        robots = []
+        for candidate_node in candidate_nodes:
+            robot = Robot(Coordinate(5, 3), Direction.E, "none")
+            cost = OptimalMotionSearcher.search(robot, candidate_node).get_cost()
+            # 動作が探索できなかった場合、コストを無限大にする
+            costs.append(cost if cost > 0 else float("inf"))
+            robots.append(robot)
+
+        # 1回の探索で、候補ごとに探索した場合の最小コストの設置動作が得られる
+        multi_robot = Robot(Coordinate(5, 3), Direction.E, "none")
+        index, game_motions, multi_costs = OptimalMotionSearcher.search_multi(
+            multi_robot, candidate_nodes)
+        self.assertEqual(costs.index(min(costs)), index)
+        self.assertAlmostEqual(min(costs), game_motions.get_cost())
+        self.assertAlmostEqual(min(costs), multi_costs[index])
+        self.assertEqual(min(costs), min(multi_costs))
+        self.assertEqual(robots[index], multi_robot)
+
+        # 候補がない場合は探索に失敗する
+        self.assertEqual(-1, OptimalMotionSearcher.search_multi(multi_robot, [])[0])
+
+    def test_optiaml_motion_search_verbose(self):
+        """動作が探索できない場合のメッセージを表示しないように探索できることを確認する."""
+        # ゲームエリア情報の初期化
+        init_game_area_info()
+        goal_node = GameAreaInfo.node_list[3 * 7 + 6]
+
+        # 既定では探索できない動作のメッセージを表示する
+        with redirect_stdout(io.StringIO()) as output:
+            robot = Robot(Coordinate(1, 1), Direction.N, "left")
+            self.assertEqual(0, OptimalMotionSearcher.search(robot, goal_node).get_cost())
+        self.assertIn("Impossible move", output.getvalue())
+
+        # verbose=Falseの場合は表示しない
+        with redirect_stdout(io.StringIO()) as output:
+            robot = Robot(Coordinate(1, 1), Direction.N, "left")
+            game_motions = OptimalMotionSearcher.search(robot, goal_node, verbose=False)
+            self.assertEqual(0, game_motions.get_cost())
+        self.assertEqual("", output.getvalue())
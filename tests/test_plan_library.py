@@ -0,0 +1,135 @@
+"""計画ライブラリのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from plan_library import PlanLibrary
+from game_planner import GamePlanner
+from game_state import GameState
+from game_area_info import GameAreaInfo
+from layout_symmetry import LayoutSymmetry
+from color_changer import Color
+from tests.game_area_fixture import init_game_area_info
+
+
+class TestPlanLibrary(unittest.TestCase):
+    """PlanLibraryのテスト."""
+
+    def tearDown(self):
+        """読み込んだ計画ライブラリを破棄する."""
+        PlanLibrary.unload()
+
+    def test_fingerprint(self):
+        """配置と指紋を相互に変換するテスト."""
+        # 配置の数は(コース2通り)*(カラーブロック2520通り)*(ベースブロック24通り)*(ボーナスブロック4通り)
+        self.assertEqual(2 * 2520 * 24 * 4, PlanLibrary.LAYOUT_NUM)
+        for fingerprint in (0, 1, 12345, PlanLibrary.LAYOUT_NUM // 2, PlanLibrary.LAYOUT_NUM - 1):
+            is_left_course, game_state = PlanLibrary.get_layout(fingerprint)
+            self.assertEqual(fingerprint, PlanLibrary.fingerprint(is_left_course, game_state))
+        self.assertTrue(PlanLibrary.get_layout(0)[0])
+        self.assertFalse(PlanLibrary.get_layout(PlanLibrary.LAYOUT_NUM - 1)[0])
+
+        # ゲームエリア情報から生成したゲーム状態の指紋
+        init_game_area_info([Color.RED, Color.RED, Color.YELLOW, Color.YELLOW,
+                             Color.GREEN, Color.GREEN, Color.BLUE, Color.BLUE],
+                            [Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE], Color.RED)
+        # 辞書順で最初の配置
+        self.assertEqual(0, PlanLibrary.fingerprint(True, GameState.from_game_area_info()))
+        # 2つ以上ある色などライブラリが扱えない配置
+        GameAreaInfo.base_color_list = [Color.RED, Color.RED, Color.GREEN, Color.BLUE]
+        self.assertEqual(-1, PlanLibrary.fingerprint(True, GameState.from_game_area_info()))
+
+    def test_canonicalize(self):
+        """色の付け替えで移り合う配置が同じ正準形になるテスト."""
+        # 正準形の配置の数は(コース2通り)*(カラーブロック2520通り)*(ボーナスブロック4通り)
+        self.assertEqual(2 * 2520 * 4, PlanLibrary.CANONICAL_LAYOUT_NUM)
+        for canonical_index in (5, PlanLibrary.CANONICAL_LAYOUT_NUM // 2 + 5):
+            is_left_course, canonical_game_state = PlanLibrary.get_canonical_layout(canonical_index)
+            self.assertEqual(canonical_index < PlanLibrary.CANONICAL_LAYOUT_NUM // 2,
+                             is_left_course)
+            self.assertEqual(canonical_index,
+                             PlanLibrary.canonicalize(is_left_course, canonical_game_state))
+            # 赤と黄を付け替えた配置
+            swapped_game_state = self.swap_colors(canonical_game_state, Color.RED, Color.YELLOW)
+            self.assertEqual(canonical_index,
+                             PlanLibrary.canonicalize(is_left_course, swapped_game_state))
+            # 鏡映した配置は同じ正準形にしない
+            mirrored_game_state = LayoutSymmetry.transform_game_state(canonical_game_state,
+                                                                      LayoutSymmetry.MIRROR)
+            self.assertNotIn(PlanLibrary.canonicalize(not is_left_course, mirrored_game_state),
+                             (-1, canonical_index))
+            # ライブラリが扱えない配置
+            self.assertEqual(-1, PlanLibrary.canonicalize(not is_left_course,
+                                                          canonical_game_state))
+
+    def test_build_merge_and_lookup(self):
+        """分割して計画したライブラリをまとめて検索するテスト."""
+        shard_canonical_indexes = [PlanLibrary.get_shard(shard_index, 5040)
+                                   for shard_index in range(2)]
+        # 分割した配置は重複しない
+        self.assertEqual(8, sum(len(canonical_indexes)
+                                for canonical_indexes in shard_canonical_indexes))
+        self.assertEqual([], list(set(shard_canonical_indexes[0])
+                                  & set(shard_canonical_indexes[1])))
+
+        with tempfile.TemporaryDirectory() as directory:
+            shard_paths = []
+            for shard_index, canonical_indexes in enumerate(shard_canonical_indexes):
+                shard_paths.append(os.path.join(directory, "shard%d.bin" % shard_index))
+                PlanLibrary.save(shard_paths[-1],
+                                 PlanLibrary.build(canonical_indexes, shard_index + 1))
+            library_path = os.path.join(directory, "plan_library.bin")
+            self.assertEqual(8, PlanLibrary.merge(shard_paths, library_path))
+            self.assertTrue(PlanLibrary.load(library_path))
+
+            is_left_courses = set()
+            for canonical_index in shard_canonical_indexes[0] + shard_canonical_indexes[1]:
+                is_left_course, game_state = PlanLibrary.get_canonical_layout(canonical_index)
+                is_left_courses.add(is_left_course)
+                # 色を付け替えた配置も、その配置を計画した場合と同じ動作コマンドを返す
+                for layout in (game_state, self.swap_colors(game_state, Color.RED, Color.BLUE),
+                               self.swap_colors(game_state, Color.YELLOW, Color.GREEN)):
+                    with redirect_stdout(open(os.devnull, 'w')) as redirect:
+                        expected_motion_commands = GamePlanner.plan(is_left_course, layout)
+                        redirect.close()
+                    self.assertEqual(expected_motion_commands,
+                                     PlanLibrary.lookup(is_left_course, layout))
+            # LコースとRコースの両方の配置を検索した
+            self.assertEqual({True, False}, is_left_courses)
+            # 計画していない配置はNoneを返す
+            self.assertIsNone(PlanLibrary.lookup(*PlanLibrary.get_canonical_layout(2)))
+            PlanLibrary.unload()
+
+    def test_strategy(self):
+        """計画ライブラリを計画した戦略と異なる戦略では検索しないテスト."""
+        is_left_course, game_state = PlanLibrary.get_canonical_layout(0)
+        with tempfile.TemporaryDirectory() as directory:
+            greedy_path = os.path.join(directory, "greedy.bin")
+            exact_path = os.path.join(directory, "exact.bin")
+            PlanLibrary.save(greedy_path, PlanLibrary.build([0]))
+            PlanLibrary.save(exact_path, {1: "SL,100\n"}, "exact")
+            self.assertTrue(PlanLibrary.load(greedy_path))
+            self.assertEqual("greedy", PlanLibrary.get_strategy())
+            self.assertIsNotNone(PlanLibrary.lookup(is_left_course, game_state))
+            self.assertIsNone(PlanLibrary.lookup(is_left_course, game_state, "exact"))
+            self.assertIsNone(PlanLibrary.lookup(is_left_course, game_state, "anytime"))
+            # 異なる戦略で計画したファイルはまとめない
+            with self.assertRaises(ValueError):
+                PlanLibrary.merge([greedy_path, exact_path], os.path.join(directory, "all.bin"))
+            PlanLibrary.unload()
+        self.assertIsNone(PlanLibrary.get_strategy())
+
+    @staticmethod
+    def swap_colors(game_state, color, other_color):
+        """ブロックの色を付け替えたゲーム状態を作成する."""
+        swap = {color: other_color, other_color: color}
+        return GameState(game_state.block_ids,
+                         [swap.get(c, c) for c in game_state.block_color_list],
+                         [swap.get(c, c) for c in game_state.base_color_list],
+                         swap.get(game_state.bonus_color, game_state.bonus_color),
+                         game_state.intersection_list)
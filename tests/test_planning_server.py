@@ -0,0 +1,92 @@
+"""計画サーバモジュールのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+import socket
+import threading
+from contextlib import redirect_stdout
+
+from camera_system.planning_server import PlanningServer
+from camera_system.planning_client import PlanningClient
+from color_changer import Color
+
+
+class TestPlanningServer(unittest.TestCase):
+    """PlanningServerとPlanningClientのテスト."""
+
+    LAYOUT = {"block_colors": ["RED", "RED", "YELLOW", "YELLOW", "GREEN", "GREEN", "BLUE", "BLUE"],
+              "base_colors": ["RED", "YELLOW", "GREEN", "BLUE"], "bonus_color": "RED"}
+
+    def test_handle_request(self):
+        server = PlanningServer()
+        game_state = PlanningServer.to_game_state(True, self.LAYOUT)
+        self.assertEqual(self.LAYOUT, PlanningServer.to_layout(game_state))
+        self.assertEqual((Color.RED, Color.BLUE, Color.YELLOW, Color.GREEN),
+                         tuple(game_state.intersection_list))
+
+        # 探索失敗のメッセージを無視するため標準出力を非表示にする
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            request = {"command": "plan", "is_left_course": True, "layout": self.LAYOUT}
+            response = server.handle_request(request)
+            # 同じ配置の計画はキャッシュから返す
+            cached_response = server.handle_request(request)
+            expected_commands, _ = PlanningServer.plan_commands(True, game_state)
+            redirect.close()
+        self.assertEqual("ok", response["status"])
+        self.assertEqual(expected_commands, response["commands"])
+        self.assertIn(response["source"], ("library", "planner"))
+        self.assertEqual("cache", cached_response["source"])
+        self.assertEqual(expected_commands, cached_response["commands"])
+
+        # 不正な要求にはエラーを返す
+        for request in [{"command": "unknown"}, {"command": "plan"}, [],
+                        {"command": "plan", "is_left_course": "True", "layout": self.LAYOUT},
+                        {"command": "plan", "is_left_course": True},
+                        {"command": "plan", "is_left_course": True, "strategy": "best",
+                         "layout": self.LAYOUT},
+                        {"command": "plan", "is_left_course": True,
+                         "layout": dict(self.LAYOUT, bonus_color="PURPLE")},
+                        {"command": "plan", "is_left_course": True,
+                         "layout": dict(self.LAYOUT, base_colors=["RED"])}]:
+            self.assertEqual("error", server.handle_request(request)["status"])
+
+        stats = server.handle_request({"command": "stats"})
+        self.assertEqual(11, stats["requests"])  # 統計情報の要求も数える
+        self.assertEqual(8, stats["errors"])
+        self.assertEqual(2, stats["latency"]["count"])
+        self.assertLessEqual(stats["latency"]["p50"], stats["latency"]["max"])
+        self.assertEqual(1, stats["caches"]["plans"])
+        self.assertEqual(1, stats["caches"]["plan_hits"])
+        self.assertGreater(stats["caches"]["game_motions"], 0)
+        self.assertFalse(stats["camera"])
+
+    def test_client(self):
+        # 空いているポートでサーバを起動する
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        server = PlanningServer()
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            thread = threading.Thread(target=server.serve, args=("127.0.0.1", port))
+            thread.start()
+            client = PlanningClient("127.0.0.1", port, timeout=10)
+            game_state = PlanningServer.to_game_state(False, self.LAYOUT)
+            for _ in range(100):
+                try:
+                    motion_commands = client.plan(False, PlanningServer.to_layout(game_state))
+                    break
+                except ConnectionRefusedError:
+                    thread.join(0.05)
+            expected_commands, _ = PlanningServer.plan_commands(False, game_state)
+            stats = client.get_stats()
+            with self.assertRaises(RuntimeError):
+                client.request({"command": "unknown"})
+            client.shutdown()
+            thread.join(10)
+            redirect.close()
+        self.assertEqual(expected_commands, motion_commands)
+        self.assertEqual(1, stats["latency"]["count"])
+        self.assertFalse(thread.is_alive())
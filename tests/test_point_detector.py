@@ -0,0 +1,63 @@
+"""PointDetectorクラスのテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import os
+import cv2
+import numpy as np
+from contextlib import redirect_stdout
+
+from point_detector import PointDetector
+
+
+class TestPointDetector(unittest.TestCase):
+    """PointDetectorのテスト."""
+
+    def setUp(self):
+        """テスト画像と、テスト画像のブロックの中心座標を用意する."""
+        read_path = os.path.dirname(os.path.realpath(__file__)) + "/test_image.png"
+        self.img = cv2.imread(read_path)
+        # ブロック置き場8個、ベースサークル4個、端点サークル1個の順
+        self.points = [(275, 96), (212, 118), (131, 148), (361, 112), (231, 175), (459, 130),
+                       (416, 164), (350, 209), (412, 89), (562, 199), (112, 235), (122, 98),
+                       (211, 417)]
+
+    def test_detect(self):
+        # 参照座標がずれていても、ブロックの中心座標を検出する
+        reference_points = [(x + 6, y - 5) for x, y in self.points]
+        points, confidences = PointDetector(reference_points).detect(self.img)
+        np.testing.assert_allclose(self.points, points, atol=1)
+        self.assertTrue(all(confidence >= PointDetector.CONFIDENCE_THRESHOLD
+                            for confidence in confidences))
+
+    def test_detect_moved_camera(self):
+        # カメラが回転・平行移動した画像でも、移動後のブロックの中心座標を検出する
+        matrix = cv2.getRotationMatrix2D((320, 240), 4, 1.0)
+        matrix[:, 2] += (25, 15)
+        moved_img = cv2.warpAffine(self.img, matrix, (640, 480), borderValue=(255, 255, 255))
+        expected = cv2.transform(np.array([self.points], np.float32), matrix)[0]
+        points, confidences = PointDetector(self.points).detect(moved_img)
+        np.testing.assert_allclose(expected, points, atol=2)
+        self.assertTrue(all(confidence >= PointDetector.CONFIDENCE_THRESHOLD
+                            for confidence in confidences))
+
+    def test_detect_missing_block(self):
+        # ブロックが写っていない座標のみ信頼度が低い
+        self.img[370:480, 160:280] = 255
+        points, confidences = PointDetector(self.points).detect(self.img)
+        self.assertLess(confidences[-1], PointDetector.CONFIDENCE_THRESHOLD)
+        self.assertTrue(all(confidence >= PointDetector.CONFIDENCE_THRESHOLD
+                            for confidence in confidences[:-1]))
+        # 見つからない座標は射影変換で予測した位置とする
+        np.testing.assert_allclose(self.points[-1], points[-1], atol=20)
+
+    def test_detect_invalid_reference(self):
+        # ブロック置き場が一直線上に並ぶ参照座標からは検出しない
+        reference_points = [(20 + 40 * i, 20) for i in range(8)] + self.points[8:]
+        with redirect_stdout(open(os.devnull, 'w')) as redirect:
+            points, confidences = PointDetector(reference_points).detect(self.img)
+            redirect.close()
+        self.assertEqual(reference_points, points)
+        self.assertEqual([0.0] * 13, confidences)
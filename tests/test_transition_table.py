@@ -0,0 +1,96 @@
+"""状態遷移表のテストコードを記述するモジュール.
+
+@author: miyashita64
+"""
+
+import unittest
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from transition_table import TransitionTable
+from game_motion_converter import GameMotionConverter
+from game_area_info import GameAreaInfo
+from robot import Robot, Direction
+from coordinate import Coordinate
+from tests.game_area_fixture import init_game_area_info
+
+
+class TestTransitionTable(unittest.TestCase):
+    """TransitionTableのテスト."""
+
+    def setUp(self):
+        """ゲームエリア情報を初期化する."""
+        init_game_area_info()
+        TransitionTable.clear_cache()
+
+    def test_encode_decode(self):
+        """状態IDと走行体の相互変換のテスト."""
+        for state in range(TransitionTable.STATE_NUM):
+            robot = TransitionTable.to_robot(state)
+            with_block = TransitionTable.decode(state)[4]
+            self.assertEqual(state, TransitionTable.encode(robot, with_block))
+
+        robot = Robot(Coordinate(4, 2), Direction.SW, "right")
+        expected = (4, 2, Direction.SW.value, TransitionTable.EDGES.index("right"), True)
+        actual = TransitionTable.decode(TransitionTable.encode(robot, True))
+        self.assertEqual(expected, actual)
+
+    def test_transitions(self):
+        """遷移表のコストがゲーム動作のコストと一致することのテスト."""
+        occupancy = GameAreaInfo.get_occupancy()
+        table = TransitionTable.get(occupancy)
+        current_robot = Robot(Coordinate(4, 4), Direction.E, "left")
+        next_states, costs = table.transitions(TransitionTable.encode(current_robot, True))
+
+        # (4, 4)から北西に進むと(3, 3)に遷移する
+        expected_robot = Robot(Coordinate(3, 3), Direction.NW, "none")
+        expected_motion = GameMotionConverter().convert_game_motion(
+            current_robot, expected_robot, True, occupancy)
+        self.assertEqual(TransitionTable.encode(expected_robot, True),
+                         next_states[Direction.NW.value])
+        self.assertEqual(expected_motion.get_cost(), costs[Direction.NW.value])
+
+        # (2, 3)から北西に進むと、ブロック(1, 3)の横を通るため遷移できない
+        current_robot = Robot(Coordinate(2, 3), Direction.N, "left")
+        next_states, _ = table.transitions(TransitionTable.encode(current_robot, True))
+        self.assertEqual(-1, next_states[Direction.NW.value])
+
+        # 同じブロックの配置であれば、同じ遷移表を取得する
+        self.assertIs(table, TransitionTable.get(occupancy))
+
+    def test_concurrent_transitions(self):
+        """複数のスレッドから同時に参照した遷移が、1つのスレッドで作成した遷移と一致することのテスト."""
+        occupancy = GameAreaInfo.get_occupancy()
+        states = range(TransitionTable.STATE_NUM)
+        with ThreadPoolExecutor(4) as executor:
+            tables = list(executor.map(TransitionTable.get, [occupancy] * 8))
+            concurrent_transitions = list(executor.map(
+                lambda state: [array.tolist() for array in tables[state % 8].transitions(state)],
+                states))
+        # 全てのスレッドで同じ遷移表を取得する
+        self.assertTrue(all(table is tables[0] for table in tables))
+
+        TransitionTable.clear_cache()
+        table = TransitionTable.get(occupancy)
+        self.assertEqual([[array.tolist() for array in table.transitions(state)]
+                          for state in states], concurrent_transitions)
+
+    def test_save_and_load(self):
+        """遷移表の保存と読み込みのテスト."""
+        occupancy = GameAreaInfo.get_occupancy()
+        table = TransitionTable.get(occupancy)
+        state = TransitionTable.encode(Robot(Coordinate(2, 2), Direction.N, "left"), False)
+        expected_next_states, expected_costs = table.transitions(state)
+
+        with tempfile.TemporaryDirectory() as directory:
+            TransitionTable.save(directory)
+            TransitionTable.clear_cache()
+            TransitionTable.load(directory)
+            loaded_table = TransitionTable.get(occupancy)
+            actual_next_states, actual_costs = loaded_table.transitions(state)
+
+            self.assertIsNot(table, loaded_table)
+            self.assertEqual(expected_next_states.tolist(), actual_next_states.tolist())
+            self.assertEqual(expected_costs.tolist(), actual_costs.tolist())
+            del loaded_table, actual_next_states, actual_costs
+            TransitionTable.clear_cache()